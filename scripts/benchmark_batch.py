@@ -0,0 +1,101 @@
+"""
+Benchmark: HTTP round-trips and wall time with and without batch requests
+
+Runs the app's search path (search.list, then videos.list and channels.list
+for the results) against the local mock YouTube API, which answers every
+HTTP request, plain or batch, after a configurable latency. Two workloads:
+
+- page views: one search at a time, as a single user makes them; batching
+  sends a page's videos.list and channels.list together (3 -> 2 round-trips)
+- bulk: many queries on a worker pool, as youtube_search.py runs them; the
+  workers' concurrent calls share batch requests
+
+Each configuration uses its own queries so no call is answered from cache. No
+quota is used.
+
+Usage:
+    python scripts/benchmark_batch.py [--latency 0.1] [--page-views 20] [--queries 200] [--workers 16]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_search import configure_environment, percentile
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+
+def page_view(youtube, query, max_results):
+    from youtube_api import search_videos
+    from youtube_enrich import enrich_videos
+    return enrich_videos(youtube, search_videos(youtube, query, max_results=max_results))
+
+
+def run(api, youtube, queries, workers, max_results):
+    """Return (HTTP requests sent, API calls answered, wall seconds, per-query seconds)"""
+    before = api.stats()
+    timings = []
+
+    def timed(query):
+        started = time.perf_counter()
+        page_view(youtube, query, max_results)
+        timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    if workers == 1:
+        for query in queries:
+            timed(query)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(timed, queries))
+    wall = time.perf_counter() - started
+    after = api.stats()
+    calls = sum(after["requests"].values()) - sum(before["requests"].values())
+    return after["http_requests"] - before["http_requests"], calls, wall, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure round-trips and wall time saved by batching API calls.")
+    parser.add_argument("--latency", type=float, default=0.1, help="mock API latency per HTTP request in seconds (default: 0.1)")
+    parser.add_argument("--page-views", type=int, default=20, help="sequential page views (default: 20)")
+    parser.add_argument("--queries", type=int, default=200, help="queries in the bulk run (default: 200)")
+    parser.add_argument("--workers", type=int, default=16, help="bulk workers (default: 16)")
+    parser.add_argument("--max-results", type=int, default=25, help="results per query (default: 25)")
+    parser.add_argument("--windows", default="0.01,0.05", help="batch windows to compare, in seconds (default: 0.01,0.05)")
+    args = parser.parse_args()
+
+    api = MockYouTubeAPI(latency=args.latency, jitter=0.1)
+    server = start_mock_server(api, port=0)
+    configure_environment(f"http://127.0.0.1:{server.server_port}/")
+
+    from youtube_batch import api_batcher
+    from youtube_client import get_client
+    youtube = get_client(os.environ["API_KEY"])
+    windows = [0.0] + [float(window) for window in args.windows.split(",") if window]
+
+    print(f"Mock latency {args.latency * 1000:.0f} ms per HTTP request, {args.max_results} results per query")
+    print(f"{'workload':<22} | {'window':>6} | {'HTTP requests':>13} | {'calls':>5} | {'wall':>8} | {'p50/query':>9} | {'p95/query':>9}")
+    for name, count, workers in (
+        ("page views (1 user)", args.page_views, 1),
+        (f"bulk ({args.workers} workers)", args.queries, args.workers),
+    ):
+        baseline = None
+        for window in windows:
+            api_batcher.window = window
+            queries = [f"batch benchmark {name} {window} {i}" for i in range(count)]
+            requests, calls, wall, timings = run(api, youtube, queries, workers, args.max_results)
+            baseline = baseline or wall
+            print(
+                f"{name:<22} | {window * 1000:>3.0f} ms | {requests:>13} | {calls:>5} | {wall:>6.2f} s | "
+                f"{statistics.median(timings) * 1000:>6.0f} ms | {percentile(timings, 95) * 1000:>6.0f} ms"
+                + (f"  ({baseline / wall:.1f}x faster)" if window else "")
+            )
+
+
+if __name__ == "__main__":
+    main()
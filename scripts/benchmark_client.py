@@ -0,0 +1,56 @@
+"""
+Benchmark: building a YouTube client per search vs. reusing the shared client
+
+Measures the cold-start cost of build() and the per-search overhead that the
+process-wide client manager in src/youtube_client.py removes. No API calls are
+made, so no quota is used.
+
+Usage:
+    python scripts/benchmark_client.py [--searches 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from googleapiclient.discovery import build
+import youtube_client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure build() per search against the shared YouTube client.")
+    parser.add_argument("--searches", type=int, default=50, help="searches to simulate (default: 50)")
+    searches = parser.parse_args().searches
+    api_key = "benchmark-key"
+
+    # Old behaviour: one build() per search
+    started = time.perf_counter()
+    for _ in range(searches):
+        build("youtube", "v3", developerKey=api_key)
+    per_search_build = (time.perf_counter() - started) / searches
+
+    # New behaviour: one shared client per process
+    started = time.perf_counter()
+    youtube_client.get_client(api_key)
+    cold_start = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(searches):
+        youtube_client.get_client(api_key)
+    per_search_shared = (time.perf_counter() - started) / searches
+
+    stats = youtube_client.client_stats()
+
+    print(f"Searches simulated:        {searches}")
+    print(f"build() per search:        {per_search_build * 1000:8.2f} ms")
+    print(f"Shared client cold start:  {cold_start * 1000:8.2f} ms")
+    print(f"Shared client per search:  {per_search_shared * 1000:8.4f} ms")
+    print(f"Saved per search:          {(per_search_build - per_search_shared) * 1000:8.2f} ms")
+    print(f"Total saved ({searches} searches): {stats['saved_seconds'] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
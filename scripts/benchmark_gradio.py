@@ -0,0 +1,160 @@
+"""
+Benchmark: Gradio search throughput with many concurrent users
+
+Launches the Gradio app (with the local mock YouTube API) in a child process
+and sends searches through Gradio's queue from a pool of simulated users, each
+with its own gradio_client session, the same way browser tabs do. Reports
+p50/p95/p99 latency, throughput and failures. Every search uses a new query,
+so each one goes to the (mock) API. The app runs in its own process so the
+simulated users do not compete with it for the GIL.
+
+--handler sync wires the blocking generator in instead of the async handler,
+for comparison. GRADIO_CONCURRENCY / GRADIO_QUEUE_SIZE / GRADIO_SEARCH_TIMEOUT
+are set from the command line before the app is imported.
+
+Usage:
+    python scripts/benchmark_gradio.py [--users 64] [--requests 256] [--latency 0.25]
+    python scripts/benchmark_gradio.py --handler sync --concurrency 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_search import configure_environment, percentile
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(args):
+    """Child process: run the mock API and the Gradio app until terminated"""
+    api = MockYouTubeAPI(latency=args.latency, jitter=args.jitter)
+    server = start_mock_server(api, port=0)
+    configure_environment(f"http://127.0.0.1:{server.server_port}/")
+    os.environ.update({
+        "GRADIO_CONCURRENCY": str(args.concurrency),
+        "GRADIO_QUEUE_SIZE": str(args.queue_size),
+        "GRADIO_SEARCH_TIMEOUT": str(args.timeout),
+        "GRADIO_ANALYTICS_ENABLED": "False",
+        "WARM_INTERVAL": "0",
+    })
+
+    import youtube_gradio
+    if args.handler == "sync":
+        youtube_gradio.search_youtube_videos_async = youtube_gradio.search_youtube_videos
+
+    def report(*_):
+        # The parent reads the mock's call counts from the last line of output
+        print(json.dumps(api.stats()["requests"]), flush=True)
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, report)
+    demo = youtube_gradio.create_interface()
+    demo.launch(server_name="127.0.0.1", server_port=args.serve, quiet=True)
+
+
+def _wait_for(url, timeout=120):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                response.read()
+            return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Gradio search throughput under concurrent users.")
+    parser.add_argument("--users", type=int, default=64, help="concurrent simulated users (default: 64)")
+    parser.add_argument("--requests", type=int, default=256, help="total searches (default: 256)")
+    parser.add_argument("--max-results", type=int, default=5, help="results per search (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.25, help="mock API median latency in seconds (default: 0.25)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="mock API latency spread (default: 0.3)")
+    parser.add_argument("--concurrency", type=int, default=16, help="GRADIO_CONCURRENCY (default: 16)")
+    parser.add_argument("--queue-size", type=int, default=512, help="GRADIO_QUEUE_SIZE (default: 512)")
+    parser.add_argument("--timeout", type=float, default=30, help="GRADIO_SEARCH_TIMEOUT in seconds (default: 30)")
+    parser.add_argument("--handler", choices=["async", "sync"], default="async", help="search handler to wire (default: async)")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    port = _free_port()
+    child = subprocess.Popen(
+        [sys.executable, __file__, "--serve", str(port)] + sys.argv[1:],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    url = f"http://127.0.0.1:{port}/"
+    try:
+        _wait_for(url)
+
+        from gradio_client import Client
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        # Connect every user before the clock starts
+        clients = queue.Queue()
+        for _ in range(args.users):
+            clients.put(Client(url, verbose=False))
+
+        def search(i):
+            client = clients.get()
+            started = time.perf_counter()
+            try:
+                result = client.predict(
+                    f"gradio load query {i}", args.max_results, "short", "NL", "strict", "relevance",
+                    "🌐 YouTube API", "API order", "2024-01-01", None, api_name="/search"
+                )
+                text = result[0] if isinstance(result, (list, tuple)) else result
+                ok = "🔗" in text
+            except Exception:
+                ok = False
+            finally:
+                clients.put(client)
+            return time.perf_counter() - started, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            results = list(pool.map(search, range(args.requests)))
+        wall = time.perf_counter() - started
+    finally:
+        child.terminate()
+        output, _ = child.communicate(timeout=30)
+
+    latencies = [latency for latency, _ in results]
+    failed = sum(1 for _, ok in results if not ok)
+    print(
+        f"{args.requests} searches, {args.users} users, handler={args.handler}, "
+        f"concurrency limit {args.concurrency}, mock latency {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'p50':>9} | {'p95':>9} | {'p99':>9} | {'searches/s':>10} | {'failed':>6}")
+    print(
+        " | ".join(f"{percentile(latencies, pct) * 1000:>6.0f} ms" for pct in (50, 95, 99))
+        + f" | {args.requests / wall:>10.1f} | {failed:>6}"
+    )
+    lines = output.strip().splitlines()
+    if lines:
+        print(f"Mock API calls: {lines[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: API payload bytes and parse time per query
+
+Sends the search.list + videos.list calls behind one search (a page of
+results and its enrichment) to the local mock YouTube API, with and without
+the partial response masks (SEARCH_FIELDS / VIDEO_FIELDS) and gzip, and
+reports the bytes on the wire and the time to decompress and parse them.
+The mock builds its payloads like the real API's, so the ratios carry over;
+no quota is used.
+
+The last line checks the app's own search path end to end: the bytes the
+mock actually sent per query through the shared client.
+
+Usage:
+    python scripts/benchmark_payload.py [--queries 50] [--max-results 50]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from urllib.parse import urlencode
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_search import configure_environment
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+
+def fetch(base_url, method, params, compressed):
+    """Return the raw response body of one call as it came over the wire"""
+    request = urllib.request.Request(f"{base_url}youtube/v3/{method}?{urlencode(params)}")
+    if compressed:
+        request.add_header("Accept-Encoding", "gzip")
+    with urllib.request.urlopen(request) as response:
+        return response.read(), response.headers.get("Content-Encoding") == "gzip"
+
+
+def parse(body, compressed, repeat=20):
+    """Return the parsed payload and the median seconds to decompress and parse body"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = json.loads(gzip.decompress(body) if compressed else body)
+        times.append(time.perf_counter() - started)
+    return payload, statistics.median(times)
+
+
+def measure(base_url, queries, max_results, masked, compressed):
+    """Return (bytes per query, parse seconds per query) for one configuration"""
+    from youtube_api import build_search_params
+    from youtube_enrich import VIDEO_FIELDS
+
+    sizes, parse_times = [], []
+    for query in queries:
+        params = build_search_params(query, max_results=max_results)
+        if not masked:
+            del params["fields"]
+        body, gzipped = fetch(base_url, "search", dict(params, key="benchmark-key"), compressed)
+        search, search_seconds = parse(body, gzipped)
+        size = len(body)
+
+        ids = ",".join(item["id"]["videoId"] for item in search.get("items", []))
+        params = dict(part="statistics,contentDetails", id=ids, maxResults=max_results, key="benchmark-key")
+        if masked:
+            params["fields"] = VIDEO_FIELDS
+        body, gzipped = fetch(base_url, "videos", params, compressed)
+        _, videos_seconds = parse(body, gzipped)
+
+        sizes.append(size + len(body))
+        parse_times.append(search_seconds + videos_seconds)
+    return statistics.mean(sizes), statistics.mean(parse_times)
+
+
+def client_bytes(api, queries, max_results):
+    """Return the bytes the mock sent per query for the app's own search + enrichment path"""
+    from youtube_api import search_videos
+    from youtube_client import get_client
+    from youtube_enrich import enrich_videos
+
+    youtube = get_client(os.environ["API_KEY"])
+    before = sum(api.stats()["bytes_sent"].values())
+    for query in queries:
+        enrich_videos(youtube, search_videos(youtube, query, max_results=max_results))
+    return (sum(api.stats()["bytes_sent"].values()) - before) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API payload bytes and parse time with and without fields masks and gzip.")
+    parser.add_argument("--queries", type=int, default=50, help="queries per configuration (default: 50)")
+    parser.add_argument("--max-results", type=int, default=50, help="results per query, up to one page (default: 50)")
+    args = parser.parse_args()
+
+    api = MockYouTubeAPI()
+    server = start_mock_server(api, port=0)
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    configure_environment(base_url)
+    queries = [f"payload benchmark {i}" for i in range(args.queries)]
+    max_results = min(args.max_results, 50)
+
+    print(f"{args.queries} queries, search.list + videos.list for {max_results} results each")
+    print(f"{'response':<26} | {'bytes/query':>11} | {'vs full':>7} | {'parse/query':>11}")
+    baseline = None
+    for name, masked, compressed in (
+        ("full", False, False),
+        ("full + gzip", False, True),
+        ("fields mask", True, False),
+        ("fields mask + gzip", True, True),
+    ):
+        size, seconds = measure(base_url, queries, max_results, masked, compressed)
+        baseline = baseline or size
+        print(f"{name:<26} | {size:>11,.0f} | {size / baseline:>6.0%} | {seconds * 1000:>8.2f} ms")
+
+    size = client_bytes(api, [f"client payload {i}" for i in range(args.queries)], max_results)
+    print(f"App search path (client)   | {size:>11,.0f} bytes/query on the wire")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: API calls and latency saved by answering filter changes from candidate pools
+
+Replays what a user does after a search: the same query with the "Video
+Duration", "Video Quality" and date filters changed one after another. Each
+step runs the deploy frontend's search path against the local mock YouTube
+API: answer_from_pool() first, otherwise search.list plus enrichment, whose
+results become a pool. The script runs once with the planner and once
+without, and reports the search.list calls (100 quota units each) and the
+per-step latency of answers from a pool and from the API. Each query is new,
+so the search cache answers nothing. No quota is used.
+
+Usage:
+    python scripts/benchmark_planner.py [--latency 0.1] [--queries 20] [--max-results 25]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_search import configure_environment, percentile
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+BROAD = dict(
+    video_duration="any", region_code="US", safe_search="moderate", order="relevance",
+    video_definition="any", published_after="2024-01-01T00:00:00Z", published_before=None,
+)
+
+# Filter changes made after the broad search, in order
+STEPS = (
+    dict(video_duration="short"),
+    dict(video_duration="medium"),
+    dict(video_duration="long"),
+    dict(video_definition="high"),
+    dict(video_duration="short", video_definition="high"),
+    dict(published_after="2025-01-01T00:00:00Z"),
+    dict(published_after="2025-01-01T00:00:00Z", published_before="2025-06-30T23:59:59Z"),
+    dict(video_definition="standard"),
+)
+
+
+def run(api, youtube, queries, max_results, planner):
+    """Return (search.list calls, seconds per pool answer, seconds per API answer)"""
+    from query_planner import answer_from_pool, remember_pool
+    from video_result import to_results
+    from youtube_api import search_exhausted, search_videos
+    from youtube_enrich import enrich_videos
+
+    before = api.stats()["requests"].get("search", 0)
+    local, remote = [], []
+    for query in queries:
+        for step in ({},) + STEPS:
+            options = dict(BROAD, **step)
+            started = time.perf_counter()
+            results = answer_from_pool(query, max_results, **options) if planner else None
+            if results is not None:
+                local.append(time.perf_counter() - started)
+                continue
+            results = to_results(enrich_videos(youtube, search_videos(youtube, query, max_results=max_results, **options)))
+            if planner:
+                remember_pool(query, results, search_exhausted(query, max_results, **options), **options)
+            remote.append(time.perf_counter() - started)
+    return api.stats()["requests"].get("search", 0) - before, local, remote
+
+
+def describe(timings):
+    if not timings:
+        return f"{'-':>9} | {'-':>9}"
+    return f"{statistics.median(timings) * 1000:>6.2f} ms | {percentile(timings, 95) * 1000:>6.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API calls saved by answering narrower searches from candidate pools.")
+    parser.add_argument("--latency", type=float, default=0.1, help="mock API latency per HTTP request in seconds (default: 0.1)")
+    parser.add_argument("--queries", type=int, default=20, help="queries, each followed by the filter changes (default: 20)")
+    parser.add_argument("--max-results", type=int, default=25, help="results per search (default: 25)")
+    parser.add_argument("--results-per-query", type=int, default=60, help="videos the mock API has per query (default: 60)")
+    args = parser.parse_args()
+
+    api = MockYouTubeAPI(latency=args.latency, jitter=0.1, results_per_query=args.results_per_query)
+    server = start_mock_server(api, port=0)
+    configure_environment(f"http://127.0.0.1:{server.server_port}/")
+
+    from youtube_client import get_client
+    youtube = get_client(os.environ["API_KEY"])
+    searches = args.queries * (len(STEPS) + 1)
+
+    print(f"{searches} searches: {args.queries} queries x {len(STEPS) + 1} filter settings, {args.max_results} results each")
+    print(f"Mock latency {args.latency * 1000:.0f} ms per HTTP request, {args.results_per_query} videos per query")
+    print(f"{'planner':<7} | {'search.list calls':>17} | {'quota':>6} | {'from pool':>9} | {'pool p50':>9} | {'pool p95':>9} | {'API p50':>9} | {'API p95':>9}")
+    for planner in (False, True):
+        queries = [f"planner benchmark {planner} {i}" for i in range(args.queries)]
+        calls, local, remote = run(api, youtube, queries, args.max_results, planner)
+        print(
+            f"{'on' if planner else 'off':<7} | {calls:>17} | {calls * 100:>6} | {len(local):>9} | "
+            f"{describe(local)} | {describe(remote)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
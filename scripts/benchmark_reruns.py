@@ -0,0 +1,138 @@
+"""
+Benchmark: script re-execution time per Play/Close click
+
+Before fragments, every Play/Close click re-executed the whole Streamlit script
+(CSS, sidebar, every result card). With each card rendered as an st.fragment,
+a click re-executes only that card. This script measures both in the complete
+app with N results in session state, using Streamlit's AppTest harness and
+synthetic results so no API quota is used:
+
+- full rerun: the click reruns the whole script, which is what AppTest does
+- fragment rerun: the same click reruns only the clicked card's fragment, as
+  the browser asks for; AppTest cannot do that itself, so its script runner
+  is swapped for one that keeps the app's fragments between runs and sends
+  the click as a fragment-scoped rerun
+
+Usage:
+    python scripts/benchmark_reruns.py [--clicks 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(os.path.join(ROOT, 'src'))
+
+from streamlit.runtime.fragment import MemoryFragmentStorage
+from streamlit.runtime.scriptrunner import RerunData
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+from video_result import to_results
+
+
+def make_items(count):
+    # Session state holds VideoResults, as after a real search
+    return to_results([
+        {
+            'id': {'kind': 'youtube#video', 'videoId': f'bench{i:06d}'},
+            'snippet': {
+                'title': f'Benchmark video {i}',
+                'channelTitle': f'Channel {i % 7}',
+                'publishedAt': '2024-05-01T10:00:00Z',
+                'description': 'A synthetic description used for benchmarking. ' * 5,
+                'thumbnails': {'medium': {'url': f'https://i.ytimg.com/vi/bench{i:06d}/mqdefault.jpg'}},
+            },
+            'statistics': {'viewCount': '12345', 'likeCount': '678'},
+            'contentDetails': {'duration': 'PT4M13S'},
+        }
+        for i in range(count)
+    ])
+
+
+class FragmentScriptRunner(LocalScriptRunner):
+    """AppTest script runner that reruns only fragment_id once it is set
+
+    Fragments are registered in a storage shared by every run, as the
+    Streamlit server keeps them per session.
+    """
+
+    storage = MemoryFragmentStorage()
+    fragment_id = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fragment_storage = FragmentScriptRunner.storage
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        if FragmentScriptRunner.fragment_id is None:
+            return super().run(widget_state, query_params, timeout, page_hash)
+        self.request_rerun(RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=[FragmentScriptRunner.fragment_id],
+            is_fragment_scoped_rerun=True,
+        ))
+        if not self._script_thread:
+            self.start()
+        require_widgets_deltas(self, timeout)
+        # Only the fragment's elements: enough to find the card's next button
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def _click_times(at, clicks):
+    """Toggle the first card's player `clicks` times; return per-click run times"""
+    times = []
+    for _ in range(clicks):
+        play = next(b for b in at.button if b.key and b.key.startswith("play_video_"))
+        play.click()
+        started = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - started)
+
+        close = next(b for b in at.button if b.key and b.key.startswith("hide_video_"))
+        close.click()
+        started = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def rerun_seconds(count, clicks, fragment):
+    """Median time per click on the first card of the full app with count results"""
+    app_test.LocalScriptRunner = FragmentScriptRunner
+    FragmentScriptRunner.storage.clear()
+    FragmentScriptRunner.fragment_id = None
+    try:
+        at = AppTest.from_file(os.path.join(ROOT, "streamlit_app.py"), default_timeout=120)
+        at.session_state["search_results"] = make_items(count)
+        at.session_state["last_search_term"] = "benchmark"
+        at.run()
+        if fragment:
+            # Cards are the app's only fragments, registered in render order
+            FragmentScriptRunner.fragment_id = next(iter(FragmentScriptRunner.storage._fragments))
+        return statistics.median(_click_times(at, clicks))
+    finally:
+        app_test.LocalScriptRunner = LocalScriptRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure a result card click as a full script rerun and as a fragment rerun.")
+    parser.add_argument("--clicks", type=int, default=5, help="clicks timed per configuration; the median is shown (default: 5)")
+    clicks = parser.parse_args().clicks
+    # Keep the benchmark self-contained: no thumbnail downloads, no database
+    os.environ.setdefault("THUMBNAIL_CACHE_DIR", "")
+    os.environ.setdefault("RESULT_STORE_PATH", "")
+
+    print(f"{'results':>8} | {'full script rerun':>18} | {'fragment rerun':>15} | {'speedup':>7}")
+    for count in (10, 50):
+        full = rerun_seconds(count, clicks, fragment=False)
+        card = rerun_seconds(count, clicks, fragment=True)
+        print(f"{count:>8} | {full * 1000:>15.1f} ms | {card * 1000:>12.1f} ms | {full / card:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: end-to-end search latency and throughput against the mock API
+
+Runs each frontend's search path (the code behind its search button) many
+times from a pool of concurrent users, against the local mock YouTube API in
+src/mock_youtube_api.py, and reports p50/p95/p99 latency and throughput.
+No real API calls are made, so no quota is used.
+
+Two scenarios are measured per path:
+
+- cold: every search uses a new query, so each one goes to the API
+- cached: a small set of queries is repeated, so searches hit the caches
+
+Usage:
+    python scripts/benchmark_search.py [--requests 200] [--concurrency 8] [--latency 0.1]
+    python scripts/benchmark_search.py --api-url http://127.0.0.1:8800/   # an already running mock
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values"""
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def configure_environment(api_url):
+    # Module-level caches and budgets read these at import time
+    os.environ.update({
+        "YOUTUBE_API_URL": api_url,
+        "API_KEY": "benchmark-key",
+        "RESULT_STORE_PATH": "",
+        "THUMBNAIL_CACHE_DIR": "",
+        "QUOTA_STATE_FILE": "",
+        "QUOTA_DAILY_LIMIT": str(10 ** 12),
+        "QUOTA_PER_MINUTE": "",
+        "QUOTA_PER_SESSION": "",
+        # Measure the search path, not the per-key rate limit
+        "API_KEYS": "",
+        "API_KEY_RATE": "",
+        "API_KEY_DAILY_LIMIT": str(10 ** 12),
+    })
+
+
+def search_paths(max_results):
+    """Return {name: fn(query) -> number of results} for each frontend"""
+    import youtube_frontend
+    import youtube_frontend_deploy
+    import youtube_gradio
+    from youtube_client import get_client
+
+    # Calling Streamlit functions outside `streamlit run` logs a warning per call
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    youtube = get_client(os.environ["API_KEY"])
+
+    def deploy(query):
+        pages = youtube_frontend_deploy.search_youtube_video_pages(youtube, query, max_results=max_results)
+        return sum(len(page) for page in pages)
+
+    def frontend(query):
+        videos = youtube_frontend.search_youtube_videos(youtube, query, max_results=max_results)
+        return len(youtube_frontend.enrich_search_results(youtube, videos))
+
+    def gradio(query):
+        pool = None
+        for _, pool in youtube_gradio.search_youtube_videos(query, max_results):
+            pass
+        return len(pool['items']) if pool else 0
+
+    return {
+        "streamlit_app.py": deploy,
+        "youtube_frontend.py": frontend,
+        "youtube_gradio.py": gradio,
+    }
+
+
+def run_scenario(fn, queries, concurrency):
+    """Run fn over queries; return (latencies, failures, wall seconds)"""
+    def timed(query):
+        started = time.perf_counter()
+        try:
+            ok = fn(query) > 0
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, queries))
+    wall = time.perf_counter() - started
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok), wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search latency percentiles and throughput per frontend.")
+    parser.add_argument("--requests", type=int, default=200, help="searches per path and scenario (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent users (default: 8)")
+    parser.add_argument("--max-results", type=int, default=5, help="results per search; over 50 pages (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.1, help="mock API median latency in seconds (default: 0.1)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="mock API latency spread (default: 0.3)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock API calls that fail (default: 0)")
+    parser.add_argument("--api-url", help="use an already running mock API instead of starting one")
+    parser.add_argument("--paths", help="comma-separated subset of paths to run")
+    args = parser.parse_args()
+
+    api = None
+    if args.api_url:
+        api_url = args.api_url
+    else:
+        api = MockYouTubeAPI(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+        server = start_mock_server(api, port=0)
+        api_url = f"http://127.0.0.1:{server.server_port}/"
+    configure_environment(api_url)
+
+    paths = search_paths(args.max_results)
+    if args.paths:
+        paths = {name: paths[name] for name in args.paths.split(",")}
+
+    print(f"{args.requests} searches per row, {args.concurrency} concurrent, {args.max_results} results each, API at {api_url}")
+    print(f"{'path':<22} {'scenario':<8} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {'searches/s':>10} | {'failed':>6}")
+    for name, fn in paths.items():
+        scenarios = {
+            "cold": [f"{name} cold query {i}" for i in range(args.requests)],
+            # The first pass over the 10 queries fills the caches
+            "cached": [f"{name} cached query {i % 10}" for i in range(args.requests + 10)],
+        }
+        for scenario, queries in scenarios.items():
+            if scenario == "cached":
+                run_scenario(fn, queries[:10], args.concurrency)
+                queries = queries[10:]
+            latencies, failed, wall = run_scenario(fn, queries, args.concurrency)
+            print(
+                f"{name:<22} {scenario:<8} | "
+                + " | ".join(f"{percentile(latencies, pct) * 1000:>6.1f} ms" for pct in (50, 95, 99))
+                + f" | {len(queries) / wall:>10.1f} | {failed:>6}"
+            )
+
+    from youtube_retry import retry_stats
+    print(f"Client retries: {retry_stats()}")
+    if api is not None:
+        print(f"Mock API calls: {api.stats()}")
+
+
+if __name__ == "__main__":
+    main()
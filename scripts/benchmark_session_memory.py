@@ -0,0 +1,104 @@
+"""
+Benchmark: memory held by search results in per-session state
+
+Every Streamlit session keeps its search results in st.session_state (and
+every Gradio session in a gr.State). This measures what 1,000 concurrent
+sessions holding 50 results each cost when the results are kept as the raw,
+enriched API dicts versus as VideoResults, using tracemalloc. Each session
+gets its own query and its own parsed copy of the responses, as with real
+traffic; the results come from the local mock API, so no quota is used.
+
+The mock's descriptions are short (~130 characters); real ones often run to
+thousands, which the raw dicts keep in full and VideoResult cuts to the
+200-character preview.
+
+It also counts the show_video_* player flags a session accumulates over a
+series of searches with and without pruning.
+
+Usage:
+    python scripts/benchmark_session_memory.py [--sessions 1000] [--results 50]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from mock_youtube_api import MockYouTubeAPI
+from video_result import PLAYER_KEY_PREFIX, prune_players, to_results
+
+
+def session_payloads(api, sessions, results):
+    """Return one JSON-encoded, enriched result list per session (as the API would send it)"""
+    payloads = []
+    for i in range(sessions):
+        items = api.search({"q": f"session memory query {i}", "maxResults": str(results)})["items"]
+        ids = ",".join(item["id"]["videoId"] for item in items)
+        details = {video["id"]: video for video in api.videos({"id": ids, "part": "statistics,contentDetails"})["items"]}
+        # Same merge as enrich_videos()
+        enriched = [
+            dict(item, **{part: details[item["id"]["videoId"]][part] for part in ("statistics", "contentDetails")})
+            for item in items
+        ]
+        payloads.append(json.dumps(enriched))
+    return payloads
+
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def player_flags(searches, plays, results, prune):
+    """Count show_video_* flags left after searches, each playing `plays` of its results"""
+    api = MockYouTubeAPI(seed=2)
+    state = {}
+    for i in range(searches):
+        videos = to_results(api.search({"q": f"player query {i}", "maxResults": str(results)})["items"])
+        if prune:
+            prune_players(state, videos)
+        for video in videos[:plays]:
+            state[f"{PLAYER_KEY_PREFIX}{video.video_id}"] = True
+    return len(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-session result memory: raw API dicts vs VideoResult.")
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent sessions (default: 1000)")
+    parser.add_argument("--results", type=int, default=50, help="results held per session (default: 50)")
+    args = parser.parse_args()
+
+    payloads = session_payloads(MockYouTubeAPI(seed=1), args.sessions, args.results)
+
+    tracemalloc.start()
+    baseline = traced_bytes()
+    raw = [json.loads(payload) for payload in payloads]
+    raw_bytes = traced_bytes() - baseline
+    # VideoResults share strings with the dicts they came from, so measure once those are gone
+    compact = [to_results(items) for items in raw]
+    del raw
+    compact_bytes = traced_bytes() - baseline
+    tracemalloc.stop()
+    del compact
+
+    videos = args.sessions * args.results
+    print(f"{args.sessions} sessions x {args.results} results ({videos:,} videos)")
+    print(f"{'representation':<18} | {'total':>9} | {'per session':>11} | {'per video':>9}")
+    for name, size in (("raw API dicts", raw_bytes), ("VideoResult", compact_bytes)):
+        print(f"{name:<18} | {size / 2**20:>6.1f} MB | {size / args.sessions / 1024:>8.1f} KB | {size / videos:>7.0f} B")
+    print(f"VideoResult holds {raw_bytes / compact_bytes:.1f}x less")
+
+    searches, plays = 20, 3
+    print(
+        f"Player flags after {searches} searches playing {plays} videos each: "
+        f"{player_flags(searches, plays, args.results, prune=False)} without pruning, "
+        f"{player_flags(searches, plays, args.results, prune=True)} with"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark: cold start of each entry point
+
+Starts every entry point in a fresh Python process, several times, and reports
+the median of:
+
+- import: time to import the entry module (and everything it pulls in)
+- first render: from process start until the first page is fully drawn
+- first result: first render plus the time from clicking search until the
+  first results are shown, after the user spent --think seconds typing
+
+Streamlit apps are driven with Streamlit's AppTest harness; the Gradio app is
+launched on a local port and fetched once, then its search handler is called.
+API calls are answered in-process with canned responses after --latency
+seconds, so no network access or quota is needed, but the real client build
+and request path are exercised.
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--latency 0.1] [--think 1.0]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC = os.path.join(ROOT, 'src')
+
+ENTRY_POINTS = {
+    "streamlit_app.py": ("streamlit_app", os.path.join(ROOT, "streamlit_app.py")),
+    "youtube_frontend.py": ("youtube_frontend", os.path.join(SRC, "youtube_frontend.py")),
+    "youtube_gradio.py": ("youtube_gradio", None),
+}
+
+QUERY = "startup benchmark"
+
+
+def _search_response(count=5):
+    return {
+        "items": [
+            {
+                "id": {"kind": "youtube#video", "videoId": f"start{i:06d}"},
+                "snippet": {
+                    "title": f"Startup video {i}",
+                    "channelTitle": "Benchmark channel",
+                    "publishedAt": "2024-05-01T10:00:00Z",
+                    "description": "A canned search result.",
+                    "thumbnails": {"medium": {"url": f"https://i.ytimg.com/vi/start{i:06d}/mqdefault.jpg"}},
+                },
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def _videos_response(uri):
+    from urllib.parse import parse_qs, urlparse
+    ids = parse_qs(urlparse(uri).query).get("id", [""])[0].split(",")
+    return {
+        "items": [
+            {
+                "id": video_id,
+                "statistics": {"viewCount": "1000", "likeCount": "10"},
+                "contentDetails": {"duration": "PT3M5S"},
+            }
+            for video_id in ids if video_id
+        ]
+    }
+
+
+class CannedHttp:
+    """Stand-in for httplib2.Http that answers search/videos calls after a delay"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        import httplib2
+        time.sleep(self.latency)
+        path = uri.split("?", 1)[0]
+        payload = _videos_response(uri) if path.endswith("/videos") else _search_response()
+        return httplib2.Response({"status": "200", "content-type": "application/json"}), json.dumps(payload).encode()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _install_canned_api(latency):
+    import youtube_client
+    http = CannedHttp(latency)
+    youtube_client._thread_http = lambda: http
+
+
+def _child_streamlit(module, path, started, args):
+    import importlib
+    before = time.time()
+    importlib.import_module(module)
+    imported = time.time()
+    _install_canned_api(args.latency)
+
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(path, default_timeout=120)
+    at.run()
+    rendered = time.time()
+
+    time.sleep(args.think)
+    at.text_input[0].input(QUERY)
+    next(b for b in at.button if "Search Videos" in b.label).click()
+    clicked = time.time()
+    at.run()
+    searched = time.time()
+    if at.exception or not any(m.value.startswith(("✅", "Found")) for m in at.success):
+        raise RuntimeError("search did not render results")
+    return imported - before, rendered - started, rendered - started + searched - clicked
+
+
+def _child_gradio(started, args):
+    before = time.time()
+    import youtube_gradio
+    imported = time.time()
+    _install_canned_api(args.latency)
+
+    port = _free_port()
+    demo = youtube_gradio.create_interface()
+    demo.launch(server_name="127.0.0.1", server_port=port, prevent_thread_lock=True, quiet=True)
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=60) as response:
+        response.read()
+    rendered = time.time()
+    # What the page's load event does once the browser has the page
+    youtube_gradio.warm_up()
+
+    time.sleep(args.think)
+    clicked = time.time()
+    first, _ = next(youtube_gradio.search_youtube_videos(QUERY, 5))
+    searched = time.time()
+    demo.close()
+    if "Startup video" not in first:
+        raise RuntimeError("search did not return results")
+    return imported - before, rendered - started, rendered - started + searched - clicked
+
+
+def child(args):
+    started = args.started
+    sys.path.insert(0, SRC)
+    sys.path.insert(0, ROOT)
+    module, path = ENTRY_POINTS[args.child]
+    if path is None:
+        timings = _child_gradio(started, args)
+    else:
+        timings = _child_streamlit(module, path, started, args)
+    print(json.dumps(dict(zip(("import", "render", "result"), timings))))
+
+
+def measure(entry, args):
+    env = dict(
+        os.environ,
+        API_KEY="benchmark-key",
+        RESULT_STORE_PATH="",
+        THUMBNAIL_CACHE_DIR="",
+        QUOTA_STATE_FILE="",
+        GRADIO_ANALYTICS_ENABLED="False",
+    )
+    command = [
+        sys.executable, __file__, "--child", entry,
+        "--latency", str(args.latency), "--think", str(args.think),
+        "--started", repr(time.time()),
+    ]
+    out = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start times of the app entry points.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated API round trip in seconds")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between first render and search")
+    parser.add_argument("--child", choices=list(ENTRY_POINTS), help=argparse.SUPPRESS)
+    parser.add_argument("--started", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{'entry point':<22} | {'import':>9} | {'first render':>12} | {'first result':>12}")
+    for entry in ENTRY_POINTS:
+        runs = [measure(entry, args) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) for key in ("import", "render", "result")}
+        print(
+            f"{entry:<22} | {median['import'] * 1000:>6.0f} ms | {median['render'] * 1000:>9.0f} ms"
+            f" | {median['result'] * 1000:>9.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
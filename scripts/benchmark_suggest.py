@@ -0,0 +1,99 @@
+"""
+Benchmark: search-as-you-type suggestion latency and how often a suggestion is a cache hit
+
+Fills the search cache with searches against the local mock YouTube API, then
+builds the suggestion index (query_suggest.py) over the cached queries and
+result titles and types each query character by character, as the frontends
+ask for suggestions on every keystroke. Reports the index build time, the
+per-keystroke lookup latency, and, for the same queries typed with a typo in
+the last long word, how often the query meant is suggested and cached. No API
+call is made while suggesting; the script checks that. No quota is used.
+
+Usage:
+    python scripts/benchmark_suggest.py [--queries 500] [--max-results 50]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark_search import configure_environment, percentile
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+
+TOPICS = (
+    "machine learning", "cooking", "guitar", "python", "piano", "yoga", "chess", "photography",
+    "gardening", "astronomy", "woodworking", "drawing", "physics", "spanish", "baking", "running",
+)
+KINDS = ("tutorial", "for beginners", "tips", "explained", "course", "live", "review", "history")
+EXTRAS = ("", "2025", "advanced", "quick", "easy", "at home", "in 10 minutes", "step by step")
+
+
+def typo(query, rng):
+    """Return query with two adjacent characters of its last long word swapped"""
+    words = query.split(" ")
+    at = max(i for i, word in enumerate(words) if len(word) >= 4 or i == 0)
+    word = words[at]
+    if len(word) >= 4:
+        i = rng.randrange(1, len(word) - 2)
+        words[at] = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search-as-you-type suggestion latency.")
+    parser.add_argument("--queries", type=int, default=500, help="searches in the cache, up to 1024 (default: 500)")
+    parser.add_argument("--max-results", type=int, default=50, help="results per cached search (default: 50)")
+    args = parser.parse_args()
+
+    api = MockYouTubeAPI()
+    server = start_mock_server(api, port=0)
+    configure_environment(f"http://127.0.0.1:{server.server_port}/")
+    os.environ["SEARCH_CACHE_SIZE"] = str(args.queries + 16)
+
+    from query_suggest import build_index, suggest
+    from youtube_api import search_videos
+    from youtube_client import get_client
+    youtube = get_client(os.environ["API_KEY"])
+
+    rng = random.Random(0)
+    searches = [f"{topic} {kind} {extra}".strip() for topic in TOPICS for kind in KINDS for extra in EXTRAS]
+    queries = rng.sample(searches, min(args.queries, len(searches)))
+    for query in queries:
+        search_videos(youtube, query, max_results=args.max_results)
+
+    started = time.perf_counter()
+    index = build_index()
+    build = time.perf_counter() - started
+    print(f"{len(queries)} cached searches, {args.max_results} results each: index of {len(index):,} texts, "
+          f"{len(index._keys):,} keys, built in {build * 1000:.0f} ms")
+
+    calls = dict(api.stats()["requests"])
+    suggest("warm up", max_results=args.max_results)
+    timings = []
+    for query in queries:
+        for end in range(1, len(query) + 1):
+            started = time.perf_counter()
+            suggest(query[:end], max_results=args.max_results)
+            timings.append(time.perf_counter() - started)
+
+    found = cached = 0
+    for query in queries:
+        suggestions = suggest(typo(query, rng), max_results=args.max_results)
+        hit = next((suggestion for suggestion in suggestions if suggestion['query'] == query), None)
+        found += hit is not None
+        cached += bool(hit and hit['cached'])
+
+    print(f"{len(timings):,} keystrokes: p50 {statistics.median(timings) * 1000:.3f} ms, "
+          f"p95 {percentile(timings, 95) * 1000:.3f} ms, p99 {percentile(timings, 99) * 1000:.3f} ms")
+    print(f"typo in the last long word: query meant suggested {found / len(queries):.0%}, "
+          f"as a cache hit {cached / len(queries):.0%}")
+    print(f"API calls while suggesting: {sum(api.stats()['requests'].values()) - sum(calls.values())}")
+
+
+if __name__ == "__main__":
+    main()
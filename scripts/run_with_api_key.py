@@ -14,7 +14,7 @@ def main():
         print("3. Enable YouTube Data API v3")
         print("4. Create credentials (API key)")
         print("5. Replace the placeholder in this script")
-        return
+        return 1
     
     # Set the environment variable
     os.environ["API_KEY"] = api_key
@@ -22,10 +22,16 @@ def main():
     # Import and run the test
     try:
         import youtube_search
-        print("YouTube API search completed successfully!")
+        status = youtube_search.main(["theory of relativity"])
     except Exception as e:
         print(f"Error: {e}")
         print("Make sure your API key is valid and the YouTube Data API v3 is enabled.")
+        return 1
+    if status == 0:
+        print("YouTube API search completed successfully!")
+    else:
+        print("YouTube API search failed; see the messages above.")
+    return status
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Background cache warmer for the searches people are most likely to run
+
+The landing page suggests a handful of example searches, and most traffic is
+a small set of popular queries. The warmer fetches them (with the frontends'
+default filters, so the cache keys match) at startup and then every
+WARM_INTERVAL seconds, and keeps each result cached until the next run. The
+first visitor to click an example gets a cache hit instead of a cold API call.
+
+The query list is the examples (or WARM_QUERIES, comma-separated; set it empty
+to warm nothing but popular queries) plus the WARM_TOP_QUERIES most frequent
+searches of the last week from the result store's search log.
+
+Warming spends quota nobody asked for, so it is off unless WARM_INTERVAL is
+set. It is only worth it while quota is plentiful: a run stops as soon as
+fewer than WARM_RESERVE (a share of the daily budget) units would be left.
+Its calls are charged to their own session, so QUOTA_PER_SESSION caps it too.
+"""
+
+import os
+import threading
+
+from youtube_api import refresh_search
+from youtube_client import get_client
+from youtube_enrich import enrich_videos
+from youtube_quota import QuotaExhausted, ledger
+from youtube_store import top_queries
+
+# The example searches shown on the landing page
+EXAMPLE_QUERIES = [
+    "machine learning tutorial",
+    "easy cooking recipes",
+    "relaxing music",
+    "space exploration",
+    "programming for beginners",
+    "digital art techniques",
+]
+
+# One warm run costs ~102 units per query (search.list, videos.list and
+# channels.list): the 6 examples plus 5 popular queries are ~1,120 units, so
+# every 12 hours (43200) spends ~22% of a 10,000 unit daily quota. 0 disables it
+WARM_INTERVAL = float(os.getenv("WARM_INTERVAL", "0"))
+WARM_TOP_QUERIES = int(os.getenv("WARM_TOP_QUERIES", "5"))
+WARM_RESERVE = float(os.getenv("WARM_RESERVE", "0.5"))
+# Matches the "Number of results" default of the Streamlit frontends
+WARM_MAX_RESULTS = int(os.getenv("WARM_MAX_RESULTS", "5"))
+# Quota session the warmer's calls are charged to
+WARM_SESSION = "cache-warmer"
+
+
+def warm_queries():
+    """Return the configured queries followed by the most popular logged ones, without duplicates"""
+    configured = os.getenv("WARM_QUERIES")
+    queries = EXAMPLE_QUERIES if configured is None else configured.split(",")
+    queries = [" ".join(query.lower().split()) for query in queries]
+    try:
+        queries += top_queries(WARM_TOP_QUERIES)
+    except Exception:
+        # A broken or locked store only costs us the popular queries
+        pass
+    return list(dict.fromkeys(query for query in queries if query))
+
+
+class CacheWarmer:
+    """Refreshes a list of searches in the background on a fixed interval"""
+
+    def __init__(self, api_key, interval=WARM_INTERVAL, queries=warm_queries, max_results=WARM_MAX_RESULTS, reserve=WARM_RESERVE, **options):
+        self.api_key = api_key
+        self.options = options
+        self.interval = interval
+        self.queries = queries
+        self.max_results = max_results
+        self.reserve = reserve
+        self._stop = threading.Event()
+        self._thread = None
+        self.runs = 0
+        self.warmed = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def warm_once(self):
+        """Refresh every query the quota allows; return how many were warmed"""
+        youtube = get_client(self.api_key)
+        # Cached until the next run, plus slack for a slow run
+        ttl = self.interval * 1.1
+        reserve = int(ledger.daily_limit * self.reserve)
+        queries = self.queries()
+        warmed = 0
+        for i, query in enumerate(queries):
+            if self._stop.is_set():
+                break
+            if not ledger.can_spend("search.list", WARM_SESSION, reserve=reserve):
+                # Leave what is left of the quota to real users
+                self.skipped += len(queries) - i
+                break
+            try:
+                items = refresh_search(youtube, query, max_results=self.max_results, ttl=ttl, session=WARM_SESSION, **self.options)
+                enrich_videos(youtube, items, WARM_SESSION)
+            except QuotaExhausted:
+                self.skipped += len(queries) - i
+                break
+            except Exception:
+                self.failed += 1
+                continue
+            warmed += 1
+        self.warmed += warmed
+        self.runs += 1
+        return warmed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.warm_once()
+            except Exception:
+                # e.g. the client cannot be built yet; try again next interval
+                self.failed += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start warming on a daemon thread (once)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="youtube-cache-warmer", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "warmed": self.warmed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "interval": self.interval,
+        }
+
+
+_lock = threading.Lock()
+_warmer = None
+
+
+def start_cache_warmer(api_key, **options):
+    """Start the process-wide cache warmer for api_key; no-op if disabled or already running
+
+    options are the search filters the frontend uses by default (see
+    build_search_params()).
+    """
+    global _warmer
+    if not api_key or WARM_INTERVAL <= 0:
+        return None
+    with _lock:
+        if _warmer is None:
+            _warmer = CacheWarmer(api_key, **options)
+            _warmer.start()
+    return _warmer
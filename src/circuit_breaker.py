@@ -0,0 +1,99 @@
+"""
+Thread-safe circuit breaker
+
+After `failure_threshold` consecutive failures the breaker opens and calls fail
+fast with CircuitOpenError instead of adding load to an upstream that is
+already struggling. After `reset_timeout` seconds one trial call is let
+through (half-open): if it succeeds the breaker closes again, otherwise it
+stays open for another `reset_timeout`.
+"""
+
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that the breaker considers down"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable; not retrying for another {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial -> closed"""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+        self.rejected = 0
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_in = max(self.reset_timeout - (now - self._opened_at), 0.0)
+            raise CircuitOpenError(self.name, retry_in)
+
+    def release(self):
+        """Give back a call slot that before_call() granted but was never used"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._failures += 1
+            if state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = now
+                self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current_state(self._clock()),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,278 @@
+"""
+Low-overhead metrics in the Prometheus text exposition format
+
+Hot paths record into a handful of in-process counters and histograms:
+recording is a bisect plus two additions under a lock (about a microsecond),
+so it stays on in production. Cache, quota and retry numbers that the other
+modules already keep are read only when the metrics are rendered.
+
+render() returns the text format. start_metrics_exporter() serves it on
+http://127.0.0.1:METRICS_PORT/metrics and/or rewrites METRICS_FILE every
+METRICS_INTERVAL seconds (for node_exporter's textfile collector or any local
+scraper). Both are off unless configured.
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; covers everything from a cache hit to a timed-out API call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0") or 0)
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "15"))
+
+_metrics = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{value}"' for name, value in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        _metrics.append(self)
+
+    def observe(self, seconds, *labels):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    def time(self, *labels):
+        """Context manager that observes the time spent in its block"""
+        return _Timer(self, labels)
+
+    def count(self, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series else 0
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = (("le", _number(bound)),)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def register_collector(collect):
+    """Add a callable returning exposition lines, run on every render()"""
+    _collectors.append(collect)
+    return collect
+
+
+def gauge_lines(name, documentation, samples, kind="gauge", labelnames=()):
+    """Format [(label values, value)] as one metric family"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+    return lines
+
+
+stage_seconds = Histogram(
+    "youtube_stage_seconds",
+    "Time spent in each stage of serving a search",
+    ("stage",),
+)
+api_calls = Counter("youtube_api_calls_total", "API call attempts sent, by method", ("method",))
+api_errors = Counter("youtube_api_errors_total", "Failed API call attempts, by method and error reason", ("method", "reason"))
+planner_searches = Counter(
+    "youtube_planner_searches_total", "Searches by where the query planner answered them from (pool or api)", ("source",)
+)
+
+
+@register_collector
+def _cache_metrics():
+    from youtube_cache import channel_cache, search_cache, video_cache
+    stats = {"search": search_cache.stats(), "video": video_cache.stats(), "channel": channel_cache.stats()}
+    lines = []
+    for field, kind, documentation in (
+        ("hits", "counter", "Cache lookups answered from the cache"),
+        ("misses", "counter", "Cache lookups that missed"),
+        ("stale_hits", "counter", "Expired entries served while the API was failing"),
+        ("evictions", "counter", "Entries evicted to stay under maxsize"),
+        ("hit_ratio", "gauge", "Share of lookups answered from the cache"),
+        ("size", "gauge", "Entries currently cached"),
+    ):
+        name = f"youtube_cache_{field}" + ("_total" if kind == "counter" else "")
+        samples = [((cache,), cache_stats[field]) for cache, cache_stats in stats.items()]
+        lines += gauge_lines(name, documentation, samples, kind, ("cache",))
+    return lines
+
+
+@register_collector
+def _quota_metrics():
+    from youtube_quota import ledger
+    stats = ledger.stats()
+    lines = gauge_lines("youtube_quota_used_units", "Quota units spent today", [((), stats["used"])])
+    lines += gauge_lines("youtube_quota_limit_units", "Daily quota budget", [((), stats["daily_limit"])])
+    lines += gauge_lines(
+        "youtube_quota_used_by_method_units", "Quota units spent today, by method",
+        sorted(((method,), used) for method, used in stats["by_method"].items()), labelnames=("method",)
+    )
+    lines += gauge_lines("youtube_quota_denied_total", "Calls refused by the local quota budget", [((), stats["denied"])], "counter")
+    return lines
+
+
+@register_collector
+def _retry_metrics():
+    from youtube_retry import retry_stats
+    stats = retry_stats()
+    lines = gauge_lines("youtube_api_retries_total", "Retried API call attempts", [((), stats["retries"])], "counter")
+    lines += gauge_lines("youtube_api_short_circuited_total", "Calls failed fast by the circuit breaker", [((), stats["short_circuited"])], "counter")
+    lines += gauge_lines(
+        "youtube_api_breaker_open", "1 while the circuit breaker is not closed",
+        [((), int(stats["breaker"]["state"] != "closed"))]
+    )
+    return lines
+
+
+def render():
+    """Return every metric in the Prometheus text format"""
+    lines = []
+    for metric in _metrics:
+        lines += metric.collect()
+    for collect in _collectors:
+        try:
+            lines += collect()
+        except Exception:
+            # One broken source must not hide the others
+            continue
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    """Atomically replace path with the current metrics"""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(temporary, path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_lock = threading.Lock()
+_exporter = {}
+
+
+def _write_loop(path, interval):
+    while True:
+        try:
+            write_metrics(path)
+        except OSError:
+            pass
+        time.sleep(interval)
+
+
+def start_metrics_exporter(port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_INTERVAL):
+    """Serve /metrics on port and/or keep path up to date (each once per process)"""
+    with _lock:
+        if port and "server" not in _exporter:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+            except OSError:
+                # Another app process already serves this port
+                server = None
+            if server is not None:
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            _exporter["server"] = server
+        if path and "writer" not in _exporter:
+            writer = threading.Thread(target=_write_loop, args=(path, interval), name="metrics-file", daemon=True)
+            writer.start()
+            _exporter["writer"] = writer
+    return _exporter.get("server")
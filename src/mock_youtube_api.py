@@ -0,0 +1,625 @@
+"""
+Local stand-in for the YouTube Data API v3, for benchmarks and load tests
+
+Implements search.list, videos.list and channels.list over HTTP with payloads
+shaped and sized like the real API's, nextPageToken paging, configurable
+latency, injectable errors and an optional daily quota per API key.
+Responses are generated deterministically from the request, so the same
+query always returns the same videos and videos.list/channels.list agree
+with what search.list returned.
+
+The search filters videoDuration, videoDefinition, publishedAfter and
+publishedBefore pick from one fixed ranking per query, so a narrower search
+returns exactly the wider one's matching videos in the same order. That is
+an approximation: it is what the query planner (query_planner.py) assumes of
+the real API, not something the real API documents or guarantees, so the
+planner's benchmark against this mock measures the calls saved when the
+assumption holds and cannot show whether it does.
+
+With order=date, each query has a fixed upload timeline (one video every
+upload_interval seconds), so later calls see new videos on top of the same
+older ones, as with the real API. Partial responses (the fields parameter),
+gzip transfer encoding and multipart batch requests (POST /batch) work as
+in the real API; a batch costs one latency delay, and the bytes sent are
+counted per method.
+
+No quota is spent: point the app at the server with
+
+    python src/mock_youtube_api.py --port 8800 --latency 0.12 --error-rate 0.01
+    YOUTUBE_API_URL=http://127.0.0.1:8800/ API_KEY=mock streamlit run streamlit_app.py
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from email.parser import BytesParser
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_ID_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+# The first two characters of a mock video ID record its duration bucket and
+# definition, so videos.list can answer consistently with the search filters.
+_DURATION_RANGES = {"S": (20, 239), "M": (240, 1199), "L": (1200, 7200)}
+_DURATION_CODES = {"short": "S", "medium": "M", "long": "L"}
+_DEFINITION_CODES = {"high": "H", "standard": "D"}
+
+# Where the order=date upload timelines start
+_TIMELINE_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+# Publish dates of the videos in other orders: [start, start + span)
+_RANKING_START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+_RANKING_SPAN = timedelta(days=4 * 365)
+
+_WORDS = (
+    "tutorial guide explained review beginners advanced tips tricks live session "
+    "highlights documentary lecture introduction complete course deep dive update "
+    "challenge reaction analysis history science music relaxing easy quick best"
+).split()
+
+# reason -> (HTTP status, error domain, message), as returned by the real API
+ERRORS = {
+    "backendError": (500, "global", "Backend Error"),
+    "serviceUnavailable": (503, "global", "The service is currently unavailable."),
+    "rateLimitExceeded": (403, "youtube.quota", "The request cannot be completed because you have exceeded your rate limit."),
+    "quotaExceeded": (403, "youtube.quota", "The request cannot be completed because you have exceeded your quota."),
+    "timeout": (None, None, None),
+}
+
+DEFAULT_ERRORS = ("backendError", "serviceUnavailable", "rateLimitExceeded")
+
+
+def _seeded(*parts):
+    return random.Random(zlib.crc32("\x1f".join(str(part) for part in parts).encode("utf-8")))
+
+
+def _random_id(rng, length):
+    return "".join(rng.choice(_ID_CHARS) for _ in range(length))
+
+
+def _iso(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_time(value, default):
+    if not value:
+        return default
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return default
+
+
+def _etag(payload):
+    return base64.urlsafe_b64encode(hashlib.sha1(payload.encode("utf-8")).digest()).decode("ascii")[:27]
+
+
+def parse_fields(mask):
+    """Parse a partial response mask such as "items(id,snippet/title)" into {name: subtree or None}"""
+    tree, rest = _parse_field_list(mask.replace(" ", ""))
+    if rest:
+        raise ValueError(f"Unexpected {rest[0]!r} in fields")
+    return tree
+
+
+def _parse_field_list(text):
+    tree = {}
+    while True:
+        name, subtree, text = _parse_field(text)
+        tree[name] = _merge_fields(tree[name], subtree) if name in tree else subtree
+        if text[:1] != ",":
+            return tree, text
+        text = text[1:]
+
+
+def _merge_fields(left, right):
+    # None selects the whole field, which covers any sub-selection
+    if left is None or right is None:
+        return None
+    merged = dict(left)
+    for name, subtree in right.items():
+        merged[name] = _merge_fields(merged[name], subtree) if name in merged else subtree
+    return merged
+
+
+def _parse_field(text):
+    """Parse one name, a/b path or name(sub,fields); return (name, subtree, rest of text)"""
+    name = ""
+    while text and text[0] not in ",()/":
+        name, text = name + text[0], text[1:]
+    if not name:
+        raise ValueError("Empty field name in fields")
+    if text[:1] == "/":
+        child, subtree, text = _parse_field(text[1:])
+        return name, {child: subtree}, text
+    if text[:1] == "(":
+        subtree, text = _parse_field_list(text[1:])
+        if text[:1] != ")":
+            raise ValueError("Unbalanced parentheses in fields")
+        return name, subtree, text[1:]
+    return name, None, text
+
+
+def select_fields(payload, tree):
+    """Keep only the parts of payload selected by a parse_fields() tree"""
+    if tree is None:
+        return payload
+    if isinstance(payload, list):
+        return [select_fields(value, tree) for value in payload]
+    if not isinstance(payload, dict):
+        return payload
+    return {name: select_fields(payload[name], subtree) for name, subtree in tree.items() if name in payload}
+
+
+def _thumbnails(base):
+    return {
+        "default": {"url": f"{base}/default.jpg", "width": 120, "height": 90},
+        "medium": {"url": f"{base}/mqdefault.jpg", "width": 320, "height": 180},
+        "high": {"url": f"{base}/hqdefault.jpg", "width": 480, "height": 360},
+    }
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+def encode_page_token(offset):
+    return base64.urlsafe_b64encode(f"CAUQ{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("ascii")
+    except ValueError:
+        return None
+    if not raw.startswith("CAUQ") or not raw[4:].isdigit():
+        return None
+    return int(raw[4:])
+
+
+class MockApiError(Exception):
+    def __init__(self, status, reason, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+    def payload(self):
+        domain = ERRORS.get(self.reason, (None, "global", None))[1] or "global"
+        return {
+            "error": {
+                "code": self.status,
+                "message": self.message,
+                "errors": [{"message": self.message, "domain": domain, "reason": self.reason}],
+            }
+        }
+
+
+class MockYouTubeAPI:
+    """Deterministic response generator with latency and error injection"""
+
+    def __init__(self, latency=0.0, jitter=0.3, error_rate=0.0, errors=DEFAULT_ERRORS,
+                 results_per_query=500, hang_seconds=30.0, seed=0, quota_per_key=None, upload_interval=3600.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = tuple(errors)
+        self.results_per_query = results_per_query
+        self.hang_seconds = hang_seconds
+        self.seed = seed
+        self.quota_per_key = quota_per_key
+        self.upload_interval = upload_interval
+        self.key_usage = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.injected = {}
+        self.bytes_sent = {}
+        self.http_requests = 0
+        self.batched_calls = 0
+
+    def _count(self, counter, key):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + 1
+
+    def count_http_request(self):
+        with self._lock:
+            self.http_requests += 1
+
+    def count_batched_call(self):
+        with self._lock:
+            self.batched_calls += 1
+
+    def record_bytes(self, method, size):
+        with self._lock:
+            self.bytes_sent[method] = self.bytes_sent.get(method, 0) + size
+
+    def delay(self):
+        """Seconds to wait before answering: log-normal around the configured latency"""
+        if self.latency <= 0:
+            return 0.0
+        with self._lock:
+            return self.latency * self._rng.lognormvariate(0, self.jitter)
+
+    def pick_error(self):
+        """Return an error reason to inject for this request, or None"""
+        if self.error_rate <= 0 or not self.errors:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            return self._rng.choice(self.errors)
+
+    def _charge_key(self, method, key):
+        # Like the real API, every call (including failed ones) costs quota
+        cost = 100 if method == "search" else 1
+        with self._lock:
+            used = self.key_usage.get(key, 0)
+            if self.quota_per_key is not None and used + cost > self.quota_per_key:
+                return False
+            self.key_usage[key] = used + cost
+            return True
+
+    def handle(self, method, params):
+        """Answer one API call: return the response payload or raise MockApiError"""
+        self._count(self.requests, method)
+        if not self._charge_key(method, params.get("key", "")):
+            self._count(self.injected, "quotaExceeded")
+            status, _, message = ERRORS["quotaExceeded"]
+            raise MockApiError(status, "quotaExceeded", message)
+        reason = self.pick_error()
+        if reason is not None:
+            self._count(self.injected, reason)
+            if reason == "timeout":
+                time.sleep(self.hang_seconds)
+            else:
+                status, _, message = ERRORS[reason]
+                raise MockApiError(status, reason, message)
+
+        try:
+            fields = parse_fields(params["fields"]) if params.get("fields") else None
+        except ValueError as e:
+            raise MockApiError(400, "invalidParameter", f"Invalid field selection: {e}")
+        if method == "search":
+            payload = self.search(params)
+        elif method == "videos":
+            payload = self.videos(params)
+        elif method == "channels":
+            payload = self.channels(params)
+        else:
+            raise MockApiError(404, "notFound", f"Method not found: {method}")
+        return select_fields(payload, fields)
+
+    def _video_id(self, params, index):
+        rng = _seeded(self.seed, "video", params.get("q", ""), params.get("order", ""), index)
+        duration = _DURATION_CODES.get(params.get("videoDuration")) or rng.choice("SML")
+        definition = _DEFINITION_CODES.get(params.get("videoDefinition")) or rng.choice("HHHD")
+        return duration + definition + _random_id(rng, 9)
+
+    def _ranking(self, params):
+        """Yield (video_id, published) for a query's fixed ranking, skipping videos the filters exclude"""
+        rng = _seeded(self.seed, "ranking", params.get("q", ""), params.get("order", ""))
+        duration = _DURATION_CODES.get(params.get("videoDuration"))
+        definition = _DEFINITION_CODES.get(params.get("videoDefinition"))
+        after = _parse_time(params.get("publishedAfter"), None)
+        before = _parse_time(params.get("publishedBefore"), None)
+        for _ in range(self.results_per_query):
+            video_id = rng.choice("SML") + rng.choice("HHHD") + _random_id(rng, 9)
+            published = _RANKING_START + timedelta(seconds=int(rng.random() * _RANKING_SPAN.total_seconds()))
+            if duration and video_id[0] != duration or definition and video_id[1] != definition:
+                continue
+            if after and published < after or before and published > before:
+                continue
+            yield video_id, published
+
+    def _channel_id(self, rng):
+        return "UC" + _random_id(rng, 22)
+
+    def search(self, params):
+        query = params.get("q", "")
+        page_size = int(params.get("maxResults", 5))
+        if not 0 <= page_size <= 50:
+            raise MockApiError(400, "invalidMaxResults", "Invalid value for maxResults: must be between 0 and 50.")
+        token = params.get("pageToken")
+        offset = 0
+        if token:
+            offset = decode_page_token(token)
+            if offset is None:
+                raise MockApiError(400, "invalidPageToken", "The request specifies an invalid page token.")
+
+        query_rng = _seeded(self.seed, "query", query)
+        channels = [(self._channel_id(query_rng), f"{_sentence(query_rng, 2)} Channel") for _ in range(12)]
+
+        if params.get("order") == "date":
+            # Newest first from the query's upload timeline: slot k is published
+            # k upload intervals after _TIMELINE_START and always has the same ID
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            after = _parse_time(params.get("publishedAfter"), _TIMELINE_START)
+            before = min(_parse_time(params.get("publishedBefore"), now), now)
+            newest = int((before - _TIMELINE_START).total_seconds() // self.upload_interval)
+            oldest = max(math.ceil((after - _TIMELINE_START).total_seconds() / self.upload_interval), 0)
+            total = min(max(newest - oldest + 1, 0), self.results_per_query)
+            page = [
+                (self._video_id(params, newest - index),
+                 _TIMELINE_START + timedelta(seconds=(newest - index) * self.upload_interval))
+                for index in range(offset, min(offset + page_size, total))
+            ]
+            more = offset + page_size < total
+        else:
+            # Other orders filter one fixed ranking per query, so a narrower
+            # search returns a subset of a wider one, in the same order
+            matches = list(itertools.islice(self._ranking(params), offset + page_size + 1))
+            page = matches[offset:offset + page_size]
+            more = len(matches) > offset + page_size
+
+        items = []
+        for video_id, published in page:
+            rng = _seeded(self.seed, "snippet", video_id)
+            channel_id, channel_title = rng.choice(channels)
+            title = f"{query.title()} - {_sentence(rng, rng.randint(3, 8))}"
+            snippet = {
+                "publishedAt": _iso(published),
+                "channelId": channel_id,
+                "title": title,
+                "description": _sentence(rng, rng.randint(15, 25))[:160],
+                "thumbnails": _thumbnails(f"https://i.ytimg.com/vi/{video_id}"),
+                "channelTitle": channel_title,
+                "liveBroadcastContent": "none",
+                "publishTime": _iso(published),
+            }
+            items.append({
+                "kind": "youtube#searchResult",
+                "etag": _etag(video_id + title),
+                "id": {"kind": "youtube#video", "videoId": video_id},
+                "snippet": snippet,
+            })
+
+        response = {
+            "kind": "youtube#searchListResponse",
+            "etag": _etag(f"{query}:{offset}"),
+            "regionCode": params.get("regionCode", "US"),
+            "pageInfo": {"totalResults": 1000000, "resultsPerPage": page_size},
+            "items": items,
+        }
+        if more:
+            response["nextPageToken"] = encode_page_token(offset + page_size)
+        if offset:
+            response["prevPageToken"] = encode_page_token(max(offset - page_size, 0))
+        return response
+
+    def _video(self, video_id, parts):
+        rng = _seeded(self.seed, "details", video_id)
+        item = {"kind": "youtube#video", "etag": _etag(video_id), "id": video_id}
+        if "snippet" in parts:
+            item["snippet"] = {
+                "publishedAt": _iso(datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randint(0, 50000000))),
+                "channelId": self._channel_id(rng),
+                "title": _sentence(rng, rng.randint(4, 9)),
+                "description": "\n".join(_sentence(rng, rng.randint(10, 30)) for _ in range(rng.randint(3, 12))),
+                "thumbnails": _thumbnails(f"https://i.ytimg.com/vi/{video_id}"),
+                "channelTitle": f"{_sentence(rng, 2)} Channel",
+                "tags": [rng.choice(_WORDS) for _ in range(rng.randint(0, 12))],
+                "categoryId": str(rng.choice((10, 20, 22, 24, 27, 28))),
+                "liveBroadcastContent": "none",
+            }
+        if "contentDetails" in parts:
+            low, high = _DURATION_RANGES.get(video_id[:1], (20, 7200))
+            seconds = rng.randint(low, high)
+            hours, rest = divmod(seconds, 3600)
+            minutes, seconds = divmod(rest, 60)
+            duration = "PT" + (f"{hours}H" if hours else "") + (f"{minutes}M" if minutes else "") + f"{seconds}S"
+            item["contentDetails"] = {
+                "duration": duration,
+                "dimension": "2d",
+                "definition": "sd" if video_id[1:2] == "D" else "hd",
+                "caption": rng.choice(("true", "false")),
+                "licensedContent": rng.random() < 0.7,
+                "contentRating": {},
+                "projection": "rectangular",
+            }
+        if "statistics" in parts:
+            views = int(rng.lognormvariate(9, 2.5))
+            item["statistics"] = {
+                "viewCount": str(views),
+                "likeCount": str(int(views * rng.uniform(0.005, 0.06))),
+                "favoriteCount": "0",
+                "commentCount": str(int(views * rng.uniform(0.0005, 0.005))),
+            }
+        return item
+
+    def _channel(self, channel_id, parts):
+        rng = _seeded(self.seed, "channel", channel_id)
+        item = {"kind": "youtube#channel", "etag": _etag(channel_id), "id": channel_id}
+        if "snippet" in parts:
+            title = f"{_sentence(rng, 2)} Channel"
+            item["snippet"] = {
+                "title": title,
+                "description": _sentence(rng, rng.randint(10, 40)),
+                "customUrl": "@" + title.lower().replace(" ", ""),
+                "publishedAt": _iso(datetime(2010, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rng.randint(0, 400000000))),
+                "thumbnails": _thumbnails(f"https://yt3.ggpht.com/{channel_id}"),
+                "country": rng.choice(("NL", "US", "GB", "DE", "IN")),
+            }
+        if "statistics" in parts:
+            subscribers = int(rng.lognormvariate(8, 2.5))
+            item["statistics"] = {
+                "viewCount": str(subscribers * rng.randint(20, 400)),
+                "subscriberCount": str(subscribers),
+                "hiddenSubscriberCount": False,
+                "videoCount": str(rng.randint(1, 3000)),
+            }
+        if "contentDetails" in parts:
+            item["contentDetails"] = {"relatedPlaylists": {"likes": "", "uploads": "UU" + channel_id[2:]}}
+        return item
+
+    def _list(self, kind, params, build):
+        ids = [value for value in params.get("id", "").split(",") if value]
+        if len(ids) > 50:
+            raise MockApiError(400, "invalidFilters", "Too many IDs; the maximum is 50.")
+        parts = set(params.get("part", "snippet").split(","))
+        items = [build(item_id, parts) for item_id in ids]
+        return {
+            "kind": f"youtube#{kind}ListResponse",
+            "etag": _etag(params.get("id", "")),
+            "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)},
+            "items": items,
+        }
+
+    def videos(self, params):
+        return self._list("video", params, self._video)
+
+    def channels(self, params):
+        return self._list("channel", params, self._channel)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "injected": dict(self.injected),
+                "key_usage": dict(self.key_usage),
+                "bytes_sent": dict(self.bytes_sent),
+                "http_requests": self.http_requests,
+                "batched_calls": self.batched_calls,
+            }
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Serve GET /youtube/v3/<method>?... and POST /batch from a MockYouTubeAPI"""
+
+    api = None
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self, path):
+        """Return (status, payload, method) for one API call to path"""
+        parsed = urlparse(path)
+        prefix = "/youtube/v3/"
+        if not parsed.path.startswith(prefix):
+            return 404, {"error": {"code": 404, "message": "Not Found", "errors": []}}, None
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        method = parsed.path[len(prefix):]
+        try:
+            return 200, self.api.handle(method, params), method
+        except MockApiError as e:
+            return e.status, e.payload(), method
+
+    def do_GET(self):
+        self.api.count_http_request()
+        delay = self.api.delay()
+        if delay:
+            time.sleep(delay)
+        status, payload, method = self._answer(self.path)
+        self._send(status, payload, method)
+
+    def do_POST(self):
+        """Answer a multipart/mixed batch of GET calls, like the real API's batch endpoint"""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if urlparse(self.path).path.rstrip("/") not in ("/batch", "/batch/youtube/v3"):
+            self._send(404, {"error": {"code": 404, "message": "Not Found", "errors": []}})
+            return
+        content_type = self.headers.get("Content-Type", "")
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        if not message.is_multipart():
+            self._send(400, MockApiError(400, "badRequest", "Expected a multipart/mixed batch.").payload())
+            return
+        self.api.count_http_request()
+        # One round-trip for the whole batch
+        delay = self.api.delay()
+        if delay:
+            time.sleep(delay)
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().split("\n", 1)[0].strip()
+            status, payload, _ = self._answer(request_line.split(" ")[1])
+            self.api.count_batched_call()
+            parts.append(
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:]}\r\n\r\n"
+                f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        body = ("".join(parts) + f"--{boundary}--\r\n").encode("utf-8")
+        self._send_body(200, body, f"multipart/mixed; boundary={boundary}", "batch")
+
+    def _send(self, status, payload, method=None):
+        self._send_body(status, json.dumps(payload).encode("utf-8"), "application/json; charset=UTF-8", method)
+
+    def _send_body(self, status, body, content_type, method=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if method is not None:
+            self.api.record_bytes(method, len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(api, host="127.0.0.1", port=8800):
+    """Serve api over HTTP from a background thread; return the server"""
+    handler = type("BoundMockRequestHandler", (MockRequestHandler,), {"api": api})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-youtube-api", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local mock of the YouTube Data API v3.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="median response time in seconds (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.3, help="log-normal spread of the latency (default: 0.3)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail (default: 0)")
+    parser.add_argument("--errors", default=",".join(DEFAULT_ERRORS),
+                        help=f"comma-separated reasons to inject, from: {', '.join(ERRORS)}")
+    parser.add_argument("--results-per-query", type=int, default=500, help="results available per query (default: 500)")
+    parser.add_argument("--quota-per-key", type=int, help="daily units per API key before quotaExceeded (default: unlimited)")
+    parser.add_argument("--upload-interval", type=float, default=3600.0,
+                        help="seconds between uploads on each query's order=date timeline (default: 3600)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    errors = [reason for reason in args.errors.split(",") if reason]
+    unknown = set(errors) - set(ERRORS)
+    if unknown:
+        parser.error(f"unknown error reasons: {', '.join(sorted(unknown))}")
+    api = MockYouTubeAPI(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        errors=errors,
+        results_per_query=args.results_per_query,
+        seed=args.seed,
+        quota_per_key=args.quota_per_key,
+        upload_interval=args.upload_interval,
+    )
+    server = start_mock_server(api, args.host, args.port)
+    print(f"Mock YouTube Data API on http://{args.host}:{args.port}/ (set YOUTUBE_API_URL to this)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
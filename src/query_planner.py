@@ -0,0 +1,169 @@
+"""
+Answering filter-only changes from a cached candidate pool
+
+Changing "Video Duration", "Video Quality" or the date range re-runs the
+search: another 100-unit search.list call, even when the new filters only
+narrow down the previous search. The enriched results of every search are
+kept as a candidate pool, keyed by everything that is not one of those
+filters (query, region, safe search, order, ...). A later search whose
+filters are the same or narrower is answered by filtering the pool locally:
+the pool's duration seconds, definitions and publish times are kept as NumPy
+columns and the filters are applied as vectorized predicates.
+
+A pool holds the first N results of its search in the API's order, and the
+narrower search is assumed to order the videos it matches the same way. Its
+first M results are then exactly the first M pool results that pass the
+filters, provided at least M do; if fewer do, the pool only answers when it
+holds everything its search matched. Otherwise, or when no pool covers the
+filters, the search goes to the API as before. NumPy is imported on first
+use.
+
+The assumption is not documented by the API: its relevance ranking can
+differ between a search and a narrower one, so a pool answer holds the
+right videos (every filter is checked locally) but not necessarily the ones
+the API would have picked or in its order. POOL_CACHE_SIZE=0 turns pools off.
+"""
+
+import math
+from datetime import datetime
+
+from metrics import planner_searches
+from youtube_api import build_search_params
+from youtube_cache import make_cache_key, pool_cache
+from youtube_enrich import parse_duration
+
+# The filters a pool can apply locally
+FILTER_PARAMS = ("videoDuration", "videoDefinition", "publishedAfter", "publishedBefore")
+# Request parameters that do not change which videos match
+_PAGING_PARAMS = ("maxResults", "pageToken", "fields")
+
+# search.list's videoDuration buckets in seconds: [low, high)
+DURATION_BUCKETS = {"short": (0, 240), "medium": (240, 1200), "long": (1200, math.inf)}
+# search.list's videoDefinition -> videos.list contentDetails.definition
+DEFINITIONS = {"high": "hd", "standard": "sd"}
+
+# Pools kept per query; each remembers one combination of filters
+POOLS_PER_QUERY = 4
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return math.nan
+
+
+def _split(search_string, options):
+    """Return (pool key, normalized filters) for a search"""
+    params = build_search_params(search_string, **options)
+    key = make_cache_key({
+        name: value for name, value in params.items() if name not in FILTER_PARAMS + _PAGING_PARAMS
+    })
+    filters = dict(make_cache_key({name: params.get(name) for name in FILTER_PARAMS}))
+    return key, filters
+
+
+class CandidatePool:
+    """The enriched results of one search, filterable by duration, definition and publish date"""
+
+    def __init__(self, filters, results, exhaustive=False):
+        self.filters = filters
+        self.results = list(results)
+        # True if results is everything the search matched
+        self.exhaustive = exhaustive
+        self._columns = None
+
+    def covers(self, filters):
+        """Return True if every video matching filters also matches this pool's filters"""
+        for name in ("videoDuration", "videoDefinition"):
+            own = self.filters.get(name, "any")
+            if own != "any" and filters.get(name, "any") != own:
+                return False
+        # Timestamps are normalized to YYYY-MM-DDTHH:MM:SSZ, so they compare as strings
+        after, own_after = filters.get("publishedAfter"), self.filters.get("publishedAfter")
+        if own_after is not None and (after is None or after < own_after):
+            return False
+        before, own_before = filters.get("publishedBefore"), self.filters.get("publishedBefore")
+        if own_before is not None and (before is None or before > own_before):
+            return False
+        return True
+
+    def columns(self):
+        """Return (duration seconds, definition, publish timestamp) arrays; NaN / '' where unknown"""
+        if self._columns is None:
+            import numpy as np
+            seconds = [parse_duration(result.duration) for result in self.results]
+            self._columns = (
+                np.array([math.nan if value is None else value for value in seconds], dtype=float),
+                np.array([result.definition or "" for result in self.results], dtype=str),
+                np.array([_timestamp(result.published) for result in self.results], dtype=float),
+            )
+        return self._columns
+
+    def select(self, filters, limit):
+        """Return the first limit results matching filters, or None if the pool cannot tell"""
+        import numpy as np
+        seconds, definition, published = self.columns()
+        mask = np.ones(len(self.results), dtype=bool)
+        unknown = np.zeros(len(self.results), dtype=bool)
+
+        duration = filters.get("videoDuration", "any")
+        if duration != self.filters.get("videoDuration", "any") and duration in DURATION_BUCKETS:
+            low, high = DURATION_BUCKETS[duration]
+            mask &= (seconds >= low) & (seconds < high)
+            unknown |= np.isnan(seconds)
+        quality = filters.get("videoDefinition", "any")
+        if quality != self.filters.get("videoDefinition", "any") and quality in DEFINITIONS:
+            mask &= definition == DEFINITIONS[quality]
+            unknown |= definition == ""
+        for name, keep in (("publishedAfter", np.greater_equal), ("publishedBefore", np.less_equal)):
+            if filters.get(name) is not None and filters.get(name) != self.filters.get(name):
+                bound = _timestamp(filters[name])
+                if not filters[name].endswith("Z") or math.isnan(bound):
+                    # Leave timestamps the API would not accept to the API
+                    return None
+                mask &= keep(published, bound)
+                unknown |= np.isnan(published)
+
+        if unknown.any():
+            # Results that were not enriched cannot be filtered on what they lack
+            return None
+        matches = np.flatnonzero(mask)
+        if len(matches) < limit and not self.exhaustive:
+            return None
+        return [self.results[i] for i in matches[:limit]]
+
+
+def answer_from_pool(search_string, max_results=5, **options):
+    """Return a search's results filtered from a cached pool that covers it, or None to ask the API
+
+    options are build_search_params() keywords.
+    """
+    key, filters = _split(search_string, options)
+    for pool in pool_cache.get(key) or ():
+        if pool.covers(filters):
+            results = pool.select(filters, max_results)
+            if results is not None:
+                planner_searches.inc("pool")
+                return results
+    planner_searches.inc("api")
+    return None
+
+
+def remember_pool(search_string, results, exhaustive=False, **options):
+    """Keep a search's enriched results (VideoResults, in API order) as a candidate pool
+
+    exhaustive: results are everything the search matched (see
+    youtube_api.search_exhausted()).
+    """
+    if not results and not exhaustive:
+        return
+    key, filters = _split(search_string, options)
+    pools = [pool for pool in pool_cache.get(key) or () if pool.filters != filters]
+    pool_cache.set(key, [CandidatePool(filters, results, exhaustive)] + pools[:POOLS_PER_QUERY - 1])
+
+
+def planner_stats():
+    """Return how many searches were answered from pools and how many went to the API"""
+    pool, api = planner_searches.value("pool"), planner_searches.value("api")
+    return {"pool": pool, "api": api, "pool_ratio": pool / (pool + api) if pool + api else 0.0}
@@ -0,0 +1,197 @@
+"""
+Search-as-you-type suggestions from a local prefix index
+
+Every search is a 100-unit search.list call, including retyped and slightly
+misspelled versions of searches made a minute ago. Suggestions are served
+from an index of the searches people have made (the store's search log,
+most popular first) and of the queries and result titles in the search
+cache, so the frontends can offer them on every keystroke without touching
+the API.
+
+The index is a sorted array of normalized keys searched by binary search:
+each text is indexed from the start of every word, so "learn" finds
+"machine learning tutorial". Building it takes up to a few hundred
+milliseconds and happens in a background thread when the search cache has
+changed or SUGGEST_REFRESH seconds have passed; lookups use the last index
+built. A suggestion names
+the query it runs: a title suggests the search it was a result of. Queries
+whose first page is cached for the current filters come first, so picking
+a suggestion is answered from the cache. If nothing starts with the typed
+text, it is shortened a character at a time (down to SUGGEST_MIN_PREFIX) so
+a typo at the end still finds the query it was meant to be.
+"""
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from metrics import stage_seconds
+from youtube_api import MAX_PAGE_SIZE, build_search_params
+from youtube_cache import make_cache_key, search_cache
+from youtube_store import top_queries
+
+# Seconds after which the index is rebuilt even if the search cache is unchanged
+SUGGEST_REFRESH = float(os.getenv("SUGGEST_REFRESH", "30"))
+# Logged searches indexed, most popular first, and how far back they go (days)
+SUGGEST_HISTORY = int(os.getenv("SUGGEST_HISTORY", "5000"))
+SUGGEST_DAYS = int(os.getenv("SUGGEST_DAYS", "30"))
+# Result titles indexed, from the newest cached searches; each adds a key per
+# word, so this bounds the index size and build time
+SUGGEST_MAX_TITLES = int(os.getenv("SUGGEST_MAX_TITLES", "5000"))
+# Shortest typed text that is shortened to find a match
+SUGGEST_MIN_PREFIX = 3
+
+# Matching keys looked at per lookup; the best are picked from these
+_MAX_SCAN = 200
+# Matches per suggestion asked for that are checked against the search cache
+_MAX_CANDIDATES = 4
+# Rebuilds wait this long after the last one, however often the cache changes
+_MIN_REBUILD_INTERVAL = 1.0
+
+
+def normalize(text):
+    """Lowercase text and collapse its whitespace, as search cache keys do"""
+    return re.sub(r"\s+", " ", str(text).strip()).lower()
+
+
+class PrefixIndex:
+    """Sorted array of normalized texts, looked up by prefix with binary search"""
+
+    def __init__(self, entries):
+        # entries: (text, query, kind), best first; a text is indexed once
+        self.entries = []
+        keys = []
+        seen = set()
+        for text, query, kind in entries:
+            key = normalize(text)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            position = len(self.entries)
+            self.entries.append((text, normalize(query), kind))
+            keys.append((key, position))
+            keys.extend((key[match.end():], position) for match in re.finditer(" ", key))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._positions = [position for _, position in keys]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, prefix):
+        """Return the positions of entries with a word starting with prefix, best first"""
+        found = set()
+        i = bisect_left(self._keys, prefix)
+        end = min(i + _MAX_SCAN, len(self._keys))
+        while i < end and self._keys[i].startswith(prefix):
+            found.add(self._positions[i])
+            i += 1
+        return sorted(found)
+
+
+def _cached_searches():
+    """Return (queries, titles) of the first pages in the search cache, newest entries first"""
+    queries, titles = [], []
+    for key, response in reversed(search_cache.items()):
+        params = dict(key)
+        if not params.get("q") or params.get("pageToken"):
+            continue
+        queries.append(params["q"])
+        for item in response.get("items", []):
+            title = item.get("snippet", {}).get("title")
+            if title:
+                titles.append((title, params["q"]))
+    return queries, titles
+
+
+def build_index():
+    """Build a PrefixIndex over logged searches and cached queries and result titles"""
+    queries, titles = _cached_searches()
+    entries = [(query, query, "query") for query in top_queries(SUGGEST_HISTORY, SUGGEST_DAYS)]
+    entries += [(query, query, "query") for query in queries]
+    entries += [(title, query, "title") for title, query in titles[:SUGGEST_MAX_TITLES]]
+    return PrefixIndex(entries)
+
+
+class Suggester:
+    """Serve suggestions from the last index built, rebuilding it in the background"""
+
+    def __init__(self, refresh=SUGGEST_REFRESH):
+        self.refresh = refresh
+        self._index = None
+        self._built_at = 0.0
+        self._cache_size = None
+        self._lock = threading.Lock()
+        self._building = False
+
+    def index(self):
+        """Return the current index, building the first one synchronously"""
+        if self._index is None:
+            self._rebuild()
+        elif self._stale() and not self._building:
+            with self._lock:
+                start = not self._building
+                self._building = True
+            if start:
+                threading.Thread(target=self._rebuild, name="suggest-index", daemon=True).start()
+        return self._index
+
+    def _stale(self):
+        age = time.monotonic() - self._built_at
+        return age >= self.refresh or (len(search_cache) != self._cache_size and age >= _MIN_REBUILD_INTERVAL)
+
+    def _rebuild(self):
+        try:
+            cache_size = len(search_cache)
+            self._index = build_index()
+            self._built_at = time.monotonic()
+            self._cache_size = cache_size
+        finally:
+            self._building = False
+
+    def suggest(self, text, limit=8, max_results=5, **options):
+        """Return up to limit suggestions for text as dicts
+
+        Each has the text shown, the query it runs, its kind ('query' or
+        'title') and cached. options are build_search_params() keywords;
+        cached means the query's first page for max_results and those options
+        is in the search cache.
+        """
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        with stage_seconds.time("suggest"):
+            index = self.index()
+            positions = index.lookup(prefix)
+            while not positions and len(prefix) > SUGGEST_MIN_PREFIX:
+                prefix = prefix[:-1].rstrip()
+                positions = index.lookup(prefix)
+
+            # The cache key of each query's first page differs only in q, which
+            # is normalized like index entries; build the rest once
+            base = make_cache_key(build_search_params("", max_results=min(int(max_results), MAX_PAGE_SIZE), **options))
+            at = [name for name, _ in base].index("q")
+
+            suggestions = []
+            cached = {}
+            for position in positions[:_MAX_CANDIDATES * limit]:
+                shown, query, kind = index.entries[position]
+                if kind == "query" and query == normalize(text):
+                    # Already typed in full
+                    continue
+                if query not in cached:
+                    cached[query] = base[:at] + (("q", query),) + base[at + 1:] in search_cache
+                suggestions.append({'text': shown, 'query': query, 'kind': kind, 'cached': cached[query]})
+            # Stable sort: cached first, each group still in index order
+            suggestions.sort(key=lambda suggestion: not suggestion['cached'])
+            return suggestions[:limit]
+
+
+suggester = Suggester()
+
+
+def suggest(text, limit=8, max_results=5, **options):
+    """Return search suggestions for typed text; see Suggester.suggest()"""
+    return suggester.suggest(text, limit, max_results, **options)
@@ -0,0 +1,153 @@
+"""
+Saved searches with "new since last check" refreshes
+
+Editors re-run the same searches many times a day, and almost everything a
+plain re-run returns has been seen before. A saved search keeps a high-water
+mark (the publish time of the newest video it has found) and the IDs of
+everything it has found, in the result store. check_saved_search() asks the
+API for order=date results published at or after the watermark and stops
+paging at the first video it has already seen, so a check with nothing new
+costs a single search.list call. The new videos are merged into the saved
+result set and the watermark moves up.
+
+A check fetches at most max_results videos. If that cuts it off before it
+reaches a video it has seen, the videos between the old watermark and the
+oldest one fetched are still unknown: the search keeps that range as its gap,
+and later checks fill it (newest first, within their own max_results) once
+they have fetched what is new above the watermark.
+
+The first check of a saved search fetches its WATCH_MAX_RESULTS newest
+videos (within the search's own date range) as the baseline.
+
+A video YouTube indexes long after its publish time can be missed, because
+it sorts below the watermark; re-save the search to pick such videos up.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from youtube_api import MAX_TOTAL_RESULTS, iter_search_pages
+from youtube_enrich import video_id_of
+from youtube_store import get_result_store
+
+# Most new videos one check fetches; 50 fit in one search.list call
+WATCH_MAX_RESULTS = int(os.getenv("WATCH_MAX_RESULTS", "50"))
+
+
+def watch_enabled():
+    """Saved searches live in the result store; they are off when it is disabled"""
+    return get_result_store() is not None
+
+
+def save_search(query, **options):
+    """Save a search (query plus build_search_params() options); return the saved search"""
+    store = get_result_store()
+    if store is None:
+        return None
+    # Every check sorts by date and runs up to now
+    options.pop('order', None)
+    options.pop('published_before', None)
+    return store.save_search(query, options)
+
+
+def saved_searches():
+    """Return every saved search, most recently checked first"""
+    store = get_result_store()
+    return store.saved_searches() if store is not None else []
+
+
+def get_saved_search(search_id):
+    store = get_result_store()
+    return store.get_saved_search(search_id) if store is not None else None
+
+
+def saved_results(search_id, limit=50):
+    """Return what a saved search has found so far, newest first"""
+    store = get_result_store()
+    return store.saved_results(search_id, limit) if store is not None else []
+
+
+def delete_saved_search(search_id):
+    store = get_result_store()
+    if store is not None:
+        store.delete_saved_search(search_id)
+
+
+def _second_after(timestamp):
+    # Publish times have whole seconds: a gap must include the rest of the
+    # second its oldest fetched video was published in
+    moment = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ") + timedelta(seconds=1)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _published(items):
+    return [item['snippet']['publishedAt'] for item in items if item.get('snippet', {}).get('publishedAt')]
+
+
+def _fetch_unseen(youtube, query, options, seen, max_results, stop_at_seen, session=None):
+    """Return (up to max_results unseen items newest first, complete)
+
+    complete is False if results were left unfetched. With stop_at_seen the
+    first seen item ends the search; otherwise seen items are skipped and do
+    not count towards max_results.
+    """
+    limit = max_results if stop_at_seen else min(max_results + len(seen), MAX_TOTAL_RESULTS)
+    # fresh: a cached page would hide what was published since it was fetched;
+    # no prefetch: the next page is only worth its quota if this one was all new
+    pages = iter_search_pages(
+        youtube, query, max_results=limit, prefetch=False, session=session, fresh=True, **options
+    )
+    found = []
+    fetched = 0
+    try:
+        for page in pages:
+            for item in page:
+                fetched += 1
+                if video_id_of(item) not in seen:
+                    found.append(item)
+                    if len(found) == max_results:
+                        return found, False
+                elif stop_at_seen:
+                    # Results are newest first: everything from here on was found before
+                    return found, True
+    finally:
+        pages.close()
+    return found, fetched < limit
+
+
+def check_saved_search(youtube, saved, max_results=WATCH_MAX_RESULTS, session=None):
+    """Fetch the videos a saved search has not seen yet; return them newest first
+
+    saved is a saved search as returned by save_search()/saved_searches().
+    """
+    store = get_result_store()
+    seen = store.saved_video_ids(saved['id'])
+    options = dict(saved['options'], order='date')
+    if saved['watermark']:
+        options['published_after'] = saved['watermark']
+    new, complete = _fetch_unseen(youtube, saved['query'], options, seen, max_results, True, session)
+
+    gap = saved['gap']
+    if not complete and saved['watermark']:
+        # Videos between the watermark and the oldest one fetched are still
+        # unknown; an earlier gap lies below the watermark, so they merge
+        oldest = min(_published(new), default=None)
+        if oldest is not None:
+            gap = ((gap or (saved['watermark'],))[0], _second_after(oldest))
+    elif gap and len(new) < max_results:
+        # Fill the gap an earlier check left. It can contain videos found
+        # before (when two gaps were merged), so seen ones are skipped, not stopped at
+        seen |= {video_id_of(item) for item in new}
+        options = dict(saved['options'], order='date', published_after=gap[0], published_before=gap[1])
+        found, complete = _fetch_unseen(youtube, saved['query'], options, seen, max_results - len(new), False, session)
+        new += found
+        oldest = min(_published(found), default=None)
+        if complete:
+            gap = None
+        elif oldest is not None:
+            gap = (gap[0], _second_after(oldest))
+
+    new = list({video_id_of(item): item for item in new}.values())
+    watermark = max(_published(new) + ([saved['watermark']] if saved['watermark'] else []), default=None)
+    store.merge_saved_results(saved['id'], [video_id_of(item) for item in new], watermark, gap)
+    return new
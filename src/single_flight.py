@@ -0,0 +1,71 @@
+"""
+In-process request coalescing ("single flight")
+
+While a call for a key is running, later callers with the same key wait on the
+same future instead of starting their own call. The result, the error, or a
+cancellation of the leading call is delivered to every waiter. Works for any
+mix of threads: Streamlit script threads and Gradio worker threads alike.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout=None):
+        """Run fn() for key, or wait for the call already in flight for key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                # Left in the pending state so cancel() can still wake waiters
+                future = Future()
+                self._calls[key] = future
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(timeout)
+
+        try:
+            result = fn()
+        except Exception as exc:
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+        except BaseException:
+            # The leader was interrupted (e.g. a Streamlit rerun or Ctrl+C);
+            # waiters get a CancelledError instead of the leader's control-flow
+            # exception.
+            self._finish(key)
+            future.cancel()
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def in_flight(self):
+        """Return the number of keys currently being executed"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
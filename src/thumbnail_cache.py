@@ -0,0 +1,361 @@
+"""
+Local thumbnail proxy with a content-addressed disk cache
+
+Each thumbnail is downloaded from YouTube once, resized and re-encoded as a
+small JPEG, and stored under the SHA-256 of its bytes (identical images are
+stored once). A per-URL reference file points at the stored object. When the
+cache grows past its size limit, the least recently used objects are evicted
+together with the reference files that point at them. The cache directory is
+created by the first download.
+
+Downloads are bounded by a semaphore, so rendering a 50-result page never
+opens 50 sockets at once, and concurrent requests for the same URL share one
+download. Rendering a card never waits for one: a thumbnail that is not
+cached yet is shown from YouTube and downloaded in the background. Only
+YouTube image hosts are fetched, redirects included.
+
+Thumbnails can be served in two ways:
+
+- local_thumbnail(url) returns a file path for st.image(). Streamlit then
+  serves the file itself under a stable, content-hashed URL, so reruns do
+  not go back to i.ytimg.com.
+- run this module (python src/thumbnail_cache.py) to start an HTTP proxy that
+  serves /thumb?url=... with long-lived, immutable cache headers, and set
+  THUMBNAIL_PROXY_URL so the frontends point their images at it.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+from single_flight import SingleFlight
+
+# Only YouTube image hosts are fetched, so the proxy cannot be used to reach
+# arbitrary URLs.
+ALLOWED_HOSTS = {"i.ytimg.com", "i9.ytimg.com", "img.youtube.com", "yt3.ggpht.com", "yt3.googleusercontent.com"}
+
+CACHE_SECONDS = 365 * 24 * 3600
+# Seconds a search waits for its page of thumbnails before drawing the cards;
+# the rest keep downloading in the background
+PREFETCH_WAIT = float(os.getenv("THUMBNAIL_PREFETCH_WAIT", "2"))
+
+
+def check_thumbnail_url(url):
+    """Raise ValueError unless url is an http(s) URL on a YouTube image host"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or parsed.hostname not in ALLOWED_HOSTS:
+        raise ValueError(f"Not a YouTube thumbnail URL: {url}")
+
+
+class _AllowedHostRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Follow a redirect only if its target is an allowed host too"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        check_thumbnail_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_AllowedHostRedirectHandler)
+
+
+class ThumbnailCache:
+    """Download-once, resize-once disk cache for thumbnail images"""
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, size=(320, 180), quality=80, max_downloads=8, timeout=10):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = size
+        self.quality = quality
+        self.timeout = timeout
+        self._objects = os.path.join(directory, "objects")
+        self._refs = os.path.join(directory, "refs")
+        self._downloads = threading.BoundedSemaphore(max_downloads)
+        self._pool = ThreadPoolExecutor(max_workers=max_downloads, thread_name_prefix="thumbnail")
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        # Background downloads queued or running, by URL
+        self._pending = {}
+        # Sized on first download instead of at startup; a full cache holds
+        # thousands of files and the scan would delay the first page render
+        self._total_bytes = None
+        self.hits = 0
+        self.downloads = 0
+
+    def _scan(self):
+        for root, _, files in os.walk(self._objects):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _used_bytes(self):
+        # Caller holds self._lock
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._scan())
+        return self._total_bytes
+
+    def _ref_path(self, url):
+        return os.path.join(self._refs, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects, digest[:2], f"{digest}.jpg")
+
+    def lookup(self, url):
+        """Return the cached file path for url, or None if it is not cached"""
+        try:
+            with open(self._ref_path(url), encoding="ascii") as f:
+                path = self._object_path(f.read().strip())
+            # Touch the object so eviction treats it as recently used
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def get(self, url):
+        """Return a local file path for url, downloading it on first use"""
+        path = self.lookup(url)
+        if path is None:
+            path = self._flight.do(url, lambda: self.lookup(url) or self._fetch(url))
+        return path
+
+    def fetch_later(self, url):
+        """Download url in the background unless it is already queued; return its future"""
+        with self._lock:
+            future = self._pending.get(url)
+            if future is not None:
+                return future
+            future = self._pending[url] = self._pool.submit(self.get, url)
+        # Outside the lock: a finished future runs the callback right away
+        future.add_done_callback(lambda done: self._forget(url, done))
+        return future
+
+    def _forget(self, url, future):
+        with self._lock:
+            if self._pending.get(url) is future:
+                del self._pending[url]
+
+    def prefetch(self, urls, timeout=None):
+        """Fetch many thumbnails concurrently (bounded); return {url: path or None}
+
+        Waits at most timeout seconds; downloads still running then carry on
+        in the background and their URLs map to None.
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        futures = {url: self.fetch_later(url) for url in urls}
+        done, _ = wait(futures.values(), timeout)
+        paths = {}
+        for url, future in futures.items():
+            try:
+                paths[url] = future.result() if future in done else None
+            except Exception:
+                paths[url] = None
+        return paths
+
+    def _fetch(self, url):
+        check_thumbnail_url(url)
+        with self._downloads:
+            with _opener.open(url, timeout=self.timeout) as response:
+                raw = response.read()
+        with self._lock:
+            self.downloads += 1
+
+        data = self._reencode(raw)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_atomic(path, data)
+            with self._lock:
+                # An unsized cache picks the new object up when it is scanned
+                if self._total_bytes is not None:
+                    self._total_bytes += len(data)
+        os.makedirs(self._refs, exist_ok=True)
+        self._write_atomic(self._ref_path(url), digest.encode("ascii"))
+        self._evict()
+        return path
+
+    def _reencode(self, raw):
+        # Pillow is optional and slow to import; only load it once we download
+        try:
+            from PIL import Image
+        except ImportError:
+            return raw
+        try:
+            with Image.open(io.BytesIO(raw)) as image:
+                image = image.convert("RGB")
+                image.thumbnail(self.size)
+                out = io.BytesIO()
+                image.save(out, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+                return out.getvalue()
+        except Exception:
+            return raw
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        with self._lock:
+            if self._used_bytes() <= self.max_bytes:
+                return
+            # Drop the least recently used objects until we are at 90% of the limit
+            target = self.max_bytes * 0.9
+            for path, size, _ in sorted(self._scan(), key=lambda entry: entry[2]):
+                if self._total_bytes <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                self._total_bytes -= size
+        self._remove_dangling_refs()
+
+    def _remove_dangling_refs(self):
+        """Delete the reference files whose object is gone"""
+        try:
+            names = os.listdir(self._refs)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            ref_path = os.path.join(self._refs, name)
+            try:
+                with open(ref_path, encoding="ascii") as f:
+                    digest = f.read().strip()
+                if not os.path.exists(self._object_path(digest)):
+                    os.remove(ref_path)
+            except (OSError, ValueError):
+                continue
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bytes": self._used_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "downloads": self.downloads,
+            }
+
+
+class ThumbnailRequestHandler(BaseHTTPRequestHandler):
+    """Serve GET /thumb?url=<thumbnail url> from the cache with immutable caching"""
+
+    cache = None
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        url = parse_qs(parsed.query).get("url", [None])[0]
+        if parsed.path != "/thumb" or not url:
+            self.send_error(404)
+            return
+        try:
+            path = self.cache.get(url)
+        except ValueError:
+            self.send_error(403)
+            return
+        except Exception:
+            self.send_error(502)
+            return
+
+        etag = f'"{os.path.basename(path)[:-4]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        with open(path, "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", f"public, max-age={CACHE_SECONDS}, immutable")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_thumbnail_server(cache, host="127.0.0.1", port=8765):
+    """Serve cache over HTTP from a background thread; return the server"""
+    handler = type("BoundThumbnailRequestHandler", (ThumbnailRequestHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name="thumbnail-proxy", daemon=True).start()
+    return server
+
+
+def _open_default_cache():
+    directory = os.getenv("THUMBNAIL_CACHE_DIR", ".thumbnail_cache")
+    if not directory:
+        return None
+    return ThumbnailCache(
+        directory,
+        max_bytes=int(float(os.getenv("THUMBNAIL_CACHE_MAX_MB", "200")) * 1024 * 1024),
+        max_downloads=int(os.getenv("THUMBNAIL_MAX_DOWNLOADS", "8")),
+    )
+
+
+thumbnail_cache = _open_default_cache()
+PROXY_URL = os.getenv("THUMBNAIL_PROXY_URL", "").rstrip("/")
+
+
+def local_thumbnail(url):
+    """Return a local source for a thumbnail, falling back to the remote URL
+
+    Never downloads: a thumbnail that is not cached yet is fetched in the
+    background and the remote URL is returned for this render.
+    """
+    if not url:
+        return url
+    if PROXY_URL:
+        return f"{PROXY_URL}/thumb?url={quote(url, safe='')}"
+    if thumbnail_cache is None:
+        return url
+    path = thumbnail_cache.lookup(url)
+    if path is None:
+        thumbnail_cache.fetch_later(url)
+        return url
+    return path
+
+
+def prefetch_thumbnails(urls):
+    """Warm the cache for a page of thumbnails with bounded concurrency, waiting at most PREFETCH_WAIT seconds"""
+    if thumbnail_cache is not None and not PROXY_URL:
+        thumbnail_cache.prefetch(urls, timeout=PREFETCH_WAIT)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve cached YouTube thumbnails over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if thumbnail_cache is None:
+        parser.error("THUMBNAIL_CACHE_DIR is empty; the thumbnail cache is disabled")
+    server = start_thumbnail_server(thumbnail_cache, args.host, args.port)
+    print(f"Serving thumbnails on http://{args.host}:{args.port}/thumb?url=...")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
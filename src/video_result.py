@@ -0,0 +1,127 @@
+"""
+Compact search results for per-session state
+
+A raw search item plus its enrichment is a tree of ~10 dicts holding etags,
+three thumbnail sizes, the full description and counts as strings: several
+KB per video, kept alive in every session that shows it. VideoResult keeps
+only what the frontends render, rank and filter on, in slots, and is built
+once when a page of results arrives. Counts are ints and channel names are
+interned so the same channel is stored once however many results and
+sessions mention it. The description is kept whole, as the local re-ranking
+(youtube_rank.py) scores it; search.list already shortens it to a snippet of
+about 160 characters, and the cards show description_preview().
+
+Sessions also hold at most SESSION_MAX_RESULTS results, and prune_players()
+drops the show_video_* flags of videos that are no longer on screen.
+"""
+
+import os
+import sys
+
+from youtube_enrich import format_count, format_stats
+
+# Longest description preview the frontends show
+DESCRIPTION_CHARS = 200
+# Results one session keeps; "Load more" stops offering pages past this
+SESSION_MAX_RESULTS = int(os.getenv("SESSION_MAX_RESULTS", "500"))
+PLAYER_KEY_PREFIX = "show_video_"
+
+
+def _count(value):
+    return int(value) if value not in (None, "") else None
+
+
+class VideoResult:
+    """The rendered fields of one search result"""
+
+    __slots__ = (
+        "video_id", "title", "channel", "channel_id", "published", "description",
+        "thumbnail_url", "view_count", "like_count", "duration", "definition", "subscriber_count",
+        "channel_thumbnail_url",
+    )
+
+    def __init__(self, video_id, title="", channel="", channel_id="", published="", description="",
+                 thumbnail_url="", view_count=None, like_count=None, duration=None, definition=None,
+                 subscriber_count=None, channel_thumbnail_url=""):
+        self.video_id = video_id
+        self.title = title
+        self.channel = sys.intern(channel)
+        self.channel_id = sys.intern(channel_id)
+        self.published = published
+        self.description = description
+        self.thumbnail_url = thumbnail_url
+        self.view_count = view_count
+        self.like_count = like_count
+        self.duration = duration
+        self.definition = definition
+        self.subscriber_count = subscriber_count
+        self.channel_thumbnail_url = channel_thumbnail_url
+
+    @classmethod
+    def from_item(cls, item):
+        """Build a result from a (possibly enriched) search.list item"""
+        snippet = item.get('snippet', {})
+        statistics = item.get('statistics', {})
+        content = item.get('contentDetails', {})
+        channel = item.get('channel', {})
+        item_id = item['id']
+        return cls(
+            item_id['videoId'] if isinstance(item_id, dict) else item_id,
+            title=snippet.get('title', ""),
+            channel=snippet.get('channelTitle', ""),
+            channel_id=snippet.get('channelId', ""),
+            published=snippet.get('publishedAt', ""),
+            description=snippet.get('description') or "",
+            thumbnail_url=snippet.get('thumbnails', {}).get('medium', {}).get('url', ""),
+            view_count=_count(statistics.get('viewCount')),
+            like_count=_count(statistics.get('likeCount')),
+            duration=content.get('duration'),
+            definition=content.get('definition'),
+            subscriber_count=_count(channel.get('subscriberCount')),
+            channel_thumbnail_url=channel.get('thumbnailUrl', ""),
+        )
+
+    @property
+    def url(self):
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    def stats_line(self):
+        """Return a one-line summary of views, duration and likes, or '' if not enriched"""
+        return format_stats(self.view_count, self.duration, self.like_count)
+
+    def channel_line(self):
+        """Return the channel name with its subscriber count when known"""
+        if self.subscriber_count is None:
+            return self.channel
+        return f"{self.channel} · {format_count(self.subscriber_count)} subscribers"
+
+    def description_preview(self):
+        """Return the description cut to DESCRIPTION_CHARS for display"""
+        if len(self.description) > DESCRIPTION_CHARS:
+            return self.description[:DESCRIPTION_CHARS] + "..."
+        return self.description
+
+    def __eq__(self, other):
+        if not isinstance(other, VideoResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        # Equal results have the same video_id
+        return hash(self.video_id)
+
+    def __repr__(self):
+        return f"VideoResult({self.video_id!r}, title={self.title!r})"
+
+
+def to_results(items):
+    """Convert search items to VideoResults (results that already are pass through)"""
+    return [item if isinstance(item, VideoResult) else VideoResult.from_item(item) for item in items]
+
+
+def prune_players(state, results=()):
+    """Delete the show_video_* flags in state that are off or whose video is not in results"""
+    keep = {result.video_id for result in results}
+    for key in [key for key in state.keys() if isinstance(key, str) and key.startswith(PLAYER_KEY_PREFIX)]:
+        if not state[key] or key[len(PLAYER_KEY_PREFIX):] not in keep:
+            del state[key]
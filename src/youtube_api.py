@@ -0,0 +1,251 @@
+"""
+Shared YouTube search path used by all frontends
+
+Builds search.list parameters in one place and serves repeated searches from
+the process-wide result cache, so a popular query costs one API call (100
+quota units) no matter how many sessions or frontends ask for it. Concurrent
+identical searches that miss the cache are coalesced into a single request.
+
+When the API is failing (see youtube_retry.py) or the quota is spent, expired
+cache entries are served instead of an error for up to SEARCH_CACHE_STALE_TTL.
+
+Searches larger than one API page are walked lazily with nextPageToken via
+iter_search_pages(), which yields each page as soon as it arrives. With
+speculate=True the page after the last one shown is fetched in the background
+while quota is plentiful, so "load more" is answered from the cache.
+
+Every search asks for a partial response (SEARCH_FIELDS): only the fields the
+frontends and the result store use, with one thumbnail size instead of three.
+"""
+
+import atexit
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from single_flight import SingleFlight
+from youtube_cache import make_cache_key, search_cache
+from youtube_quota import QuotaExhausted, ledger
+from youtube_retry import execute, is_upstream_failure
+from youtube_store import store_videos
+
+# search.list returns at most 50 items per page and roughly 500 per query
+MAX_PAGE_SIZE = 50
+MAX_TOTAL_RESULTS = 500
+
+# Partial response mask: the snippet fields we render, store and rank on
+SEARCH_FIELDS = (
+    "nextPageToken,"
+    "items(id/videoId,snippet(publishedAt,channelId,title,description,channelTitle,thumbnails/medium/url))"
+)
+
+# Only spend quota on pages nobody asked for yet while at least this share
+# of the daily budget is left
+SPECULATE_MIN_REMAINING = float(os.getenv("SPECULATE_MIN_REMAINING", "0.5"))
+
+search_flight = SingleFlight()
+
+# Next pages of searches someone is paging through; each search has at most
+# one in flight, so this bounds how many searches prefetch at once
+_page_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PAGE_PREFETCH_WORKERS", "16")), thread_name_prefix="youtube-page")
+atexit.register(_page_executor.shutdown, wait=False, cancel_futures=True)
+
+# Speculative pages nobody asked for get their own small pool, and are dropped
+# rather than queued when all its workers are busy
+SPECULATE_WORKERS = int(os.getenv("SPECULATE_WORKERS", "2"))
+_speculate_executor = ThreadPoolExecutor(max_workers=SPECULATE_WORKERS, thread_name_prefix="youtube-speculate")
+_speculate_slots = threading.BoundedSemaphore(SPECULATE_WORKERS)
+atexit.register(_speculate_executor.shutdown, wait=False, cancel_futures=True)
+
+
+def build_search_params(search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", video_definition="any", published_after="2024-01-01T00:00:00Z", published_before=None):
+    """Return the search.list keyword arguments for a video search (None leaves a date bound open)"""
+    params = dict(
+        part="snippet",
+        maxResults=max_results,
+        q=search_string,
+        videoDuration=video_duration,
+        videoEmbeddable="true",
+        type="video",
+        regionCode=region_code,
+        relevanceLanguage='en',
+        safeSearch=safe_search,
+        videoCaption='any',
+        videoDefinition=video_definition,
+        publishedAfter=published_after,
+        publishedBefore=published_before,
+        order=order,
+        fields=SEARCH_FIELDS
+    )
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def search_videos(youtube, search_string, max_results=5, session=None, **options):
+    """Search for videos, answering from the shared cache when possible"""
+    results = itertools.chain.from_iterable(
+        iter_search_pages(youtube, search_string, max_results=max_results, session=session, **options)
+    )
+    return list(results)
+
+
+def iter_search_pages(youtube, search_string, max_results=5, prefetch=True, session=None, page_token=None, speculate=False, fresh=False, **options):
+    """Yield lists of video items one API page at a time
+
+    Pages are fetched lazily: nothing beyond the page being consumed (plus,
+    with prefetch, the one after it) is requested, and closing the generator
+    stops paging. If the quota budget runs out after the first page, paging
+    stops and the pages already fetched are kept. Quota is charged to session.
+    page_token continues an earlier search (see continuation_token()); with
+    speculate, the page after the last one is prefetched if quota allows.
+    fresh skips the cache lookup (pages fetched are still cached).
+    """
+    remaining = min(int(max_results), MAX_TOTAL_RESULTS)
+    page_size = min(remaining, MAX_PAGE_SIZE)
+    params = build_search_params(search_string, max_results=page_size, **options)
+
+    pending = None
+    try:
+        response = _fetch_page(youtube, params, page_token, session, fresh)
+        while remaining > 0:
+            items = response['items'][:remaining]
+            remaining -= len(items)
+            next_token = response.get('nextPageToken')
+            more = bool(items) and remaining > 0 and next_token
+
+            if speculate and not remaining and next_token and len(items) == len(response['items']):
+                prefetch_page(youtube, params, next_token, session)
+
+            if more and prefetch:
+                pending = _page_executor.submit(_fetch_page, youtube, params, next_token, session, fresh)
+
+            yield items
+
+            if not more:
+                break
+            try:
+                if pending is not None:
+                    response, pending = pending.result(), None
+                else:
+                    response = _fetch_page(youtube, params, next_token, session, fresh)
+            except QuotaExhausted:
+                # Keep the pages we already have rather than failing the search
+                pending = None
+                break
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def continuation_token(search_string, max_results=5, page_token=None, **options):
+    """Return the page token that continues a search after its max_results results
+
+    Only cached pages are consulted, so this never calls the API. Returns None
+    if the search has no further pages, is not cached, or ended mid-page.
+    """
+    remaining = min(int(max_results), MAX_TOTAL_RESULTS)
+    params = build_search_params(search_string, max_results=min(remaining, MAX_PAGE_SIZE), **options)
+    token = page_token
+    while remaining > 0:
+        response = search_cache.get(make_cache_key(dict(params, pageToken=token) if token else params))
+        if response is None or len(response['items']) > remaining:
+            return None
+        remaining -= len(response['items'])
+        token = response.get('nextPageToken')
+        if not token or not response['items']:
+            return None
+    return token
+
+
+def search_exhausted(search_string, max_results=5, page_token=None, **options):
+    """Return True if the cached pages of a search show the API has nothing beyond its first max_results results
+
+    Like continuation_token(), this only consults cached pages; an uncached
+    page counts as not exhausted.
+    """
+    remaining = min(int(max_results), MAX_TOTAL_RESULTS)
+    params = build_search_params(search_string, max_results=min(remaining, MAX_PAGE_SIZE), **options)
+    token = page_token
+    seen = 0
+    while True:
+        response = search_cache.get(make_cache_key(dict(params, pageToken=token) if token else params))
+        if response is None:
+            return False
+        remaining -= len(response['items'])
+        seen += len(response['items'])
+        token = response.get('nextPageToken')
+        if remaining < 0:
+            # Results past max_results were cut off
+            return False
+        if not token or not response['items']:
+            # The API stops paging at about MAX_TOTAL_RESULTS whether or not more match
+            return seen < MAX_TOTAL_RESULTS
+        if remaining == 0:
+            return False
+
+
+def can_speculate(session=None):
+    """Return True if quota allows fetching a page before anyone asks for it"""
+    return ledger.can_spend("search.list", session, reserve=int(ledger.daily_limit * SPECULATE_MIN_REMAINING))
+
+
+def prefetch_page(youtube, params, page_token, session=None):
+    """Fetch a page into the cache in the background if it is not cached and quota allows
+
+    Returns None without fetching if all SPECULATE_WORKERS are busy.
+    """
+    if make_cache_key(dict(params, pageToken=page_token)) in search_cache or not can_speculate(session):
+        return None
+    if not _speculate_slots.acquire(blocking=False):
+        return None
+    try:
+        future = _speculate_executor.submit(_fetch_page, youtube, params, page_token, session)
+    except RuntimeError:
+        # Shutting down
+        _speculate_slots.release()
+        return None
+    # Nobody waits for the result; failures just mean no head start
+    future.add_done_callback(lambda f: _speculate_slots.release() or f.cancelled() or f.exception())
+    return future
+
+
+def refresh_search(youtube, search_string, max_results=5, ttl=None, session=None, **options):
+    """Fetch the first page of a search from the API, bypassing the cache, and cache it for ttl seconds"""
+    params = build_search_params(search_string, max_results=min(int(max_results), MAX_PAGE_SIZE), **options)
+    key = make_cache_key(params)
+    response = _fetch_search(youtube, params, key, session, ttl=ttl, refresh=True)
+    return response['items'][:max_results]
+
+
+def _fetch_page(youtube, params, page_token, session=None, fresh=False):
+    if page_token:
+        params = dict(params, pageToken=page_token)
+    key = make_cache_key(params)
+
+    response = None if fresh else search_cache.get(key)
+    if response is None:
+        try:
+            response = search_flight.do(key, lambda: _fetch_search(youtube, params, key, session, refresh=fresh))
+        except Exception as e:
+            # While the API is down or our quota is spent, an expired result beats an error
+            if not (is_upstream_failure(e) or isinstance(e, QuotaExhausted)):
+                raise
+            response = search_cache.get_stale(key)
+            if response is None:
+                raise
+    return response
+
+
+def _fetch_search(youtube, params, key, session=None, ttl=None, refresh=False):
+    # Another caller may have filled the cache while we waited for the flight
+    response = None if refresh else search_cache.get(key)
+    if response is None:
+        raw = execute(youtube.search().list(**params), "search.list", session)
+        # Partial responses leave out an empty items list
+        response = {
+            'items': raw.get('items', []),
+            'nextPageToken': raw.get('nextPageToken'),
+        }
+        search_cache.set(key, response, ttl=ttl)
+        store_videos(response['items'])
+    return response
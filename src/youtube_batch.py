@@ -0,0 +1,129 @@
+"""
+Multiplexing API calls into HTTP batch requests
+
+Every search.list, videos.list and channels.list call is normally its own
+HTTPS round-trip. With API_BATCH_WINDOW set, execute() holds each call for up
+to that many seconds, collects the calls other threads (CLI workers, Gradio
+workers, page prefetches) make in the meantime and sends them together as one
+multipart/mixed request to the API's batch endpoint, via googleapiclient's
+BatchHttpRequest. Each response, or error, is handed back to the thread that
+made the call, so retries, quota and key rotation in youtube_retry.py work
+per call as before. A call that is alone when the window closes is sent as
+a plain request.
+
+The first caller of a window waits for it to close (or for API_BATCH_SIZE
+calls) and sends the batch; the others wait for their response. Batching is
+off by default because the window adds latency to a lone interactive search;
+it pays off for bulk jobs and busy servers. run_together() runs independent
+calls, such as a page's videos.list and channels.list, side by side so that
+they land in the same batch.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Seconds a call waits for others to share its batch; 0 disables batching
+BATCH_WINDOW = float(os.getenv("API_BATCH_WINDOW", "0"))
+# Most calls per batch request (the API accepts up to 1000, but large
+# batches are slower to answer)
+BATCH_SIZE = int(os.getenv("API_BATCH_SIZE", "50"))
+
+_together_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="youtube-batch")
+
+
+def batch_uri(request):
+    """Return the batch endpoint of the API request.uri belongs to"""
+    # https://youtube.googleapis.com/youtube/v3/search?... -> https://youtube.googleapis.com/batch
+    return request.uri.split("youtube/v3/", 1)[0] + "batch"
+
+
+class RequestBatcher:
+    """Collect API requests from many threads and send them as batch requests"""
+
+    def __init__(self, window=0.0, max_size=50):
+        self.window = window
+        self.max_size = max_size
+        self._cond = threading.Condition()
+        self._pending = []
+        self._stats = {"calls": 0, "requests": 0, "batches": 0, "batched_calls": 0}
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def execute(self, request):
+        """Execute request, sharing an HTTP round-trip with concurrent calls when enabled"""
+        if not self.enabled:
+            return request.execute()
+        future = Future()
+        with self._cond:
+            self._stats["calls"] += 1
+            self._pending.append((request, future))
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_size:
+                self._cond.notify_all()
+
+        if leader:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._pending) >= self.max_size, timeout=self.window)
+                pending, self._pending = self._pending, []
+            for start in range(0, len(pending), self.max_size):
+                self._send(pending[start:start + self.max_size])
+        return future.result()
+
+    def _send(self, pending):
+        """Send one batch and resolve the futures of its calls"""
+        with self._cond:
+            self._stats["requests"] += 1
+        if len(pending) == 1:
+            request, future = pending[0]
+            try:
+                future.set_result(request.execute())
+            except Exception as e:
+                future.set_exception(e)
+            return
+
+        from googleapiclient.http import BatchHttpRequest
+        from youtube_client import thread_http
+
+        def deliver(future):
+            def callback(request_id, response, exception):
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(response)
+            return callback
+
+        batch = BatchHttpRequest(batch_uri=batch_uri(pending[0][0]))
+        for request, future in pending:
+            batch.add(request, callback=deliver(future))
+        with self._cond:
+            self._stats["batches"] += 1
+            self._stats["batched_calls"] += len(pending)
+        try:
+            batch.execute(http=thread_http())
+        except Exception as e:
+            # The batch as a whole failed (e.g. a timeout): every call in it did
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats(self):
+        """Return calls made, HTTP requests sent and round-trips saved by batching"""
+        with self._cond:
+            stats = dict(self._stats)
+        stats["window"] = self.window
+        stats["saved_round_trips"] = stats["calls"] - stats["requests"]
+        return stats
+
+
+api_batcher = RequestBatcher(window=BATCH_WINDOW, max_size=BATCH_SIZE)
+
+
+def run_together(*calls):
+    """Return the results of zero-argument calls, run side by side while batching is on"""
+    if not api_batcher.enabled or len(calls) < 2:
+        return [call() for call in calls]
+    futures = [_together_executor.submit(call) for call in calls[1:]]
+    return [calls[0]()] + [future.result() for future in futures]
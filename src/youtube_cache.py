@@ -0,0 +1,192 @@
+"""
+In-process TTL + LRU caches for YouTube API responses
+
+A single search result cache is shared by every frontend running in the same
+process. Keys are built from canonicalized query parameters so that searches
+differing only in case, whitespace, parameter order or date formatting share
+one entry.
+
+Expired entries can be kept for a grace period (stale_ttl) and read with
+get_stale(), so results can still be served while the API is failing.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+
+_MISSING = object()
+
+# Opaque values that must not be case-folded when building cache keys
+_CASE_SENSITIVE_PARAMS = {"pageToken", "id", "channelId", "fields"}
+
+
+class TTLCache:
+    """Thread-safe mapping with per-entry expiry and least-recently-used eviction"""
+
+    def __init__(self, maxsize=512, ttl=900, clock=time.monotonic, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._stale = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                self._keep_stale(key, expires_at, value)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key, default=None):
+        """Return the value for key even if it expired less than stale_ttl ago"""
+        with self._lock:
+            entry = self._data.get(key) or self._stale.get(key)
+            if entry is None or entry[0] + self.stale_ttl <= self._clock():
+                return default
+            self.stale_hits += 1
+            return entry[1]
+
+    def _keep_stale(self, key, expires_at, value):
+        # Caller holds self._lock
+        if self.stale_ttl <= 0:
+            return
+        self._stale[key] = (expires_at, value)
+        self._stale.move_to_end(key)
+        while len(self._stale) > self.maxsize:
+            self._stale.popitem(last=False)
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting the least recently used entries if full"""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._stale.pop(key, None)
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, (old_expires_at, old_value) = self._data.popitem(last=False)
+                self._keep_stale(old_key, old_expires_at, old_value)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] > self._clock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        """Return the unexpired (key, value) pairs, without counting hits or refreshing them"""
+        with self._lock:
+            now = self._clock()
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._stale.clear()
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_hits": self.stale_hits,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def normalize_timestamp(value, end_of_day=False):
+    """Normalize a date, datetime or ISO string to YYYY-MM-DDTHH:MM:SSZ (UTC)"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if isinstance(value, date):
+        suffix = "T23:59:59Z" if end_of_day else "T00:00:00Z"
+        return value.isoformat() + suffix
+
+    text = str(value).strip()
+    if len(text) == 10:
+        return normalize_timestamp(date.fromisoformat(text), end_of_day)
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return text
+    return normalize_timestamp(parsed)
+
+
+def _normalize_value(name, value):
+    if name in ("publishedAfter", "publishedBefore"):
+        return normalize_timestamp(value, end_of_day=name == "publishedBefore")
+    if name == "regionCode":
+        return str(value).strip().upper()
+    if isinstance(value, str) and name not in _CASE_SENSITIVE_PARAMS:
+        return re.sub(r"\s+", " ", value.strip()).lower()
+    return value
+
+
+def make_cache_key(params):
+    """Build a canonical, hashable key from API request parameters"""
+    return tuple(sorted(
+        (name, _normalize_value(name, value))
+        for name, value in params.items()
+        if value is not None
+    ))
+
+
+search_cache = TTLCache(
+    maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "900")),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "86400")),
+)
+
+# Per-video statistics change slowly, so they are kept much longer
+video_cache = TTLCache(
+    maxsize=int(os.getenv("VIDEO_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("VIDEO_CACHE_TTL", "21600")),
+    stale_ttl=float(os.getenv("VIDEO_CACHE_STALE_TTL", "86400")),
+)
+
+# Subscriber counts and channel thumbnails change even more slowly, and a
+# small set of channels covers most results
+channel_cache = TTLCache(
+    maxsize=int(os.getenv("CHANNEL_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("CHANNEL_CACHE_TTL", "604800")),
+    stale_ttl=float(os.getenv("CHANNEL_CACHE_STALE_TTL", "2592000")),
+)
+
+# Enriched results of recent searches, which narrower searches can be
+# filtered from (query_planner.py); as fresh as the search results themselves
+pool_cache = TTLCache(
+    maxsize=int(os.getenv("POOL_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "900")),
+)
@@ -0,0 +1,92 @@
+"""
+Batched channel metadata via channels.list
+
+Result cards show each video's channel with its subscriber count and avatar.
+A page of results usually comes from a handful of channels, so this module
+dedupes the channelIds of a page, looks them up in a long-lived cache and
+fetches only the missing ones, up to 50 per channels.list call (1 quota unit
+each). A 50-result page therefore costs at most one extra call, and none once
+its channels have been seen. Like video enrichment, the lookup is skipped
+while quota is running low, and expired entries are used while the API is
+failing.
+"""
+
+from youtube_cache import channel_cache
+from youtube_quota import QuotaExhausted, ledger
+from youtube_retry import execute, is_upstream_failure
+
+# channels.list accepts at most 50 comma-separated IDs per call
+MAX_IDS_PER_CALL = 50
+
+# Partial response mask: the avatar and the subscriber count
+CHANNEL_FIELDS = "items(id,snippet/thumbnails/default/url,statistics(subscriberCount,hiddenSubscriberCount))"
+
+
+def _channel_entry(item):
+    """Reduce a channels.list item to what the cards show"""
+    statistics = item.get('statistics', {})
+    return {
+        'thumbnailUrl': item.get('snippet', {}).get('thumbnails', {}).get('default', {}).get('url', ""),
+        # Channels can hide their subscriber count
+        'subscriberCount': None if statistics.get('hiddenSubscriberCount') else statistics.get('subscriberCount'),
+    }
+
+
+def fetch_channel_details(youtube, channel_ids, session=None):
+    """Return {channel_id: {'thumbnailUrl': ..., 'subscriberCount': ...}} for channel_ids"""
+    details = {}
+    missing = []
+    for channel_id in dict.fromkeys(channel_ids):
+        if not channel_id:
+            continue
+        cached = channel_cache.get(channel_id)
+        if cached is None:
+            missing.append(channel_id)
+        else:
+            details[channel_id] = cached
+
+    for start in range(0, len(missing), MAX_IDS_PER_CALL):
+        # Channel details are decoration: keep low quota for searches
+        if ledger.is_low() or not ledger.can_spend("channels.list", session):
+            break
+
+        batch = missing[start:start + MAX_IDS_PER_CALL]
+        try:
+            response = execute(youtube.channels().list(
+                part="snippet,statistics",
+                id=",".join(batch),
+                maxResults=len(batch),
+                fields=CHANNEL_FIELDS
+            ), "channels.list", session)
+        except Exception as e:
+            # The quota can run out between can_spend() and the charge when
+            # sessions search concurrently; that is no reason to fail either
+            if not (is_upstream_failure(e) or isinstance(e, QuotaExhausted)):
+                raise
+            for channel_id in missing[start:]:
+                stale = channel_cache.get_stale(channel_id)
+                if stale is not None:
+                    details[channel_id] = stale
+            break
+
+        found = {item['id']: _channel_entry(item) for item in response.get('items', [])}
+        for channel_id in batch:
+            # Terminated channels come back without an item; cache that too
+            entry = found.get(channel_id, {})
+            channel_cache.set(channel_id, entry)
+            details[channel_id] = entry
+
+    return details
+
+
+def channel_id_of(item):
+    """Return the channel ID of a search.list item ('' if unknown)"""
+    return item.get('snippet', {}).get('channelId', "")
+
+
+def merge_channel_details(items, details):
+    """Return copies of items with their channel's details merged in as 'channel'"""
+    return [
+        dict(item, channel=details[channel_id_of(item)]) if details.get(channel_id_of(item)) else item
+        for item in items
+    ]
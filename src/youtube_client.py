@@ -0,0 +1,144 @@
+"""
+Shared YouTube API client manager
+
+Builds the YouTube Data API v3 client once per process (per API key) from the
+discovery document bundled with google-api-python-client, instead of calling
+build() on every search. The built client is shared by all Streamlit sessions
+and Gradio worker threads; every thread gets its own keep-alive HTTP
+connection because httplib2.Http objects are not thread-safe. Every request
+asks for a gzip-compressed response.
+
+googleapiclient is imported on first use rather than at module import, so the
+frontends can render their first page before paying for it. warm_client()
+builds the client on a background thread once the page is up.
+
+Set YOUTUBE_API_URL to send all calls to another server with the same API,
+such as the local mock in src/mock_youtube_api.py.
+"""
+
+import os
+import threading
+import time
+
+from metrics import stage_seconds
+
+# Seconds before a call that is not answered fails (and may be retried)
+API_TIMEOUT = float(os.getenv("YOUTUBE_API_TIMEOUT", "10"))
+
+_lock = threading.Lock()
+_clients = {}
+_warming = {}
+_thread_local = threading.local()
+_stats = {
+    "builds": 0,
+    "build_seconds": 0.0,
+    "reuses": 0,
+}
+
+
+def thread_http():
+    """Return the HTTP transport owned by the calling thread"""
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        from googleapiclient.http import build_http
+        http = build_http()
+        http.timeout = API_TIMEOUT
+        _thread_local.http = http
+    return http
+
+
+def _build_request(http, *args, **kwargs):
+    """Request builder that sends every call over the thread-local transport, gzip-encoded"""
+    from googleapiclient.http import HttpRequest
+    request = HttpRequest(thread_http(), *args, **kwargs)
+    # Google only compresses responses for clients whose user agent mentions
+    # gzip; httplib2 decompresses them transparently
+    request.headers["accept-encoding"] = "gzip"
+    user_agent = request.headers.get("user-agent", "")
+    if "gzip" not in user_agent:
+        request.headers["user-agent"] = f"{user_agent} (gzip)".strip()
+    return request
+
+
+def _api_url():
+    url = os.getenv("YOUTUBE_API_URL", "")
+    # Method paths are joined onto the base URL, so it must end with a slash
+    return url if not url or url.endswith("/") else url + "/"
+
+
+def _build_client(api_key):
+    from googleapiclient.discovery import build
+    api_url = _api_url()
+    return build(
+        "youtube",
+        "v3",
+        developerKey=api_key,
+        requestBuilder=_build_request,
+        static_discovery=True,
+        cache_discovery=False,
+        client_options={"api_endpoint": api_url} if api_url else None,
+    )
+
+
+def get_client(api_key):
+    """Return the process-wide YouTube client for api_key, building it on first use"""
+    client = _clients.get(api_key)
+    if client is not None:
+        with _lock:
+            _stats["reuses"] += 1
+        return client
+
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            started = time.perf_counter()
+            client = _build_client(api_key)
+            elapsed = time.perf_counter() - started
+            stage_seconds.observe(elapsed, "client_build")
+            _stats["build_seconds"] += elapsed
+            _stats["builds"] += 1
+            _clients[api_key] = client
+        else:
+            _stats["reuses"] += 1
+    return client
+
+
+def warm_client(api_key):
+    """Build the client for api_key on a background thread if it is not built yet"""
+    if not api_key or api_key in _clients:
+        return None
+    with _lock:
+        thread = _warming.get(api_key)
+        if thread is None:
+            thread = threading.Thread(target=_warm, args=(api_key,), name="youtube-client-warmup", daemon=True)
+            _warming[api_key] = thread
+            thread.start()
+    return thread
+
+
+def _warm(api_key):
+    try:
+        get_client(api_key)
+    except Exception:
+        # The first search builds the client again and reports the error
+        pass
+    finally:
+        with _lock:
+            _warming.pop(api_key, None)
+
+
+def reset_clients():
+    """Drop all cached clients (e.g. after an API key change)"""
+    with _lock:
+        _clients.clear()
+
+
+def client_stats():
+    """Return build/reuse counters and the build time saved by reusing clients"""
+    with _lock:
+        stats = dict(_stats)
+    builds = stats["builds"]
+    stats["avg_build_seconds"] = stats["build_seconds"] / builds if builds else 0.0
+    # Every reuse would otherwise have paid for a full build() call
+    stats["saved_seconds"] = stats["avg_build_seconds"] * stats["reuses"]
+    return stats
@@ -0,0 +1,160 @@
+"""
+Batched video enrichment via videos.list
+
+search.list only returns snippet data. This module collects the video IDs of a
+result page and fetches statistics and contentDetails for up to 50 IDs per
+videos.list call (1 quota unit each), then merges them back into the results.
+Per-video metadata lives in its own longer-lived cache so a video that shows
+up in several searches is only fetched once. While quota is running low,
+enrichment is skipped and results are returned with whatever is cached; the
+same happens, with expired entries included, while the API is failing.
+Only the fields we show or filter on are requested (VIDEO_FIELDS).
+
+enrich_videos() also merges in each result's channel details (subscriber
+count and avatar, see youtube_channels).
+"""
+
+import re
+
+from youtube_batch import run_together
+from youtube_cache import video_cache
+from youtube_channels import channel_id_of, fetch_channel_details, merge_channel_details
+from youtube_quota import QuotaExhausted, ledger
+from youtube_retry import execute, is_upstream_failure
+from youtube_store import store_details
+
+# videos.list accepts at most 50 comma-separated IDs per call
+MAX_IDS_PER_CALL = 50
+
+# Partial response mask: views, likes, duration and definition
+VIDEO_FIELDS = "items(id,statistics(viewCount,likeCount),contentDetails(duration,definition))"
+
+_DURATION_RE = re.compile(
+    r"P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?"
+)
+
+
+def video_id_of(item):
+    """Return the video ID of a search.list or videos.list item"""
+    item_id = item['id']
+    return item_id['videoId'] if isinstance(item_id, dict) else item_id
+
+
+def fetch_video_details(youtube, video_ids, session=None):
+    """Return {video_id: {'statistics': ..., 'contentDetails': ...}} for video_ids"""
+    details = {}
+    missing = []
+    for video_id in dict.fromkeys(video_ids):
+        cached = video_cache.get(video_id)
+        if cached is None:
+            missing.append(video_id)
+        else:
+            details[video_id] = cached
+
+    for start in range(0, len(missing), MAX_IDS_PER_CALL):
+        # Enrichment is optional: defer it while quota is low so the
+        # remaining units are kept for searches.
+        if ledger.is_low() or not ledger.can_spend("videos.list", session):
+            break
+
+        batch = missing[start:start + MAX_IDS_PER_CALL]
+        try:
+            response = execute(youtube.videos().list(
+                part="statistics,contentDetails",
+                id=",".join(batch),
+                maxResults=len(batch),
+                fields=VIDEO_FIELDS
+            ), "videos.list", session)
+        except Exception as e:
+            # Concurrent sessions can spend the quota between can_spend() and
+            # the charge; enrichment is optional, so treat that like a failure
+            if not (is_upstream_failure(e) or isinstance(e, QuotaExhausted)):
+                raise
+            # The API is failing or the quota is spent: use expired details
+            # where we have them and leave the rest of the results unenriched
+            for video_id in missing[start:]:
+                stale = video_cache.get_stale(video_id)
+                if stale is not None:
+                    details[video_id] = stale
+            break
+
+        found = {
+            item['id']: {
+                'statistics': item.get('statistics', {}),
+                'contentDetails': item.get('contentDetails', {}),
+            }
+            for item in response.get('items', [])
+        }
+        store_details(found)
+        for video_id in batch:
+            # Videos that were removed come back without an item; remember
+            # that too so they are not requested again.
+            entry = found.get(video_id, {})
+            video_cache.set(video_id, entry)
+            details[video_id] = entry
+
+    return details
+
+
+def enrich_videos(youtube, items, session=None):
+    """Return copies of search items with statistics, contentDetails and channel details merged in"""
+    video_ids = [video_id_of(item) for item in items]
+    channel_ids = [channel_id_of(item) for item in items]
+    # Both only need the search results, so with batching on they share a request
+    details, channels = run_together(
+        lambda: fetch_video_details(youtube, video_ids, session),
+        lambda: fetch_channel_details(youtube, channel_ids, session),
+    )
+    items = [dict(item, **details.get(video_id_of(item), {})) for item in items]
+    return merge_channel_details(items, channels)
+
+
+def parse_duration(duration):
+    """Convert an ISO 8601 duration such as PT1H2M3S to seconds"""
+    match = _DURATION_RE.fullmatch(duration or "")
+    if not match:
+        return None
+    parts = {name: int(value or 0) for name, value in match.groupdict().items()}
+    return parts['days'] * 86400 + parts['hours'] * 3600 + parts['minutes'] * 60 + parts['seconds']
+
+
+def format_duration(duration):
+    """Format an ISO 8601 duration as H:MM:SS or M:SS"""
+    seconds = parse_duration(duration)
+    if seconds is None:
+        return ""
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def format_count(value):
+    """Format a count string from the API as 1.2K / 3.4M"""
+    if value is None or value == "":
+        return ""
+    number = int(value)
+    for threshold, suffix in ((1_000_000_000, "B"), (1_000_000, "M"), (1_000, "K")):
+        if number >= threshold:
+            return f"{number / threshold:.1f}".rstrip("0").rstrip(".") + suffix
+    return str(number)
+
+
+def format_stats(view_count, duration, like_count):
+    """Return a one-line summary of views, duration and likes ('' for the ones not known)"""
+    parts = []
+    if view_count not in (None, ""):
+        parts.append(f"👁️ {format_count(view_count)} views")
+    if duration:
+        parts.append(f"⏱️ {format_duration(duration)}")
+    if like_count not in (None, ""):
+        parts.append(f"👍 {format_count(like_count)}")
+    return " · ".join(parts)
+
+
+def stats_line(item):
+    """Return a one-line summary of views, duration and likes, or '' if not enriched"""
+    statistics = item.get('statistics', {})
+    content = item.get('contentDetails', {})
+    return format_stats(statistics.get('viewCount'), content.get('duration'), statistics.get('likeCount'))
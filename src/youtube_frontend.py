@@ -1,49 +1,166 @@
 import streamlit as st
-from googleapiclient.discovery import build
-import os
 from dotenv import load_dotenv
-from datetime import date
 
-# Load environment variables
+# Load environment variables before the project modules read their settings
 load_dotenv()
 
+from youtube_client import get_client, warm_client
+from youtube_api import MAX_TOTAL_RESULTS, search_exhausted, search_videos
+from youtube_enrich import enrich_videos
+from youtube_quota import QuotaExhausted
+from youtube_keys import keys_from_env, use_keys
+from youtube_store import record_search, search_local
+from cache_warmer import start_cache_warmer
+from metrics import stage_seconds, start_metrics_exporter
+from thumbnail_cache import local_thumbnail, prefetch_thumbnails
+from video_result import SESSION_MAX_RESULTS, prune_players, to_results
+from query_planner import answer_from_pool, remember_pool
+from query_suggest import suggest
+import sqlite3
+import uuid
+from datetime import date
+
+API_MODE = "🌐 YouTube API"
+LOCAL_MODE = "💾 Local index"
+# Suggestions shown under the search box
+SUGGESTIONS_SHOWN = 5
+
 def get_youtube_service():
     """Initialize YouTube API service"""
-    api_key = os.getenv("API_KEY")
+    api_key = use_keys(keys_from_env())
     if not api_key:
         st.error("ERROR: API_KEY environment variable is not set!")
         st.info("Please set your YouTube Data API v3 key in your .env file")
         st.stop()
     
-    return build("youtube", "v3", developerKey=api_key)
+    with stage_seconds.time("get_service"):
+        return get_client(api_key)
 
-def search_youtube_videos(youtube, search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", video_definition="any", published_after="2024-01-01T00:00:00Z", published_before="2025-07-31T23:59:59Z"):
+def search_youtube_videos(youtube, search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", video_definition="any", published_after="2024-01-01T00:00:00Z", published_before=None, session=None):
     """Search for YouTube videos with dynamic parameters"""
     try:
-        request = youtube.search().list(
-            part="snippet",
-            maxResults=max_results,
-            q=search_string,
-            videoDuration=video_duration,
-            videoEmbeddable="true",
-            type="video",
-            regionCode=region_code,
-            relevanceLanguage='en',
-            safeSearch=safe_search,
-            videoCaption='any',
-            videoDefinition=video_definition,
-            publishedAfter=published_after,
-            publishedBefore=published_before,
-            order=order
-        )
-        
-        response = request.execute()
-        return response['items']
+        with stage_seconds.time("search"):
+            return search_videos(
+                youtube,
+                search_string,
+                max_results=max_results,
+                video_duration=video_duration,
+                region_code=region_code,
+                safe_search=safe_search,
+                order=order,
+                video_definition=video_definition,
+                published_after=published_after,
+                published_before=published_before,
+                session=session
+            )
+    
+    except QuotaExhausted as e:
+        st.warning(f"⚠️ {str(e)}. Only cached results are available until the quota resets.")
+        return []
     
     except Exception as e:
         st.error(f"Error searching YouTube: {str(e)}")
         return []
 
+def enrich_search_results(youtube, videos, session=None):
+    """Add views, duration and likes to search results with batched videos.list calls"""
+    try:
+        with stage_seconds.time("enrich"):
+            return enrich_videos(youtube, videos, session)
+    
+    except Exception as e:
+        st.warning(f"Could not load video statistics: {str(e)}")
+        return videos
+
+def search_local_index(search_string, max_results=5):
+    """Search previously fetched videos in the local SQLite index"""
+    try:
+        return to_results(search_local(search_string, limit=max_results))
+    
+    except sqlite3.Error as e:
+        st.error(f"Error searching the local index: {str(e)}")
+        return []
+
+def set_video_visible(video_id, visible):
+    """Button callback: show or hide the embedded player for one video"""
+    if visible:
+        st.session_state[f"show_video_{video_id}"] = True
+    else:
+        st.session_state.pop(f"show_video_{video_id}", None)
+
+# Each card is a fragment: Play/Close only re-executes that card, not the whole script
+@st.fragment
+def render_video_card(i, video):
+    """Render one search result (a VideoResult) as a card with thumbnail, details and player"""
+    title = video.title
+    channel = video.channel_line()
+    video_id = video.video_id
+    published = video.published
+    description = video.description_preview()
+    thumbnail_url = video.thumbnail_url
+    video_url = video.url
+    video_stats = video.stats_line()
+
+    # Create a card-like display for each video
+    with st.container():
+        st.markdown("---")
+
+        # Create columns for thumbnail and info
+        thumb_col, info_col = st.columns([1, 3])
+
+        with thumb_col:
+            # Served from the local thumbnail cache instead of i.ytimg.com
+            st.image(local_thumbnail(thumbnail_url), width=150)
+
+        with info_col:
+            st.markdown(f"**{i}. {title}**")
+            if video.channel_thumbnail_url:
+                st.image(local_thumbnail(video.channel_thumbnail_url), width=32)
+            st.markdown(f"📺 **Channel:** {channel}")
+            st.markdown(f"📅 **Published:** {published[:10]}")
+            if video_stats:
+                st.markdown(video_stats)
+            st.markdown(f"🔗 **URL:** {video_url}")
+
+            # Add embedded video player
+            play_button_key = f"play_video_{i}_{video_id}"
+            st.button(f"▶️ Play Video", key=play_button_key, type="secondary",
+                      on_click=set_video_visible, args=(video_id, True))
+
+            # Show embedded video if play button was clicked
+            if st.session_state.get(f"show_video_{video_id}", False):
+                st.markdown('<div class="video-title">🎬 Now Playing:</div>', unsafe_allow_html=True)
+                # Embed YouTube video using iframe with responsive design
+                embed_url = f"https://www.youtube.com/embed/{video_id}?autoplay=1&rel=0&modestbranding=1"
+                st.markdown(f"""
+                <div class="video-container">
+                    <iframe 
+                    src="{embed_url}" 
+                    frameborder="0" 
+                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" 
+                    allowfullscreen>
+                    </iframe>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Add a button to hide the video
+                hide_button_key = f"hide_video_{i}_{video_id}"
+                st.button("❌ Close Video", key=hide_button_key,
+                          on_click=set_video_visible, args=(video_id, False))
+
+            # Add external link as backup
+            st.markdown(f"[🔗 Open in YouTube]({video_url})")
+
+            # Show description (truncated when the result was built)
+            if description:
+                with st.expander("📝 Description"):
+                    st.write(description)
+
+def pick_suggestion(query):
+    """Button callback: search for a suggested query"""
+    st.session_state.search_text = query
+    st.session_state.suggestion_picked = True
+
 def main():
     st.set_page_config(
         page_title="YouTube Search App",
@@ -51,13 +168,15 @@ def main():
         layout="wide"
     )
     
-    # Initialize session state for video display and search results
-    if 'video_states' not in st.session_state:
-        st.session_state.video_states = {}
+    # Initialize session state for search results
     if 'search_results' not in st.session_state:
         st.session_state.search_results = []
     if 'last_search_term' not in st.session_state:
         st.session_state.last_search_term = ""
+    if 'quota_session' not in st.session_state:
+        st.session_state.quota_session = uuid.uuid4().hex
+    if 'suggestion_picked' not in st.session_state:
+        st.session_state.suggestion_picked = False
     
     # Custom CSS for better video embedding
     st.markdown("""
@@ -100,11 +219,25 @@ def main():
         search_string = st.text_input(
             "Enter your search term:",
             placeholder="e.g., theory of relativity",
-            help="Enter keywords to search for YouTube videos"
+            help="Enter keywords to search for YouTube videos; press Enter for suggestions from earlier searches",
+            key="search_text"
+        )
+        # Filled in once the search options below are known
+        suggestion_area = st.container()
+        
+        # Search source
+        search_mode = st.radio(
+            "Search source",
+            [API_MODE, LOCAL_MODE],
+            horizontal=True,
+            help="The local index searches every video fetched so far: instant and free of API quota"
         )
         
         # Search button
         search_button = st.button("Search Videos", type="primary")
+        # A picked suggestion searches right away
+        search_button = search_button or st.session_state.suggestion_picked
+        st.session_state.suggestion_picked = False
         
         # Clear results button (only show if there are results)
         if st.session_state.search_results:
@@ -112,9 +245,7 @@ def main():
                 st.session_state.search_results = []
                 st.session_state.last_search_term = ""
                 # Clear all video states
-                for key in list(st.session_state.keys()):
-                    if key.startswith("show_video_"):
-                        del st.session_state[key]
+                prune_players(st.session_state)
                 st.rerun()
         
         # Additional search options (optional)
@@ -122,7 +253,10 @@ def main():
             col_a, col_b = st.columns(2)
             
             with col_a:
-                max_results = st.slider("Number of results", 1, 10, 5)
+                max_results = st.slider(
+                    "Number of results", 1, MAX_TOTAL_RESULTS, 5,
+                    help="Results are fetched 50 per page; each page costs one search (100 quota units)"
+                )
                 video_duration = st.selectbox(
                     "Video Duration",
                     ["short", "medium", "long", "any"],
@@ -168,38 +302,69 @@ def main():
             with date_col2:
                 published_before = st.date_input(
                     "Published Before", 
-                    value=date(2025, 7, 31),
+                    value=date.today(),
                     help="Show videos published before this date"
                 )
+        
+        # Convert dates to ISO format
+        published_after_iso = f"{published_after}T00:00:00Z"
+        # Up to today means no upper bound, so new uploads keep showing up
+        published_before_iso = None if published_before >= date.today() else f"{published_before}T23:59:59Z"
+        
+        max_results = min(max_results, SESSION_MAX_RESULTS)
+        options = dict(
+            video_duration=video_duration,
+            region_code=region_code,
+            safe_search=safe_search,
+            order=order,
+            video_definition=video_definition,
+            published_after=published_after_iso,
+            published_before=published_before_iso,
+        )
+        
+        # Suggestions from earlier searches; picking one is usually a cache hit
+        if search_string and not search_button and search_mode == API_MODE and search_string != st.session_state.last_search_term:
+            with suggestion_area:
+                for i, suggestion in enumerate(suggest(search_string, SUGGESTIONS_SHOWN, max_results, **options)):
+                    label = ("⚡ " if suggestion['cached'] else "") + ("🎬 " if suggestion['kind'] == "title" else "") + suggestion['text'][:60]
+                    st.button(label, key=f"suggestion_{i}", on_click=pick_suggestion, args=(suggestion['query'],),
+                              help=f"Search \"{suggestion['query']}\"")
     
     with col2:
         st.subheader("📺 Search Results")
         
         # Output area
-        if search_button and search_string:
+        if search_button and search_string and search_mode == LOCAL_MODE:
+            st.session_state.search_results = search_local_index(search_string, max_results)[:SESSION_MAX_RESULTS]
+            st.session_state.last_search_term = search_string
+            prune_players(st.session_state, st.session_state.search_results)
+        
+        elif search_button and search_string:
             with st.spinner("Searching YouTube..."):
                 youtube = get_youtube_service()
+                record_search(search_string)
                 
-                # Convert dates to ISO format
-                published_after_iso = f"{published_after}T00:00:00Z"
-                published_before_iso = f"{published_before}T23:59:59Z"
-                
-                videos = search_youtube_videos(
-                    youtube, 
-                    search_string, 
-                    max_results=max_results,
-                    video_duration=video_duration,
-                    region_code=region_code,
-                    safe_search=safe_search,
-                    order=order,
-                    video_definition=video_definition,
-                    published_after=published_after_iso,
-                    published_before=published_before_iso
-                )
+                # A narrower version of a search already fetched is filtered
+                # from its results locally: no API call, no quota
+                videos = answer_from_pool(search_string, max_results, **options)
+                if videos is None:
+                    videos = search_youtube_videos(
+                        youtube, 
+                        search_string, 
+                        max_results=max_results,
+                        session=st.session_state.quota_session,
+                        **options
+                    )
+                    # Only the fields the cards show are kept in session state
+                    videos = to_results(enrich_search_results(youtube, videos, st.session_state.quota_session))
+                    remember_pool(search_string, videos, search_exhausted(search_string, max_results, **options), **options)
+                prefetch_thumbnails([video.thumbnail_url for video in videos] + [video.channel_thumbnail_url for video in videos])
                 
                 # Store results in session state
                 st.session_state.search_results = videos
                 st.session_state.last_search_term = search_string
+                # Players of the previous results' videos would otherwise pile up in session state
+                prune_players(st.session_state, videos)
         
         # Display results from session state (if any)
         if st.session_state.search_results:
@@ -210,67 +375,9 @@ def main():
                 st.success(f"Found {len(videos)} videos for: **{search_string}**")
                 
                 # Display results
-                for i, item in enumerate(videos, 1):
-                    title = item['snippet']['title']
-                    channel = item['snippet']['channelTitle']
-                    video_id = item['id']['videoId']
-                    published = item['snippet']['publishedAt']
-                    description = item['snippet']['description']
-                    thumbnail_url = item['snippet']['thumbnails']['medium']['url']
-                    video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    
-                    # Create a card-like display for each video
-                    with st.container():
-                        st.markdown("---")
-                        
-                        # Create columns for thumbnail and info
-                        thumb_col, info_col = st.columns([1, 3])
-                        
-                        with thumb_col:
-                            st.image(thumbnail_url, width=150)
-                        
-                        with info_col:
-                            st.markdown(f"**{i}. {title}**")
-                            st.markdown(f"📺 **Channel:** {channel}")
-                            st.markdown(f"📅 **Published:** {published[:10]}")
-                            st.markdown(f"🔗 **URL:** {video_url}")
-                            
-                            # Add embedded video player
-                            play_button_key = f"play_video_{i}_{video_id}"
-                            if st.button(f"▶️ Play Video", key=play_button_key, type="secondary"):
-                                st.session_state[f"show_video_{video_id}"] = True
-                                st.rerun()
-                            
-                            # Show embedded video if play button was clicked
-                            if st.session_state.get(f"show_video_{video_id}", False):
-                                st.markdown('<div class="video-title">🎬 Now Playing:</div>', unsafe_allow_html=True)
-                                # Embed YouTube video using iframe with responsive design
-                                embed_url = f"https://www.youtube.com/embed/{video_id}?autoplay=1&rel=0&modestbranding=1"
-                                st.markdown(f"""
-                                <div class="video-container">
-                                    <iframe 
-                                    src="{embed_url}" 
-                                    frameborder="0" 
-                                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" 
-                                    allowfullscreen>
-                                    </iframe>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Add a button to hide the video
-                                hide_button_key = f"hide_video_{i}_{video_id}"
-                                if st.button("❌ Close Video", key=hide_button_key):
-                                    st.session_state[f"show_video_{video_id}"] = False
-                                    st.rerun()
-                            
-                            # Add external link as backup
-                            st.markdown(f"[🔗 Open in YouTube]({video_url})")
-                            
-                            # Show description (truncated)
-                            if description:
-                                desc_preview = description[:200] + "..." if len(description) > 200 else description
-                                with st.expander("📝 Description"):
-                                    st.write(desc_preview)
+                with stage_seconds.time("render"):
+                    for i, video in enumerate(videos, 1):
+                        render_video_card(i, video)
             
             else:
                 st.warning("No videos found. Try different search terms.")
@@ -284,6 +391,12 @@ def main():
     # Footer
     st.markdown("---")
     st.markdown("Made with ❤️ using Streamlit and YouTube Data API v3")
+    
+    # The page is drawn; build the API client in the background so the first search doesn't wait for it,
+    # and keep the example searches cached
+    warm_client(next(iter(keys_from_env()), None))
+    start_cache_warmer(use_keys(keys_from_env()))
+    start_metrics_exporter()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
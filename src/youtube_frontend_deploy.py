@@ -1,21 +1,52 @@
 import streamlit as st
-from googleapiclient.discovery import build
-import os
 from dotenv import load_dotenv
-from datetime import date
 
-# Load environment variables
+# Load environment variables before the project modules read their settings
 load_dotenv()
 
+from youtube_client import get_client, warm_client
+from youtube_api import MAX_TOTAL_RESULTS, continuation_token, iter_search_pages, search_exhausted, search_videos
+from youtube_enrich import enrich_videos
+from youtube_rank import RANK_OPTIONS, rank_videos
+from youtube_quota import QuotaExhausted, ledger
+from youtube_retry import api_breaker
+from youtube_keys import keys_from_env, parse_keys, use_keys
+from youtube_store import record_search, search_local
+from cache_warmer import start_cache_warmer
+from metrics import stage_seconds, start_metrics_exporter
+from thumbnail_cache import local_thumbnail, prefetch_thumbnails
+from video_result import SESSION_MAX_RESULTS, prune_players, to_results
+from query_planner import answer_from_pool, remember_pool
+from query_suggest import suggest
+from saved_searches import check_saved_search, delete_saved_search, get_saved_search, save_search, saved_results, saved_searches, watch_enabled
+import os
+import sqlite3
+import time
+import uuid
+from datetime import date
+
+API_MODE = "🌐 YouTube API"
+LOCAL_MODE = "💾 Local index"
+# Suggestions shown under the search box
+SUGGESTIONS_SHOWN = 5
+
+def get_api_keys():
+    """Return the API keys from Streamlit secrets or the environment"""
+    # Try to get API keys from Streamlit secrets first (for cloud deployment);
+    # API_KEYS holds one key per Google Cloud project
+    for name in ("API_KEYS", "API_KEY"):
+        try:
+            keys = parse_keys(st.secrets[name])
+        except (KeyError, FileNotFoundError):
+            continue
+        if keys:
+            return keys
+    # Fallback to environment variables (for local development)
+    return keys_from_env()
+
 def get_youtube_service():
     """Initialize YouTube API service with deployment-friendly API key handling"""
-    # Try to get API key from Streamlit secrets first (for cloud deployment)
-    api_key = None
-    try:
-        api_key = st.secrets["API_KEY"]
-    except (KeyError, FileNotFoundError):
-        # Fallback to environment variable (for local development)
-        api_key = os.getenv("API_KEY")
+    api_key = use_keys(get_api_keys())
     
     if not api_key:
         st.error("ERROR: API_KEY is not configured!")
@@ -24,6 +55,7 @@ def get_youtube_service():
         
         **For Streamlit Cloud deployment:**
         - Add API_KEY to your app's secrets in the Streamlit Cloud dashboard
+        - To pool the quota of several projects, add API_KEYS (comma-separated) instead
         
         **For local development:**
         - Set API_KEY in your .env file
@@ -34,35 +66,244 @@ def get_youtube_service():
         """)
         st.stop()
     
-    return build("youtube", "v3", developerKey=api_key)
+    with stage_seconds.time("get_service"):
+        return get_client(api_key)
 
-def search_youtube_videos(youtube, search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", video_definition="any", published_after="2024-01-01T00:00:00Z", published_before="2025-07-31T23:59:59Z"):
+def search_youtube_videos(youtube, search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", video_definition="any", published_after="2024-01-01T00:00:00Z", published_before=None, session=None):
     """Search for YouTube videos with dynamic parameters"""
     try:
-        request = youtube.search().list(
-            part="snippet",
-            maxResults=max_results,
-            q=search_string,
-            videoDuration=video_duration,
-            videoEmbeddable="true",
-            type="video",
-            regionCode=region_code,
-            relevanceLanguage='en',
-            safeSearch=safe_search,
-            videoCaption='any',
-            videoDefinition=video_definition,
-            publishedAfter=published_after,
-            publishedBefore=published_before,
-            order=order
-        )
-        
-        response = request.execute()
-        return response['items']
+        with stage_seconds.time("search"):
+            return search_videos(
+                youtube,
+                search_string,
+                max_results=max_results,
+                video_duration=video_duration,
+                region_code=region_code,
+                safe_search=safe_search,
+                order=order,
+                video_definition=video_definition,
+                published_after=published_after,
+                published_before=published_before,
+                session=session
+            )
+    
+    except QuotaExhausted as e:
+        st.warning(f"⚠️ {str(e)}. Only cached results are available until the quota resets.")
+        return []
     
     except Exception as e:
         st.error(f"Error searching YouTube: {str(e)}")
         return []
 
+def search_youtube_video_pages(youtube, search_string, max_results=5, session=None, **options):
+    """Yield enriched pages of YouTube search results, as VideoResults, as they arrive"""
+    try:
+        started = time.perf_counter()
+        for page in iter_search_pages(youtube, search_string, max_results=max_results, session=session, **options):
+            # One videos.list call per page adds views, duration and likes;
+            # only the fields the cards show are kept in session state
+            page = to_results(enrich_videos(youtube, page, session))
+            # Time from asking for a page to having it enriched, excluding the caller's rendering
+            stage_seconds.observe(time.perf_counter() - started, "search_page")
+            yield page
+            started = time.perf_counter()
+    
+    except QuotaExhausted as e:
+        st.warning(f"⚠️ {str(e)}. Only cached results are available until the quota resets.")
+    
+    except Exception as e:
+        st.error(f"Error searching YouTube: {str(e)}")
+
+def search_local_index(search_string, max_results=5):
+    """Search previously fetched videos in the local SQLite index"""
+    try:
+        return to_results(search_local(search_string, limit=max_results))
+    
+    except sqlite3.Error as e:
+        st.error(f"Error searching the local index: {str(e)}")
+        return []
+
+def load_more_results():
+    """Button callback: append the next results of the current search"""
+    request = st.session_state.search_request
+    page_token = st.session_state.next_page_token
+    if not request or not page_token:
+        return
+    youtube = get_youtube_service()
+    # Usually a cache hit: the page was prefetched while the last results were on screen
+    pages = search_youtube_video_pages(
+        youtube,
+        request['query'],
+        max_results=request['max_results'],
+        session=st.session_state.quota_session,
+        page_token=page_token,
+        speculate=True,
+        **request['options']
+    )
+    results = st.session_state.search_results
+    for page in pages:
+        results.extend(page[:SESSION_MAX_RESULTS - len(results)])
+    # The longer result list makes a bigger pool for narrower searches; it
+    # holds everything the search matched only if none was cut off above
+    exhausted = len(results) < SESSION_MAX_RESULTS and search_exhausted(
+        request['query'], request['max_results'], page_token=page_token, **request['options']
+    )
+    remember_pool(request['query'], results, exhausted, **request['options'])
+    st.session_state.next_page_token = next_token(
+        results, request['query'], request['max_results'], page_token=page_token, **request['options']
+    )
+
+def pick_suggestion(query):
+    """Button callback: search for a suggested query"""
+    st.session_state.search_text = query
+    st.session_state.suggestion_picked = True
+
+def render_suggestions(search_string, max_results, options):
+    """Show suggestions from earlier searches for the typed text; picking one is usually a cache hit"""
+    for i, suggestion in enumerate(suggest(search_string, SUGGESTIONS_SHOWN, max_results, **options)):
+        if suggestion['kind'] == "title":
+            label = "🎬 " + (suggestion['text'][:60] + "..." if len(suggestion['text']) > 60 else suggestion['text'])
+            help_text = f"Search \"{suggestion['query']}\", which found this video"
+        else:
+            label = suggestion['text']
+            help_text = f"Search \"{suggestion['query']}\""
+        if suggestion['cached']:
+            label = "⚡ " + label
+            help_text += ": results already fetched, no quota used"
+        st.button(label, key=f"suggestion_{i}", on_click=pick_suggestion, args=(suggestion['query'],),
+                  help=help_text, use_container_width=True)
+
+def next_token(results, search_string, max_results, page_token=None, **options):
+    """Return the "Load more" page token, or None once the session holds SESSION_MAX_RESULTS results"""
+    if len(results) >= SESSION_MAX_RESULTS:
+        return None
+    return continuation_token(search_string, max_results, page_token=page_token, **options)
+
+def show_results(videos, search_string, notice):
+    """Put results that did not come from the search form into session state"""
+    st.session_state.search_results = to_results(videos)[:SESSION_MAX_RESULTS]
+    st.session_state.last_search_term = search_string
+    st.session_state.next_page_token = None
+    st.session_state.search_request = None
+    st.session_state.watch_notice = notice
+    prune_players(st.session_state, st.session_state.search_results)
+
+def watch_current_search():
+    """Button callback: save the current search; its first check records what it finds today"""
+    request = st.session_state.search_request
+    if not request:
+        return
+    saved = save_search(request['query'], **request['options'])
+    if saved is not None:
+        check_watched_search(saved['id'])
+
+def check_watched_search(search_id):
+    """Button callback: show the videos a saved search has not seen before"""
+    saved = get_saved_search(search_id)
+    if saved is None:
+        return
+    youtube = get_youtube_service()
+    session = st.session_state.quota_session
+    try:
+        new = check_saved_search(youtube, saved, session=session)
+        new = enrich_videos(youtube, new, session)
+    except QuotaExhausted as e:
+        st.session_state.watch_notice = f"⚠️ {str(e)}. Try again after the quota resets."
+        return
+    except Exception as e:
+        st.session_state.watch_notice = f"Error checking saved search: {str(e)}"
+        return
+    if saved['watermark']:
+        notice = f"🆕 {len(new)} new videos for **{saved['query']}** since {saved['watermark'][:16].replace('T', ' ')} UTC"
+    else:
+        notice = f"👀 Watching **{saved['query']}**: {len(new)} videos so far. Check again later for new ones."
+    checked = get_saved_search(search_id)
+    if saved['watermark'] and checked is not None and checked['gap']:
+        notice += " More new videos are waiting: check again to fetch them."
+    show_results(new, saved['query'], notice)
+
+def show_watched_search(search_id):
+    """Button callback: show everything a saved search has found, newest first"""
+    saved = get_saved_search(search_id)
+    if saved is not None:
+        videos = saved_results(search_id, SESSION_MAX_RESULTS)
+        show_results(videos, saved['query'], f"📂 {len(videos)} saved videos for **{saved['query']}**")
+
+def set_video_visible(video_id, visible):
+    """Button callback: show or hide the embedded player for one video"""
+    if visible:
+        st.session_state[f"show_video_{video_id}"] = True
+    else:
+        st.session_state.pop(f"show_video_{video_id}", None)
+
+# Each card is a fragment: Play/Close only re-executes that card, not the whole script
+@st.fragment
+def render_video_card(i, video):
+    """Render one search result (a VideoResult) as a card with thumbnail, details and player"""
+    title = video.title
+    channel = video.channel_line()
+    video_id = video.video_id
+    published = video.published
+    description = video.description_preview()
+    thumbnail_url = video.thumbnail_url
+    video_url = video.url
+    video_stats = video.stats_line()
+
+    # Create a card-like display for each video
+    with st.container():
+        st.markdown("---")
+
+        # Create columns for thumbnail and info
+        thumb_col, info_col = st.columns([1, 3])
+
+        with thumb_col:
+            # Served from the local thumbnail cache instead of i.ytimg.com
+            st.image(local_thumbnail(thumbnail_url), width=150)
+
+        with info_col:
+            st.markdown(f"**{i}. {title}**")
+            if video.channel_thumbnail_url:
+                st.image(local_thumbnail(video.channel_thumbnail_url), width=32)
+            st.markdown(f"📺 **Channel:** {channel}")
+            st.markdown(f"📅 **Published:** {published[:10]}")
+            if video_stats:
+                st.markdown(video_stats)
+
+            # Add embedded video player. The buttons are not put in their own
+            # columns because Streamlit allows only one level of column nesting.
+            play_button_key = f"play_video_{i}_{video_id}"
+            st.button(f"▶️ Play Video", key=play_button_key, type="secondary",
+                      on_click=set_video_visible, args=(video_id, True))
+
+            # Add external link
+            st.link_button("🔗 Open in YouTube", video_url)
+
+            # Show embedded video if play button was clicked
+            if st.session_state.get(f"show_video_{video_id}", False):
+                st.markdown('<div class="video-title">🎬 Now Playing:</div>', unsafe_allow_html=True)
+                # Embed YouTube video using iframe with responsive design
+                embed_url = f"https://www.youtube.com/embed/{video_id}?autoplay=1&rel=0&modestbranding=1"
+                st.markdown(f"""
+                <div class="video-container">
+                    <iframe 
+                    src="{embed_url}" 
+                    frameborder="0" 
+                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" 
+                    allowfullscreen>
+                    </iframe>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Add a button to hide the video
+                hide_button_key = f"hide_video_{i}_{video_id}"
+                st.button("❌ Close Video", key=hide_button_key,
+                          on_click=set_video_visible, args=(video_id, False))
+
+            # Show description (truncated when the result was built)
+            if description:
+                with st.expander("📝 Description"):
+                    st.write(description)
+
 def main():
     st.set_page_config(
         page_title="YouTube Search App - Deployed",
@@ -71,13 +312,20 @@ def main():
         initial_sidebar_state="collapsed"
     )
     
-    # Initialize session state for video display and search results
-    if 'video_states' not in st.session_state:
-        st.session_state.video_states = {}
+    # Initialize session state for search results
     if 'search_results' not in st.session_state:
         st.session_state.search_results = []
     if 'last_search_term' not in st.session_state:
         st.session_state.last_search_term = ""
+    if 'next_page_token' not in st.session_state:
+        st.session_state.next_page_token = None
+        st.session_state.search_request = None
+    if 'quota_session' not in st.session_state:
+        st.session_state.quota_session = uuid.uuid4().hex
+    if 'watch_notice' not in st.session_state:
+        st.session_state.watch_notice = None
+    if 'suggestion_picked' not in st.session_state:
+        st.session_state.suggestion_picked = False
     
     # Custom CSS for better video embedding and deployment styling
     st.markdown("""
@@ -166,6 +414,11 @@ def main():
         Python: {os.sys.version.split()[0]}
         API: YouTube Data API v3
         """)
+        
+        quota = ledger.stats(st.session_state.quota_session)
+        st.caption(f"📊 API quota used today: {quota['used']:,} / {quota['daily_limit']:,} units (this session: {quota['session_used']:,})")
+        if api_breaker.state != "closed":
+            st.caption("⚠️ The YouTube API is failing; recent searches are answered from cache")
     
     # Create two columns for better layout
     col1, col2 = st.columns([1, 2])
@@ -179,29 +432,67 @@ def main():
         search_string = st.text_input(
             "Enter your search term:",
             placeholder="e.g., theory of relativity, cooking tutorial, music",
-            help="Enter keywords to search for YouTube videos"
+            help="Enter keywords to search for YouTube videos; press Enter for suggestions from earlier searches",
+            key="search_text"
+        )
+        # Filled in once the search options below are known
+        suggestion_area = st.container()
+        
+        # Search source
+        search_mode = st.radio(
+            "Search source",
+            [API_MODE, LOCAL_MODE],
+            horizontal=True,
+            help="The local index searches every video fetched so far: instant and free of API quota"
         )
         
         # Search button
         search_button = st.button("🔍 Search Videos", type="primary", use_container_width=True)
+        # A picked suggestion searches right away
+        picked = st.session_state.suggestion_picked
+        st.session_state.suggestion_picked = False
+        search_button = search_button or picked
         
         # Clear results button (only show if there are results)
         if st.session_state.search_results:
             if st.button("🗑️ Clear Results", type="secondary", use_container_width=True):
                 st.session_state.search_results = []
                 st.session_state.last_search_term = ""
+                st.session_state.next_page_token = None
+                st.session_state.search_request = None
                 # Clear all video states
-                for key in list(st.session_state.keys()):
-                    if key.startswith("show_video_"):
-                        del st.session_state[key]
+                prune_players(st.session_state)
                 st.rerun()
         
+        # Saved searches: re-check for videos published since the last check
+        if watch_enabled():
+            watched = saved_searches()
+            if watched:
+                with st.expander(f"👀 Watched searches ({len(watched)})"):
+                    for saved in watched:
+                        checked = (saved['checked_at'] or saved['created_at'])[:16].replace('T', ' ')
+                        st.markdown(f"**{saved['query']}**")
+                        st.caption(f"{saved['count']} videos · last checked {checked} UTC")
+                        check_col, show_col, delete_col = st.columns(3)
+                        with check_col:
+                            st.button("🔄 New", key=f"watch_check_{saved['id']}", on_click=check_watched_search,
+                                      args=(saved['id'],), help="Fetch only videos published since the last check")
+                        with show_col:
+                            st.button("📂 All", key=f"watch_show_{saved['id']}", on_click=show_watched_search,
+                                      args=(saved['id'],), help="Show every video this search has found")
+                        with delete_col:
+                            st.button("🗑️", key=f"watch_delete_{saved['id']}", on_click=delete_saved_search,
+                                      args=(saved['id'],), help="Stop watching this search")
+        
         # Additional search options (optional)
         with st.expander("⚙️ Advanced Options"):
             col_a, col_b = st.columns(2)
             
             with col_a:
-                max_results = st.slider("Number of results", 1, 10, 5)
+                max_results = st.slider(
+                    "Number of results", 1, MAX_TOTAL_RESULTS, 5,
+                    help="Results are fetched 50 per page; each page costs one search (100 quota units)"
+                )
                 video_duration = st.selectbox(
                     "Video Duration",
                     ["short", "medium", "long", "any"],
@@ -247,120 +538,129 @@ def main():
             with date_col2:
                 published_before = st.date_input(
                     "Published Before", 
-                    value=date(2025, 7, 31),
+                    value=date.today(),
                     help="Show videos published before this date"
                 )
+        
+        # Convert dates to ISO format
+        published_after_iso = f"{published_after}T00:00:00Z"
+        # Up to today means no upper bound, so new uploads keep showing up
+        published_before_iso = None if published_before >= date.today() else f"{published_before}T23:59:59Z"
+        
+        options = dict(
+            video_duration=video_duration,
+            region_code=region_code,
+            safe_search=safe_search,
+            order=order,
+            video_definition=video_definition,
+            published_after=published_after_iso,
+            published_before=published_before_iso,
+        )
+        max_results = min(max_results, SESSION_MAX_RESULTS)
+        
+        if search_string and not search_button and search_mode == API_MODE and search_string != st.session_state.last_search_term:
+            with suggestion_area:
+                render_suggestions(search_string, max_results, options)
     
     with col2:
         st.subheader("📺 Search Results")
         
+        # Re-ordering happens locally on the fetched results: no API call, no quota
+        rank_label = st.selectbox(
+            "Re-rank results",
+            list(RANK_OPTIONS),
+            help="Re-orders the results already fetched without calling the API"
+        )
+        rank_by = RANK_OPTIONS[rank_label]
+        
+        # Cards already drawn while streaming pages in during this run
+        rendered_now = False
+        
+        # Outcome of the last saved-search check, shown once
+        if st.session_state.watch_notice:
+            st.info(st.session_state.watch_notice)
+            st.session_state.watch_notice = None
+        
         # Output area
-        if search_button and search_string:
-            with st.spinner("🔍 Searching YouTube videos..."):
-                try:
-                    youtube = get_youtube_service()
-                    
-                    # Convert dates to ISO format
-                    published_after_iso = f"{published_after}T00:00:00Z"
-                    published_before_iso = f"{published_before}T23:59:59Z"
-                    
-                    videos = search_youtube_videos(
+        if search_button and search_string and search_mode == LOCAL_MODE:
+            st.session_state.search_results = search_local_index(search_string, max_results)[:SESSION_MAX_RESULTS]
+            st.session_state.last_search_term = search_string
+            st.session_state.next_page_token = None
+            st.session_state.search_request = None
+            prune_players(st.session_state, st.session_state.search_results)
+        
+        elif search_button and search_string:
+            try:
+                youtube = get_youtube_service()
+                record_search(search_string)
+                
+                # A narrower version of a search already fetched is filtered
+                # from its results locally: no API call, no quota
+                local_results = answer_from_pool(search_string, max_results, **options)
+                if local_results is not None:
+                    pages = [local_results]
+                else:
+                    # speculate: fetch the page "Load more" would show while this one
+                    # is being read; not for picked suggestions, which should cost nothing
+                    pages = search_youtube_video_pages(
                         youtube, 
                         search_string, 
                         max_results=max_results,
-                        video_duration=video_duration,
-                        region_code=region_code,
-                        safe_search=safe_search,
-                        order=order,
-                        video_definition=video_definition,
-                        published_after=published_after_iso,
-                        published_before=published_before_iso
+                        session=st.session_state.quota_session,
+                        speculate=not picked,
+                        **options
+                    )
+                
+                # Store results in session state and render each page as it arrives
+                st.session_state.search_results = []
+                st.session_state.last_search_term = search_string
+                summary = st.empty()
+                
+                with st.spinner("🔍 Searching YouTube videos..."):
+                    for page in pages:
+                        # Download this page's thumbnails and channel avatars in parallel (bounded) before drawing cards
+                        prefetch_thumbnails([video.thumbnail_url for video in page] + [video.channel_thumbnail_url for video in page])
+                        st.session_state.search_results.extend(page)
+                        if rank_by:
+                            # A re-ranked list can only be drawn once every page is in
+                            continue
+                        with stage_seconds.time("render"):
+                            for i, video in enumerate(page, len(st.session_state.search_results) - len(page) + 1):
+                                render_video_card(i, video)
+                        if st.session_state.search_results:
+                            summary.success(f"✅ Found {len(st.session_state.search_results)} videos for: **{search_string}**")
+                            rendered_now = True
+                
+                if local_results is None:
+                    remember_pool(
+                        search_string, st.session_state.search_results,
+                        search_exhausted(search_string, max_results, **options), **options
                     )
-                    
-                    # Store results in session state
-                    st.session_state.search_results = videos
-                    st.session_state.last_search_term = search_string
-                    
-                except Exception as e:
-                    st.error(f"Failed to initialize YouTube service: {str(e)}")
-                    st.info("Please check your API key configuration.")
+                else:
+                    st.caption("⚡ Filtered from results already fetched: no API call, no quota used")
+                st.session_state.search_request = dict(query=search_string, max_results=max_results, options=options)
+                st.session_state.next_page_token = next_token(st.session_state.search_results, search_string, max_results, **options)
+                # Players of the previous results' videos would otherwise pile up in session state
+                prune_players(st.session_state, st.session_state.search_results)
+                
+            except Exception as e:
+                st.error(f"Failed to initialize YouTube service: {str(e)}")
+                st.info("Please check your API key configuration.")
         
         # Display results from session state (if any)
-        if st.session_state.search_results:
-            videos = st.session_state.search_results
+        if st.session_state.search_results and not rendered_now:
             search_string = st.session_state.last_search_term
+            videos = rank_videos(st.session_state.search_results, search_string, rank_by)
             
-            if videos:
-                st.success(f"✅ Found {len(videos)} videos for: **{search_string}**")
-                
-                # Display results
-                for i, item in enumerate(videos, 1):
-                    title = item['snippet']['title']
-                    channel = item['snippet']['channelTitle']
-                    video_id = item['id']['videoId']
-                    published = item['snippet']['publishedAt']
-                    description = item['snippet']['description']
-                    thumbnail_url = item['snippet']['thumbnails']['medium']['url']
-                    video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    
-                    # Create a card-like display for each video
-                    with st.container():
-                        st.markdown("---")
-                        
-                        # Create columns for thumbnail and info
-                        thumb_col, info_col = st.columns([1, 3])
-                        
-                        with thumb_col:
-                            st.image(thumbnail_url, width=150)
-                        
-                        with info_col:
-                            st.markdown(f"**{i}. {title}**")
-                            st.markdown(f"📺 **Channel:** {channel}")
-                            st.markdown(f"📅 **Published:** {published[:10]}")
-                            
-                            # Create button columns
-                            btn_col1, btn_col2 = st.columns([1, 1])
-                            
-                            with btn_col1:
-                                # Add embedded video player
-                                play_button_key = f"play_video_{i}_{video_id}"
-                                if st.button(f"▶️ Play Video", key=play_button_key, type="secondary"):
-                                    st.session_state[f"show_video_{video_id}"] = True
-                                    st.rerun()
-                            
-                            with btn_col2:
-                                # Add external link
-                                st.link_button("🔗 Open in YouTube", video_url)
-                            
-                            # Show embedded video if play button was clicked
-                            if st.session_state.get(f"show_video_{video_id}", False):
-                                st.markdown('<div class="video-title">🎬 Now Playing:</div>', unsafe_allow_html=True)
-                                # Embed YouTube video using iframe with responsive design
-                                embed_url = f"https://www.youtube.com/embed/{video_id}?autoplay=1&rel=0&modestbranding=1"
-                                st.markdown(f"""
-                                <div class="video-container">
-                                    <iframe 
-                                    src="{embed_url}" 
-                                    frameborder="0" 
-                                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share" 
-                                    allowfullscreen>
-                                    </iframe>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                # Add a button to hide the video
-                                hide_button_key = f"hide_video_{i}_{video_id}"
-                                if st.button("❌ Close Video", key=hide_button_key):
-                                    st.session_state[f"show_video_{video_id}"] = False
-                                    st.rerun()
-                            
-                            # Show description (truncated)
-                            if description:
-                                desc_preview = description[:200] + "..." if len(description) > 200 else description
-                                with st.expander("📝 Description"):
-                                    st.write(desc_preview)
+            st.success(f"✅ Found {len(videos)} videos for: **{search_string}**")
             
-            else:
+            # Display results
+            with stage_seconds.time("render"):
+                for i, video in enumerate(videos, 1):
+                    render_video_card(i, video)
+        
+        elif search_button and search_string:
+            if not rendered_now:
                 st.warning("⚠️ No videos found. Try different search terms or adjust your filters.")
         
         elif search_button and not search_string:
@@ -384,6 +684,12 @@ def main():
                 - 💻 "programming for beginners"
                 - 🎨 "digital art techniques"
                 """)
+        
+        if st.session_state.search_results and st.session_state.next_page_token:
+            st.button("➕ Load more results", use_container_width=True, on_click=load_more_results)
+        if watch_enabled() and st.session_state.search_results and st.session_state.search_request:
+            st.button("⭐ Watch this search", use_container_width=True, on_click=watch_current_search,
+                      help="Save this search; checking it later only fetches videos published since the last check")
     
     # Footer
     st.markdown("---")
@@ -393,6 +699,14 @@ def main():
         🚀 <strong>Deployment Ready</strong> | 🌐 <strong>Cross-Platform Compatible</strong>
     </div>
     """, unsafe_allow_html=True)
+    
+    # The page is drawn; build the API client in the background so the first search doesn't wait for it,
+    # and keep the example searches cached
+    keys = get_api_keys()
+    if keys:
+        warm_client(keys[0])
+        start_cache_warmer(use_keys(keys))
+    start_metrics_exporter()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
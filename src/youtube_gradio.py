@@ -1,83 +1,332 @@
-import gradio as gr
-from googleapiclient.discovery import build
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import gradio as gr
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables before the project modules read their settings
 load_dotenv()
 
+from youtube_client import get_client, warm_client
+from youtube_api import MAX_TOTAL_RESULTS, iter_search_pages, search_exhausted
+from youtube_enrich import enrich_videos
+from youtube_rank import RANK_OPTIONS, rank_videos
+from youtube_quota import QuotaExhausted
+from youtube_keys import keys_from_env, use_keys
+from youtube_store import record_search, search_local
+from cache_warmer import start_cache_warmer
+from metrics import stage_seconds, start_metrics_exporter
+from video_result import SESSION_MAX_RESULTS, to_results
+from query_planner import answer_from_pool, remember_pool
+from query_suggest import suggest
+from saved_searches import check_saved_search, delete_saved_search, get_saved_search, save_search, saved_results, saved_searches, watch_enabled
+
+API_MODE = "🌐 YouTube API"
+LOCAL_MODE = "💾 Local index"
+# Suggestions shown under the search box
+SUGGESTIONS_SHOWN = 5
+
+# Searches running at once, searches allowed to wait in the queue, and the
+# longest a search may take before the user gets what has arrived so far
+SEARCH_CONCURRENCY = int(os.getenv("GRADIO_CONCURRENCY", "16"))
+QUEUE_SIZE = int(os.getenv("GRADIO_QUEUE_SIZE", "64"))
+SEARCH_TIMEOUT = float(os.getenv("GRADIO_SEARCH_TIMEOUT", "30"))
+
+# The blocking API calls of admitted searches run here, off the event loop. A
+# search that timed out keeps its thread until its current API call returns,
+# so there are twice as many threads as admitted searches: abandoned steps
+# cannot starve the searches admitted after them
+_search_executor = ThreadPoolExecutor(max_workers=2 * SEARCH_CONCURRENCY, thread_name_prefix="gradio-search")
+_DONE = object()
+
 def get_youtube_service():
     """Initialize YouTube API service"""
-    api_key = os.getenv("API_KEY")
+    api_key = use_keys(keys_from_env())
     if not api_key:
         return None, "ERROR: API_KEY environment variable is not set! Please set your YouTube Data API v3 key in your .env file"
     
     try:
-        return build("youtube", "v3", developerKey=api_key), None
+        with stage_seconds.time("get_service"):
+            return get_client(api_key), None
     except Exception as e:
         return None, f"Error initializing YouTube service: {str(e)}"
 
-def search_youtube_videos(search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance"):
-    """Search for YouTube videos and return formatted results"""
+def search_options(video_duration="short", region_code="NL", safe_search="strict", order="relevance", published_after="2024-01-01", published_before=None):
+    """Return the build_search_params() keywords of a search made in this app
+
+    Dates are YYYY-MM-DD; raises ValueError for anything else. An empty
+    published_before, or today, leaves the upper bound open so new uploads
+    keep showing up.
+    """
+    after = date.fromisoformat(published_after[:10]) if published_after else date(2024, 1, 1)
+    before = date.fromisoformat(published_before[:10]) if published_before else None
+    return dict(
+        video_duration=video_duration,
+        region_code=region_code,
+        safe_search=safe_search,
+        order=order,
+        video_definition='high',
+        published_after=f"{after}T00:00:00Z",
+        published_before=None if before is None or before >= date.today() else f"{before}T23:59:59Z",
+    )
+
+def search_youtube_videos(search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", search_mode=API_MODE, rank_label="API order", published_after="2024-01-01", published_before=None, request: gr.Request = None, deadline=None):
+    """Search for YouTube videos and stream formatted results page by page
+
+    Yields (text, pool); the pool of fetched results is kept in gr.State so
+    re-ranking does not search again. Past deadline (time.monotonic()) no
+    further API call is started.
+    """
     if not search_string.strip():
-        return "Please enter a search term."
+        yield "Please enter a search term.", None
+        return
+    
+    if search_mode == LOCAL_MODE:
+        yield search_local_index(search_string, max_results, rank_label)
+        return
+    
+    try:
+        options = search_options(video_duration, region_code, safe_search, order, published_after, published_before)
+    except ValueError:
+        yield "Please enter dates as YYYY-MM-DD.", None
+        return
     
     youtube, error = get_youtube_service()
     if error:
-        return error
+        yield error, None
+        return
+    
+    pool = {'title': f"🎥 Search results for: {search_string}", 'query': search_string, 'items': []}
+    # Gradio injects the request; its session hash scopes the per-session quota
+    session = request.session_hash if request else None
+    
+    record_search(search_string)
+    
+    max_results = min(max_results, SESSION_MAX_RESULTS)
+    
+    # A narrower version of a search already fetched (e.g. "any" duration
+    # narrowed to "short") is filtered from its results locally: no quota
+    local_results = answer_from_pool(search_string, max_results, **options)
+    if local_results is not None:
+        pool['items'] = local_results
+        yield (format_results(pool, rank_label), pool) if local_results else ("No videos found. Try different search terms.", None)
+        return
     
     try:
-        request = youtube.search().list(
-            part="snippet",
-            maxResults=max_results,
-            q=search_string,
-            videoDuration=video_duration,
-            videoEmbeddable="true",
-            type="video",
-            regionCode=region_code,
-            relevanceLanguage='en',
-            safeSearch=safe_search,
-            videoCaption='any',
-            videoDefinition='high',
-            publishedAfter='2024-01-01T00:00:00Z',
-            publishedBefore='2025-07-31T23:59:59Z',
-            order=order
-        )
-        
-        response = request.execute()
-        videos = response['items']
-        
-        if not videos:
-            return "No videos found. Try different search terms."
-        
-        # Format the output
-        output_text = f"🎥 Search results for: {search_string}\n"
-        output_text += "=" * 50 + "\n\n"
+        pages = iter_search_pages(youtube, search_string, max_results=max_results, session=session, **options)
         
-        for i, item in enumerate(videos, 1):
-            title = item['snippet']['title']
-            channel = item['snippet']['channelTitle']
-            video_id = item['id']['videoId']
-            published = item['snippet']['publishedAt']
-            description = item['snippet']['description']
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
+        for page in pages:
+            if deadline is not None and time.monotonic() >= deadline:
+                # The caller has given up on this search: stop spending quota on it
+                pages.close()
+                return
+            # One videos.list call per page adds views, duration and likes;
+            # the pool (per-session gr.State) keeps only the fields we format
+            pool['items'].extend(to_results(enrich_videos(youtube, page, session)))
             
-            output_text += f"{i}. 📺 Title: {title}\n"
-            output_text += f"   👤 Channel: {channel}\n"
-            output_text += f"   📅 Published: {published[:10]}\n"
-            output_text += f"   🔗 URL: {video_url}\n"
-            
-            # Add description preview
-            if description:
-                desc_preview = description[:100] + "..." if len(description) > 100 else description
-                output_text += f"   📝 Description: {desc_preview}\n"
-            
-            output_text += "-" * 30 + "\n\n"
+            # Show the results gathered so far while later pages load
+            if pool['items']:
+                yield format_results(pool, rank_label), pool
         
-        return output_text
+        remember_pool(search_string, pool['items'], search_exhausted(search_string, max_results, **options), **options)
+        if not pool['items']:
+            yield "No videos found. Try different search terms.", None
+    
+    except QuotaExhausted as e:
+        message = f"⚠️ {str(e)}. Only cached results are available until the quota resets."
+        if pool['items']:
+            yield format_results(pool, rank_label) + message, pool
+        else:
+            yield message, None
     
     except Exception as e:
-        return f"Error searching YouTube: {str(e)}"
+        if pool['items']:
+            yield format_results(pool, rank_label) + f"Error searching YouTube: {str(e)}", pool
+        else:
+            yield f"Error searching YouTube: {str(e)}", None
+
+async def search_youtube_videos_async(search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", search_mode=API_MODE, rank_label="API order", published_after="2024-01-01", published_before=None, request: gr.Request = None):
+    """Async search handler: streams search_youtube_videos() from a bounded thread pool, with a timeout
+
+    The event loop never blocks on the API, so a slow search only holds one
+    executor thread. After SEARCH_TIMEOUT the results gathered so far are
+    returned and paging stops.
+    """
+    loop = asyncio.get_running_loop()
+    # loop.time() is time.monotonic(), so the generator checks the same deadline
+    deadline = loop.time() + SEARCH_TIMEOUT
+    results = search_youtube_videos(search_string, max_results, video_duration, region_code, safe_search, order, search_mode, rank_label, published_after, published_before, request, deadline)
+    output, pool = None, None
+    step = None
+    try:
+        while True:
+            step = loop.run_in_executor(_search_executor, next, results, _DONE)
+            try:
+                # shield: a timeout must not abandon the generator mid-step
+                value = await asyncio.wait_for(asyncio.shield(step), max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                message = f"⏱️ The search took longer than {SEARCH_TIMEOUT:g}s and was stopped."
+                yield (output + message, pool) if pool else (message, None)
+                return
+            if value is _DONE:
+                step = None
+                return
+            output, pool = value
+            yield output, pool
+    finally:
+        # Stop paging once the running step (if any) has finished
+        if step is not None and not step.done():
+            step.add_done_callback(lambda _: results.close())
+        else:
+            results.close()
+
+def search_local_index(search_string, max_results=5, rank_label="API order"):
+    """Search previously fetched videos in the local SQLite index"""
+    try:
+        videos = to_results(search_local(search_string, limit=max_results))[:SESSION_MAX_RESULTS]
+    except Exception as e:
+        return f"Error searching the local index: {str(e)}", None
+    
+    if not videos:
+        return "No videos found in the local index. Search the YouTube API first to fill it.", None
+    
+    pool = {'title': f"💾 Local index results for: {search_string}", 'query': search_string, 'items': videos}
+    return format_results(pool, rank_label), pool
+
+def suggest_searches(search_string, max_results=5, video_duration="short", region_code="NL", safe_search="strict", order="relevance", published_after="2024-01-01", published_before=None):
+    """Return suggestions for the typed text and the queries they search; no API call"""
+    try:
+        options = search_options(video_duration, region_code, safe_search, order, published_after, published_before)
+    except ValueError:
+        return gr.Dataset(samples=[], visible=False), []
+    suggestions = suggest(search_string, SUGGESTIONS_SHOWN, min(max_results, SESSION_MAX_RESULTS), **options)
+    samples = [
+        [("⚡ " if suggestion['cached'] else "") + ("🎬 " if suggestion['kind'] == "title" else "") + suggestion['text']]
+        for suggestion in suggestions
+    ]
+    return gr.Dataset(samples=samples, visible=bool(samples)), [suggestion['query'] for suggestion in suggestions]
+
+def pick_suggestion(index, queries):
+    """Put the query of the clicked suggestion in the search box"""
+    return queries[index]
+
+def watched_choices(selected=None):
+    """Return the saved-search dropdown, listing every saved search"""
+    choices = [(f"{saved['query']} ({saved['count']} videos)", saved['id']) for saved in saved_searches()]
+    ids = [search_id for _, search_id in choices]
+    return gr.Dropdown(choices=choices, value=selected if selected in ids else None)
+
+def watch_search(search_string, video_duration="short", region_code="NL", safe_search="strict", published_after="2024-01-01", rank_label="API order", request: gr.Request = None):
+    """Save the search in the form; its first check records what it finds today
+
+    Checks sort by date and run up to now, so the sort order and the
+    Published Before date of the form are not saved.
+    """
+    if not search_string.strip():
+        return "Please enter a search term to watch.", None, gr.update()
+    try:
+        options = search_options(video_duration, region_code, safe_search, published_after=published_after)
+    except ValueError:
+        return "Please enter dates as YYYY-MM-DD.", None, gr.update()
+    saved = save_search(search_string.strip(), **options)
+    if saved is None:
+        return "Saved searches need the result store (RESULT_STORE_PATH).", None, gr.update()
+    text, pool = check_watched_search(saved['id'], rank_label, request)
+    return text, pool, watched_choices(saved['id'])
+
+def check_watched_search(search_id, rank_label="API order", request: gr.Request = None):
+    """Fetch and show the videos a saved search has not seen before"""
+    saved = get_saved_search(search_id) if search_id is not None else None
+    if saved is None:
+        return "Pick a watched search first.", None
+    youtube, error = get_youtube_service()
+    if error:
+        return error, None
+    session = request.session_hash if request else None
+    try:
+        new = check_saved_search(youtube, saved, session=session)
+        new = enrich_videos(youtube, new, session)
+    except QuotaExhausted as e:
+        return f"⚠️ {str(e)}. Try again after the quota resets.", None
+    except Exception as e:
+        return f"Error checking saved search: {str(e)}", None
+    if saved['watermark']:
+        title = f"🆕 {len(new)} new videos for: {saved['query']} since {saved['watermark'][:16].replace('T', ' ')} UTC"
+    else:
+        title = f"👀 Watching: {saved['query']}, {len(new)} videos so far. Check again later for new ones."
+    checked = get_saved_search(search_id)
+    if saved['watermark'] and checked is not None and checked['gap']:
+        title += "\nMore new videos are waiting: check again to fetch them."
+    pool = {'title': title, 'query': saved['query'], 'items': to_results(new)[:SESSION_MAX_RESULTS]}
+    return format_results(pool, rank_label), pool
+
+def check_watched(search_id, rank_label="API order", request: gr.Request = None):
+    """Check a saved search, then refresh the dropdown with its new video count"""
+    text, pool = check_watched_search(search_id, rank_label, request)
+    return text, pool, watched_choices(search_id)
+
+def show_watched(search_id, rank_label="API order"):
+    """Show everything a saved search has found, newest first; no API call"""
+    saved = get_saved_search(search_id) if search_id is not None else None
+    if saved is None:
+        return "Pick a watched search first.", None
+    videos = to_results(saved_results(search_id, SESSION_MAX_RESULTS))
+    pool = {'title': f"📂 {len(videos)} saved videos for: {saved['query']}", 'query': saved['query'], 'items': videos}
+    return format_results(pool, rank_label), pool
+
+def unwatch(search_id):
+    """Delete a saved search"""
+    if search_id is not None:
+        delete_saved_search(search_id)
+    return watched_choices()
+
+def rerank_results(pool, rank_label):
+    """Re-order the fetched results locally; no API call"""
+    if not pool:
+        return gr.update()
+    return format_results(pool, rank_label)
+
+def format_results(pool, rank_label="API order"):
+    """Format a pool of results, ranked by rank_label, as text"""
+    output_text = pool['title'] + "\n"
+    output_text += "=" * 50 + "\n\n"
+    with stage_seconds.time("render"):
+        videos = rank_videos(pool['items'], pool['query'], RANK_OPTIONS.get(rank_label))
+        for i, video in enumerate(videos, 1):
+            output_text += format_video(i, video)
+    return output_text
+
+def format_video(i, video):
+    """Format one search result (a VideoResult) as a block of text"""
+    title = video.title
+    channel = video.channel_line()
+    published = video.published
+    description = video.description_preview()
+    video_url = video.url
+    
+    output_text = f"{i}. 📺 Title: {title}\n"
+    output_text += f"   👤 Channel: {channel}\n"
+    output_text += f"   📅 Published: {published[:10]}\n"
+    video_stats = video.stats_line()
+    if video_stats:
+        output_text += f"   📊 Stats: {video_stats}\n"
+    output_text += f"   🔗 URL: {video_url}\n"
+    
+    # Add description preview
+    if description:
+        desc_preview = description[:100] + "..." if len(description) > 100 else description
+        output_text += f"   📝 Description: {desc_preview}\n"
+    
+    output_text += "-" * 30 + "\n\n"
+    return output_text
+
+def warm_up():
+    """Build the API client and start the cache warmer once a browser has loaded the page"""
+    warm_client(next(iter(keys_from_env()), None))
+    # Same filters as search_youtube_videos() defaults, so warmed searches are cache hits
+    start_cache_warmer(use_keys(keys_from_env()), video_definition='high')
 
 # Create Gradio interface
 def create_interface():
@@ -93,6 +342,20 @@ def create_interface():
                     placeholder="e.g., theory of relativity",
                     info="Enter keywords to search for YouTube videos"
                 )
+                # Earlier searches matching what is typed; ⚡ marks cached ones
+                suggestions = gr.Dataset(
+                    label="Suggestions",
+                    components=[gr.Textbox(visible=False)],
+                    samples=[],
+                    type="index",
+                    visible=False
+                )
+                search_mode = gr.Radio(
+                    label="Search Source",
+                    choices=[API_MODE, LOCAL_MODE],
+                    value=API_MODE,
+                    info="The local index searches every video fetched so far: instant and free of API quota"
+                )
                 
                 # Advanced options
                 with gr.Accordion("⚙️ Advanced Options", open=False):
@@ -100,9 +363,10 @@ def create_interface():
                         max_results = gr.Slider(
                             label="Number of Results",
                             minimum=1,
-                            maximum=10,
+                            maximum=MAX_TOTAL_RESULTS,
                             value=5,
-                            step=1
+                            step=1,
+                            info="Fetched 50 per page; each page costs 100 quota units"
                         )
                         video_duration = gr.Dropdown(
                             label="Video Duration",
@@ -131,8 +395,44 @@ def create_interface():
                         value="relevance",
                         info="How to sort the search results"
                     )
+                    
+                    with gr.Row():
+                        published_after = gr.DateTime(
+                            label="Published After",
+                            value="2024-01-01",
+                            include_time=False,
+                            type="string",
+                            info="Show videos published after this date"
+                        )
+                        published_before = gr.DateTime(
+                            label="Published Before",
+                            value=None,
+                            include_time=False,
+                            type="string",
+                            info="Empty or today: up to now"
+                        )
+                
+                rank_by = gr.Dropdown(
+                    label="Re-rank Results",
+                    choices=list(RANK_OPTIONS),
+                    value="API order",
+                    info="Re-orders the fetched results locally, without another API call"
+                )
                 
                 search_button = gr.Button("Search Videos", variant="primary")
+                
+                # Saved searches live in the result store
+                with gr.Accordion("👀 Watched Searches", open=False, visible=watch_enabled()):
+                    watch_button = gr.Button("⭐ Watch this search")
+                    watched = gr.Dropdown(
+                        label="Watched search",
+                        choices=[],
+                        info="Checking a search only fetches videos published since its last check"
+                    )
+                    with gr.Row():
+                        check_button = gr.Button("🔄 New")
+                        show_button = gr.Button("📂 All")
+                        unwatch_button = gr.Button("🗑️ Stop watching")
             
             with gr.Column(scale=2):
                 gr.Markdown("## 📺 Results")
@@ -144,26 +444,115 @@ def create_interface():
                     show_copy_button=True
                 )
         
-        # Connect the search function
+        # Results of the last search, for re-ranking without searching again
+        results_pool = gr.State(None)
+        # Queries of the suggestions on screen
+        suggestion_queries = gr.State([])
+        
+        # Connect the search function; button and Enter share one concurrency limit
         search_button.click(
-            fn=search_youtube_videos,
-            inputs=[search_input, max_results, video_duration, region_code, safe_search, order],
-            outputs=output
+            fn=search_youtube_videos_async,
+            inputs=[search_input, max_results, video_duration, region_code, safe_search, order, search_mode, rank_by, published_after, published_before],
+            outputs=[output, results_pool],
+            api_name="search",
+            concurrency_limit=SEARCH_CONCURRENCY,
+            concurrency_id="search"
         )
         
         # Also trigger search on Enter key
         search_input.submit(
-            fn=search_youtube_videos,
-            inputs=[search_input, max_results, video_duration, region_code, safe_search, order],
-            outputs=output
+            fn=search_youtube_videos_async,
+            inputs=[search_input, max_results, video_duration, region_code, safe_search, order, search_mode, rank_by, published_after, published_before],
+            outputs=[output, results_pool],
+            api_name=False,
+            concurrency_limit=SEARCH_CONCURRENCY,
+            concurrency_id="search"
+        )
+        
+        # Suggestions update on every keystroke, outside the search queue:
+        # they come from a local index and never call the API
+        search_input.input(
+            fn=suggest_searches,
+            inputs=[search_input, max_results, video_duration, region_code, safe_search, order, published_after, published_before],
+            outputs=[suggestions, suggestion_queries],
+            api_name=False,
+            queue=False,
+            show_progress="hidden",
+            trigger_mode="always_last"
+        )
+        
+        # Picking a suggestion searches for it; usually a cache hit
+        suggestions.click(
+            fn=pick_suggestion,
+            inputs=[suggestions, suggestion_queries],
+            outputs=search_input,
+            api_name=False,
+            queue=False,
+            show_progress="hidden"
+        ).then(
+            fn=search_youtube_videos_async,
+            inputs=[search_input, max_results, video_duration, region_code, safe_search, order, search_mode, rank_by, published_after, published_before],
+            outputs=[output, results_pool],
+            api_name=False,
+            concurrency_limit=SEARCH_CONCURRENCY,
+            concurrency_id="search"
+        )
+        
+        rank_by.change(
+            fn=rerank_results,
+            inputs=[results_pool, rank_by],
+            outputs=output,
+            show_progress="hidden",
+            concurrency_limit=None
+        )
+        
+        # Checks call the API, so they share the searches' concurrency limit
+        watch_button.click(
+            fn=watch_search,
+            inputs=[search_input, video_duration, region_code, safe_search, published_after, rank_by],
+            outputs=[output, results_pool, watched],
+            api_name=False,
+            concurrency_limit=SEARCH_CONCURRENCY,
+            concurrency_id="search"
+        )
+        check_button.click(
+            fn=check_watched,
+            inputs=[watched, rank_by],
+            outputs=[output, results_pool, watched],
+            api_name=False,
+            concurrency_limit=SEARCH_CONCURRENCY,
+            concurrency_id="search"
+        )
+        show_button.click(
+            fn=show_watched,
+            inputs=[watched, rank_by],
+            outputs=[output, results_pool],
+            api_name=False,
+            concurrency_limit=None
+        )
+        unwatch_button.click(
+            fn=unwatch,
+            inputs=watched,
+            outputs=watched,
+            api_name=False,
+            concurrency_limit=None
         )
         
         gr.Markdown("---")
         gr.Markdown("Made with ❤️ using Gradio and YouTube Data API v3")
+        
+        # Runs after the page has rendered, so the first search doesn't wait for the client build
+        demo.load(fn=warm_up, show_progress="hidden")
+        # Saved searches are shared, so every page load lists the current ones
+        demo.load(fn=watched_choices, outputs=watched, show_progress="hidden", api_name=False)
     
+    # Searches beyond the concurrency limit wait in a bounded queue; beyond
+    # QUEUE_SIZE new searches are turned away instead of waiting forever
+    demo.queue(max_size=QUEUE_SIZE, default_concurrency_limit=SEARCH_CONCURRENCY)
     return demo
 
 if __name__ == "__main__":
+    start_metrics_exporter()
     demo = create_interface()
     demo.launch(
         share=False,  # Set to True if you want to share publicly
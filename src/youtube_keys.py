@@ -0,0 +1,177 @@
+"""
+Pool of YouTube API keys (one per Google Cloud project)
+
+Each key has its own daily quota counter and token-bucket rate limiter.
+Every API call is sent with the least-loaded key: the one with the smallest
+share of its daily quota spent, preferring keys that are not being throttled.
+When the API answers quotaExceeded for a key, the key is quarantined until the
+daily quota resets (midnight Pacific time) and the call moves to another key.
+
+Keys come from API_KEYS (comma-separated) or, failing that, API_KEY. With one
+key the pool still applies the rate limit and quarantine.
+
+Per-key counters live in memory only: they balance load between keys, while
+the overall budget is enforced (and persisted) by the quota ledger. After a
+restart every key starts from zero again, so a key that was nearly spent can
+be picked until the API answers quotaExceeded and it is quarantined.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from rate_limit import TokenBucket
+from youtube_quota import DEFAULT_COST, QUOTA_COSTS, QuotaExhausted, ledger, next_reset, quota_day
+
+QUOTA_EXCEEDED_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+def parse_keys(value):
+    """Split a comma/whitespace separated string (or a list) into unique keys"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace(",", " ").split()
+    return list(dict.fromkeys(key.strip() for key in value if key and key.strip()))
+
+
+def keys_from_env():
+    """Return the keys configured in API_KEYS, or API_KEY"""
+    return parse_keys(os.getenv("API_KEYS")) or parse_keys(os.getenv("API_KEY"))
+
+
+def with_key(uri, key):
+    """Return uri with its key= query parameter set to key"""
+    parts = urlsplit(uri)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != "key"]
+    query.append(("key", key))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class ApiKey:
+    """One API key with its own rate limiter and daily quota counter"""
+
+    def __init__(self, key, daily_limit, rate=None, burst=None):
+        self.key = key
+        self.label = f"…{key[-4:]}"
+        self.daily_limit = daily_limit
+        self.limiter = TokenBucket(rate, capacity=burst) if rate else None
+        self.day = quota_day()
+        self.used = 0
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+
+    def load(self):
+        return self.used / self.daily_limit if self.daily_limit else 1.0
+
+
+class KeyPool:
+    """Least-loaded key selection with quarantine on quotaExceeded"""
+
+    def __init__(self, daily_limit=10000, rate=None, burst=None, clock=time.time):
+        self.daily_limit = daily_limit
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, keys):
+        """Add keys to the pool; keys already in it keep their counters"""
+        with self._lock:
+            for key in parse_keys(keys):
+                if key not in self._keys:
+                    self._keys[key] = ApiKey(key, self.daily_limit, self.rate, self.burst)
+
+    def _roll_over(self):
+        day = quota_day()
+        for api_key in self._keys.values():
+            if api_key.day != day:
+                api_key.day = day
+                api_key.used = 0
+
+    def acquire(self, method):
+        """Pick the least-loaded usable key for method and charge it; raise QuotaExhausted if none is left"""
+        cost = QUOTA_COSTS.get(method, DEFAULT_COST)
+        with self._lock:
+            self._roll_over()
+            now = self._clock()
+            usable = [
+                api_key for api_key in self._keys.values()
+                if api_key.quarantined_until <= now and api_key.used + cost <= api_key.daily_limit
+            ]
+            if not usable:
+                raise QuotaExhausted(method, "every API key's daily")
+            # Prefer keys that can send right away, then the least used share of quota
+            api_key = min(usable, key=lambda k: (k.limiter is not None and k.limiter.available() < 1, k.load()))
+            api_key.used += cost
+        if api_key.limiter is not None:
+            api_key.limiter.acquire()
+        return api_key
+
+    def refund(self, api_key, method):
+        """Give back the cost acquire() charged to api_key for a call that was never sent"""
+        cost = QUOTA_COSTS.get(method, DEFAULT_COST)
+        with self._lock:
+            if api_key.day == quota_day():
+                api_key.used = max(api_key.used - cost, 0)
+
+    def quarantine(self, api_key, until=None):
+        """Stop using api_key until until (a UNIX time), by default the next quota reset"""
+        with self._lock:
+            api_key.quarantined_until = until if until is not None else next_reset().timestamp()
+            api_key.quarantines += 1
+
+    def stats(self):
+        """Return per-key usage, remaining quota and quarantine state (keys are masked)"""
+        with self._lock:
+            self._roll_over()
+            now = self._clock()
+            return [
+                {
+                    "key": api_key.label,
+                    "used": api_key.used,
+                    "remaining": max(api_key.daily_limit - api_key.used, 0),
+                    "quarantined": api_key.quarantined_until > now,
+                    "quarantines": api_key.quarantines,
+                    "tokens": api_key.limiter.available() if api_key.limiter else None,
+                }
+                for api_key in self._keys.values()
+            ]
+
+
+def _optional_float(name, default):
+    value = os.getenv(name, default)
+    return float(value) if value else None
+
+
+key_pool = KeyPool(
+    daily_limit=int(os.getenv("API_KEY_DAILY_LIMIT", "10000")),
+    rate=_optional_float("API_KEY_RATE", "50"),
+    burst=_optional_float("API_KEY_BURST", ""),
+)
+
+
+def use_keys(keys):
+    """Add keys to the shared pool and return the first one (for building the client)"""
+    keys = parse_keys(keys)
+    key_pool.add(keys)
+    if not os.getenv("QUOTA_DAILY_LIMIT"):
+        # The overall budget grows with the number of projects unless set explicitly
+        ledger.set_daily_limit(key_pool.daily_limit * len(key_pool))
+    return keys[0] if keys else None
+
+
+def is_quota_exceeded(error):
+    """Return True if error is the API saying this key's daily quota is spent"""
+    from googleapiclient.errors import HttpError
+    if not isinstance(error, HttpError) or error.resp.status != 403:
+        return False
+    return any(
+        isinstance(detail, dict) and detail.get("reason") in QUOTA_EXCEEDED_REASONS
+        for detail in error.error_details or []
+    )
@@ -0,0 +1,270 @@
+"""
+YouTube Data API quota ledger and admission control
+
+Every API call made by the search and enrichment paths goes through
+youtube_retry.execute(), which charges the method's quota cost to the
+ledger below (once per attempt) against three budgets before the request
+is sent:
+
+- per day (the project quota, 10,000 units by default), persisted to disk so
+  restarts do not forget what was already spent; processes sharing the
+  state file add their spending to it under a file lock, at most once per
+  save interval, when the daily limit is reached and at exit
+- per minute, to smooth out bursts
+- per session, so one Streamlit/Gradio user cannot spend everybody's quota
+
+Calls that do not fit raise QuotaExhausted. Once the daily remainder drops
+below the low-water mark, optional work such as enrichment is deferred so the
+remaining units are kept for searches.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # The daily quota resets at midnight Pacific time; fall back to PST when
+    # no time zone database is available.
+    _QUOTA_TZ = timezone(timedelta(hours=-8))
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows: processes sharing a state file may then lose updates
+    fcntl = None
+
+# Quota cost per API method, see
+# https://developers.google.com/youtube/v3/determine_quota_cost
+QUOTA_COSTS = {
+    "search.list": 100,
+    "videos.list": 1,
+    "channels.list": 1,
+    "playlists.list": 1,
+    "playlistItems.list": 1,
+    "commentThreads.list": 1,
+    "videoCategories.list": 1,
+    "i18nRegions.list": 1,
+}
+DEFAULT_COST = 1
+
+
+class QuotaExhausted(Exception):
+    """Raised when an API call does not fit in the remaining quota budget"""
+
+    def __init__(self, method, budget):
+        self.method = method
+        self.budget = budget
+        super().__init__(f"YouTube API {budget} quota budget exhausted; {method} was not sent")
+
+
+def quota_day(now=None):
+    """Return the quota day (Pacific time date) as an ISO string"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(_QUOTA_TZ).date().isoformat()
+
+
+def next_reset(now=None):
+    """Return the UTC datetime at which the daily quota next resets"""
+    now = now or datetime.now(timezone.utc)
+    local = now.astimezone(_QUOTA_TZ)
+    midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=_QUOTA_TZ)
+    return midnight.astimezone(timezone.utc)
+
+
+class QuotaLedger:
+    """Thread-safe record of quota spent, with per-minute/session/day budgets"""
+
+    def __init__(self, daily_limit=10000, per_minute=None, per_session=None, low_watermark=None, state_file=None, max_sessions=10000, save_interval=1.0):
+        self.daily_limit = daily_limit
+        self.per_minute = per_minute
+        self.per_session = per_session
+        self._default_watermark = low_watermark is None
+        self.low_watermark = daily_limit // 10 if low_watermark is None else low_watermark
+        self.state_file = state_file
+        # Charges are kept in memory and written to the state file at most
+        # this often (seconds)
+        self.save_interval = save_interval
+        self._saved_at = time.monotonic()
+        # Sessions tracked for the per-session budget; the least recently
+        # charged are forgotten beyond this
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._sessions = OrderedDict()
+        self._day = quota_day()
+        self._used = 0
+        self._by_method = {}
+        # Spent by this process since the state file was last written
+        self._unsaved = {}
+        self.denied = 0
+        self._load()
+
+    @classmethod
+    def from_env(cls):
+        """Create a ledger configured from QUOTA_* environment variables"""
+        def optional_int(name):
+            value = os.getenv(name)
+            return int(value) if value else None
+
+        return cls(
+            daily_limit=int(os.getenv("QUOTA_DAILY_LIMIT", "10000")),
+            per_minute=optional_int("QUOTA_PER_MINUTE"),
+            per_session=optional_int("QUOTA_PER_SESSION"),
+            low_watermark=optional_int("QUOTA_LOW_WATERMARK"),
+            state_file=os.getenv("QUOTA_STATE_FILE", ".quota_usage.json"),
+            max_sessions=int(os.getenv("QUOTA_MAX_SESSIONS", "10000")),
+            save_interval=float(os.getenv("QUOTA_SAVE_INTERVAL", "1")),
+        )
+
+    def set_daily_limit(self, daily_limit):
+        """Change the daily budget (e.g. when API keys are added to the pool)"""
+        with self._lock:
+            self.daily_limit = daily_limit
+            if self._default_watermark:
+                self.low_watermark = daily_limit // 10
+
+    def _read_state(self):
+        """Return today's by_method spending from the state file ({} if none)"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if state.get("day") != self._day:
+            return {}
+        return {method: int(cost) for method, cost in state.get("by_method", {}).items()}
+
+    def _load(self):
+        self._by_method = self._read_state()
+        self._used = sum(self._by_method.values())
+
+    def _save(self):
+        """Add this process's unsaved spending to the state file and pick up other processes'"""
+        self._saved_at = time.monotonic()
+        if not self.state_file:
+            return
+        try:
+            with open(f"{self.state_file}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                by_method = self._read_state()
+                for method, cost in self._unsaved.items():
+                    by_method[method] = by_method.get(method, 0) + cost
+                state = {"day": self._day, "used": sum(by_method.values()), "by_method": by_method}
+                tmp_file = f"{self.state_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_file, self.state_file)
+        except OSError:
+            return
+        self._unsaved = {}
+        self._by_method = by_method
+        self._used = state["used"]
+
+    def flush(self):
+        """Write spending not yet saved to the state file"""
+        with self._lock:
+            if self._unsaved:
+                self._save()
+
+    def _roll_over(self):
+        day = quota_day()
+        if day != self._day:
+            if self._unsaved:
+                self._save()
+            self._day = day
+            self._used = 0
+            self._by_method = {}
+            self._unsaved = {}
+            self._sessions.clear()
+
+    def _prune_recent(self, now):
+        while self._recent and self._recent[0][0] <= now - 60:
+            self._recent.popleft()
+
+    def _minute_usage(self, now):
+        self._prune_recent(now)
+        return sum(cost for _, cost in self._recent)
+
+    def _blocked_budget(self, cost, session, now):
+        if self._used + cost > self.daily_limit:
+            return "daily"
+        if self.per_minute is not None and self._minute_usage(now) + cost > self.per_minute:
+            return "per-minute"
+        if self.per_session is not None and session is not None:
+            if self._sessions.get(session, 0) + cost > self.per_session:
+                return "per-session"
+        return None
+
+    def can_spend(self, method, session=None, reserve=0):
+        """Return True if method fits in every budget, keeping reserve units spare"""
+        cost = QUOTA_COSTS.get(method, DEFAULT_COST)
+        with self._lock:
+            self._roll_over()
+            if self._used + cost + reserve > self.daily_limit:
+                return False
+            return self._blocked_budget(cost, session, time.monotonic()) is None
+
+    def is_low(self):
+        """Return True once the daily remainder is below the low-water mark"""
+        return self.remaining() < self.low_watermark
+
+    def charge(self, method, session=None):
+        """Record the cost of method, or raise QuotaExhausted if it does not fit"""
+        cost = QUOTA_COSTS.get(method, DEFAULT_COST)
+        now = time.monotonic()
+        with self._lock:
+            self._roll_over()
+            budget = self._blocked_budget(cost, session, now)
+            if budget is not None:
+                self.denied += 1
+                if budget == "daily" and self._unsaved:
+                    self._save()
+                raise QuotaExhausted(method, budget)
+            self._used += cost
+            self._by_method[method] = self._by_method.get(method, 0) + cost
+            self._unsaved[method] = self._unsaved.get(method, 0) + cost
+            self._prune_recent(now)
+            self._recent.append((now, cost))
+            if session is not None:
+                self._sessions[session] = self._sessions.get(session, 0) + cost
+                self._sessions.move_to_end(session)
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            if now - self._saved_at >= self.save_interval or self._used >= self.daily_limit:
+                self._save()
+        return cost
+
+    def remaining(self):
+        with self._lock:
+            self._roll_over()
+            return max(self.daily_limit - self._used, 0)
+
+    def stats(self, session=None):
+        """Return the quota spent today, per method, and the remaining budget"""
+        with self._lock:
+            self._roll_over()
+            return {
+                "day": self._day,
+                "used": self._used,
+                "remaining": max(self.daily_limit - self._used, 0),
+                "daily_limit": self.daily_limit,
+                "by_method": dict(self._by_method),
+                "last_minute": self._minute_usage(time.monotonic()),
+                "session_used": self._sessions.get(session, 0) if session is not None else None,
+                "denied": self.denied,
+                "resets_at": next_reset().isoformat(),
+            }
+
+
+ledger = QuotaLedger.from_env()
+atexit.register(ledger.flush)
@@ -0,0 +1,206 @@
+"""
+Local re-ranking of fetched search results
+
+The API's `order` parameter re-runs the search (100 quota units) every time
+the sort changes. rank_videos() re-orders a pool of VideoResults that is
+already in memory instead: title, channel and description are scored
+against the query with BM25 (or TF-IDF), and combined with recency and view
+counts from the enrichment data. All scoring is vectorized with NumPy, so
+ranking a few hundred results takes a few milliseconds and costs no quota.
+NumPy is imported on first use so it does not slow down the frontends'
+first render.
+
+The blended score multiplies the three signals, each normalised to 0..1:
+
+    relevance ** w_rel * recency ** w_recency * popularity ** w_views
+
+where recency halves every RANK_HALF_LIFE_DAYS and popularity is log-scaled
+views relative to the most viewed result.
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+
+# Label shown in the frontends -> rank_videos() sort_by; None keeps the API's order
+RANK_OPTIONS = {
+    "API order": None,
+    "Best match (relevance × recency × views)": "blend",
+    "Relevance (BM25)": "bm25",
+    "Relevance (TF-IDF)": "tfidf",
+    "Newest first": "date",
+    "Most viewed": "views",
+    "Most liked": "likes",
+    "Title (A-Z)": "title",
+}
+
+# Title matches count more than channel names, which count more than descriptions
+FIELD_WEIGHTS = (("title", 3.0), ("channel", 1.5), ("description", 1.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+RANK_HALF_LIFE_DAYS = float(os.getenv("RANK_HALF_LIFE_DAYS", "180"))
+# Exponents for relevance, recency and views in the blended score
+BLEND_WEIGHTS = (1.0, 0.5, 0.5)
+# Keeps one weak signal from zeroing out the other two
+_FLOOR = 0.05
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Lower-case word tokens of text"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _field_counts(items, field, index):
+    """Return a (docs x terms) term-frequency matrix and the token count of each doc for one field"""
+    import numpy as np
+    tf = np.zeros((len(items), len(index)))
+    lengths = np.zeros(len(items))
+    for i, item in enumerate(items):
+        tokens = tokenize(getattr(item, field))
+        lengths[i] = len(tokens)
+        for token in tokens:
+            j = index.get(token)
+            if j is not None:
+                tf[i, j] += 1
+    return tf, lengths
+
+
+def _query_index(query):
+    return {term: j for j, term in enumerate(dict.fromkeys(tokenize(query)))}
+
+
+def _idf(weighted_tf, smooth):
+    import numpy as np
+    n = weighted_tf.shape[0]
+    df = np.count_nonzero(weighted_tf, axis=0)
+    if smooth:
+        return np.log1p((n - df + 0.5) / (df + 0.5))
+    return np.log((1 + n) / (1 + df)) + 1
+
+
+def bm25_scores(items, query, k1=BM25_K1, b=BM25_B):
+    """Return the BM25F score of every item for query (field-weighted, length-normalised)"""
+    import numpy as np
+    index = _query_index(query)
+    if not items or not index:
+        return np.zeros(len(items))
+    weighted_tf = np.zeros((len(items), len(index)))
+    for field, weight in FIELD_WEIGHTS:
+        tf, lengths = _field_counts(items, field, index)
+        average = lengths.mean() or 1.0
+        weighted_tf += weight * tf / (1 - b + b * lengths / average)[:, None]
+    saturated = weighted_tf * (k1 + 1) / (weighted_tf + k1)
+    return saturated @ _idf(weighted_tf, smooth=True)
+
+
+def tfidf_scores(items, query):
+    """Return a field-weighted TF-IDF score of every item for query"""
+    import numpy as np
+    index = _query_index(query)
+    if not items or not index:
+        return np.zeros(len(items))
+    weighted_tf = np.zeros((len(items), len(index)))
+    total_length = np.zeros(len(items))
+    for field, weight in FIELD_WEIGHTS:
+        tf, lengths = _field_counts(items, field, index)
+        weighted_tf += weight * tf
+        total_length += weight * lengths
+    # Sub-linear term frequency, normalised so long descriptions don't win by size alone
+    sublinear = np.where(weighted_tf > 0, 1 + np.log(np.maximum(weighted_tf, 1e-12)), 0.0)
+    return (sublinear @ _idf(weighted_tf, smooth=False)) / np.sqrt(np.maximum(total_length, 1.0))
+
+
+def _parse_published(text):
+    import numpy as np
+    try:
+        return np.datetime64(text[:19], "s")
+    except ValueError:
+        return np.datetime64("NaT", "s")
+
+
+def _published(items):
+    """Return the publish time of every item as datetime64[s] (NaT when missing or malformed)"""
+    import numpy as np
+    return np.array([_parse_published(item.published or "NaT") for item in items], dtype="datetime64[s]")
+
+
+def _statistic(items, name):
+    """Return one statistic of every item as floats (NaN when not enriched)"""
+    import numpy as np
+    values = np.full(len(items), np.nan)
+    for i, item in enumerate(items):
+        value = getattr(item, name)
+        if value is not None:
+            values[i] = float(value)
+    return values
+
+
+def recency_scores(items, now=None, half_life_days=RANK_HALF_LIFE_DAYS):
+    """Return 1.0 for a video published now, halving every half_life_days
+
+    An unknown date is neutral: it gets the median score of the known ones.
+    """
+    import numpy as np
+    now = np.datetime64((now or datetime.now(timezone.utc)).replace(tzinfo=None), "s")
+    published = _published(items)
+    unknown = np.isnat(published)
+    age_days = (now - published).astype("float64") / 86400
+    scores = 0.5 ** (np.maximum(age_days, 0) / half_life_days)
+    neutral = np.median(scores[~unknown]) if not unknown.all() else 1.0
+    return np.where(unknown, neutral, scores)
+
+
+def popularity_scores(items):
+    """Return log-scaled views relative to the most viewed item (0 when unknown)"""
+    import numpy as np
+    views = np.log1p(np.nan_to_num(_statistic(items, 'view_count')))
+    top = views.max() if len(views) else 0.0
+    return views / top if top > 0 else np.zeros(len(items))
+
+
+def blend_scores(items, query, now=None, weights=BLEND_WEIGHTS):
+    """Return relevance x recency x popularity for every item"""
+    import numpy as np
+    relevance = bm25_scores(items, query)
+    top = relevance.max() if len(relevance) else 0.0
+    relevance = relevance / top if top > 0 else np.ones(len(items))
+    w_relevance, w_recency, w_views = weights
+    return (
+        (_FLOOR + relevance) ** w_relevance
+        * (_FLOOR + recency_scores(items, now)) ** w_recency
+        * (_FLOOR + popularity_scores(items)) ** w_views
+    )
+
+
+def rank_videos(items, query="", sort_by="blend", now=None):
+    """Return items re-ordered locally by sort_by (see RANK_OPTIONS); never calls the API
+
+    Ties keep the order the API returned them in.
+    """
+    items = list(items)
+    if not sort_by or len(items) < 2:
+        return items
+    if sort_by == "title":
+        return sorted(items, key=lambda item: item.title.casefold())
+    import numpy as np
+    if sort_by == "date":
+        # Unknown dates sort last
+        published = _published(items)
+        keys = -published.astype("int64").astype("float64")
+        keys[np.isnat(published)] = np.inf
+    elif sort_by == "views":
+        keys = -np.nan_to_num(_statistic(items, 'view_count'), nan=-1.0)
+    elif sort_by == "likes":
+        keys = -np.nan_to_num(_statistic(items, 'like_count'), nan=-1.0)
+    elif sort_by == "bm25":
+        keys = -bm25_scores(items, query)
+    elif sort_by == "tfidf":
+        keys = -tfidf_scores(items, query)
+    elif sort_by == "blend":
+        keys = -blend_scores(items, query, now)
+    else:
+        raise ValueError(f"Unknown sort: {sort_by}")
+    return [items[i] for i in np.argsort(keys, kind="stable")]
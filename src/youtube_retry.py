@@ -0,0 +1,207 @@
+"""
+Resilient execution of YouTube API requests
+
+execute() wraps every search.list and videos.list call:
+
+- transient failures (5xx, 429, rateLimitExceeded/backendError, socket
+  timeouts and dropped connections) are retried with exponential backoff and
+  full jitter, honouring Retry-After when the API sends it
+- anything else (bad requests, quotaExceeded, ...) fails immediately
+- a circuit breaker counts consecutive transient failures and, once the API
+  looks down, fails calls fast with CircuitOpenError instead of piling more
+  load onto it; callers then fall back to (possibly stale) cached results
+
+With several API keys (youtube_keys.py), every attempt is sent with the
+least-loaded key, and a key that answers quotaExceeded is quarantined while
+the call moves to the next one.
+
+Each attempt is charged to the quota ledger, as the API bills failed calls
+too; calls rejected by the breaker cost nothing. The per-call socket timeout
+is set on the HTTP transport in youtube_client.py (YOUTUBE_API_TIMEOUT).
+
+Every attempt's network round-trip and JSON parse time, and every failure's
+reason, are recorded in metrics.py. Attempts go through youtube_batch.py,
+which can send concurrent calls as one HTTP batch request.
+"""
+
+import http.client
+import os
+import random
+import threading
+import time
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from metrics import api_calls, api_errors, stage_seconds
+from youtube_batch import api_batcher
+from youtube_keys import is_quota_exceeded, key_pool, with_key
+from youtube_quota import QuotaExhausted, ledger
+
+MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("API_BACKOFF_MAX", "8"))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RETRYABLE_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"}
+
+api_breaker = CircuitBreaker(
+    "YouTube API",
+    failure_threshold=int(os.getenv("API_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("API_BREAKER_RESET_SECONDS", "30")),
+)
+
+_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "retries": 0,
+    "gave_up": 0,
+    "short_circuited": 0,
+    "key_rotations": 0,
+}
+_retries_by_reason = {}
+
+
+def error_reason(error):
+    """Return the API's reason for an HttpError (e.g. 'backendError'), else the exception name"""
+    from googleapiclient.errors import HttpError
+    if isinstance(error, HttpError):
+        for detail in error.error_details or []:
+            if isinstance(detail, dict) and detail.get("reason"):
+                return detail["reason"]
+        return f"http_{error.resp.status}"
+    return type(error).__name__
+
+
+def is_retryable(error):
+    """Return True for errors that are likely to succeed when retried"""
+    from googleapiclient.errors import HttpError
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        return status in RETRYABLE_STATUSES or (status == 403 and error_reason(error) in RETRYABLE_REASONS)
+    return isinstance(error, (TimeoutError, ConnectionError, http.client.HTTPException))
+
+
+def is_upstream_failure(error):
+    """Return True if error means the API could not answer (so cached data may stand in)"""
+    return isinstance(error, CircuitOpenError) or is_retryable(error)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to sleep before retry number attempt (0-based): full jitter, capped"""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_MAX))
+    return delay
+
+
+def _retry_after(error):
+    resp = getattr(error, "resp", None)
+    value = resp.get("retry-after") if resp is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _count(name, amount=1):
+    with _lock:
+        _stats[name] += amount
+
+
+def _time_parsing(request):
+    """Wrap the request's response parser so its run time is kept apart from the network time"""
+    parsing = [0.0]
+    postproc = request.postproc
+
+    def timed_postproc(resp, content):
+        started = time.perf_counter()
+        try:
+            return postproc(resp, content)
+        finally:
+            parsing[0] = time.perf_counter() - started
+
+    request.postproc = timed_postproc
+    return parsing
+
+
+def execute(request, method, session=None, max_retries=None, breaker=api_breaker):
+    """Charge and execute request, retrying transient failures behind the circuit breaker"""
+    retries = MAX_RETRIES if max_retries is None else max_retries
+    _count("calls")
+    parsing = _time_parsing(request)
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            _count("short_circuited")
+            api_errors.inc(method, "circuitOpen")
+            raise
+        api_key = None
+        started = None
+        try:
+            if key_pool:
+                api_key = key_pool.acquire(method)
+                request.uri = with_key(request.uri, api_key.key)
+            parsing[0] = 0.0
+            started = time.perf_counter()
+            try:
+                ledger.charge(method, session)
+            except QuotaExhausted:
+                # Refused by the ledger: nothing is sent, so the key is not billed
+                if api_key is not None:
+                    key_pool.refund(api_key, method)
+                raise
+            # Sent on its own, or in a batch with concurrent calls (API_BATCH_WINDOW)
+            response = api_batcher.execute(request)
+        except QuotaExhausted:
+            # Refused by our own budget before anything was sent
+            breaker.release()
+            api_errors.inc(method, "localQuota")
+            raise
+        except Exception as e:
+            if started is not None:
+                api_calls.inc(method)
+                stage_seconds.observe(time.perf_counter() - started, "api_round_trip")
+            api_errors.inc(method, error_reason(e))
+            if api_key is not None and is_quota_exceeded(e):
+                # This project's quota is spent: park the key until the reset
+                # and send the call again with another one
+                key_pool.quarantine(api_key)
+                breaker.record_success()
+                _count("key_rotations")
+                continue
+            if not is_retryable(e):
+                if hasattr(e, "resp"):
+                    # The API answered (e.g. 400 or quotaExceeded): it is healthy
+                    breaker.record_success()
+                else:
+                    breaker.release()
+                raise
+            breaker.record_failure()
+            if attempt >= retries:
+                _count("gave_up")
+                raise
+            reason = error_reason(e)
+            with _lock:
+                _stats["retries"] += 1
+                _retries_by_reason[reason] = _retries_by_reason.get(reason, 0) + 1
+            time.sleep(backoff_delay(attempt, _retry_after(e)))
+            attempt += 1
+            continue
+        elapsed = time.perf_counter() - started
+        api_calls.inc(method)
+        stage_seconds.observe(elapsed - parsing[0], "api_round_trip")
+        stage_seconds.observe(parsing[0], "json_parse")
+        breaker.record_success()
+        return response
+
+
+def retry_stats():
+    """Return call/retry counters, retries per error reason, the breaker state and per-key usage"""
+    with _lock:
+        stats = dict(_stats)
+        stats["retries_by_reason"] = dict(_retries_by_reason)
+    stats["breaker"] = api_breaker.stats()
+    stats["keys"] = key_pool.stats()
+    stats["batching"] = api_batcher.stats()
+    return stats
@@ -1,86 +1,248 @@
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
+"""
+Bulk YouTube search from the command line
+
+Reads search queries (one per line) from arguments, a file or stdin, runs them
+concurrently on a bounded thread pool and streams one JSON object per query to
+stdout or a JSONL file. With --checkpoint, every finished query is recorded so
+that a crashed or interrupted run skips the queries it already completed when
+started again with the same arguments.
+
+With --batch-window, the API calls the workers make within that many
+seconds of each other share one HTTP batch request.
+
+With --watch, every query is a saved search (kept in the result store): each
+run outputs only the videos published since the previous run of that query.
+
+Examples:
+    python src/youtube_search.py "theory of relativity"
+    python src/youtube_search.py -i queries.txt -o results.jsonl --checkpoint results.ckpt
+    cat queries.txt | python src/youtube_search.py --workers 16 --rate 10 > results.jsonl
+    python src/youtube_search.py -i queries.txt --enrich --workers 16 --batch-window 0.05 > results.jsonl
+    python src/youtube_search.py --watch -n 50 -i saved_queries.txt >> new_videos.jsonl
+"""
+
+import argparse
 import json
 import os
-import pytest
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
 from dotenv import load_dotenv
+
+# The project modules read their settings when imported
 load_dotenv()
 
-api_key = os.getenv("API_KEY")
-
-# Check if API key is set
-if not api_key:
-    print("ERROR: API_KEY environment variable is not set!")
-    print("Please set your YouTube Data API v3 key:")
-    print("Option 1: $env:API_KEY = 'YOUR_ACTUAL_API_KEY'")
-    print("Option 2: Use the run_with_api_key.py script")
-    print("Get your API key from: https://console.cloud.google.com/apis/credentials")
-    exit(1)
-# service_account_file = os.getenv("SERVICE_ACCOUNT_FILE")
-# scopes = ["https://www.googleapis.com/auth/cloud-platform"]
-# project_id = os.getenv("PROJECT_ID")
-
-# credentials = service_account.Credentials.from_service_account_file(
-#     service_account_file, scopes=scopes
-# )
-
-# youtube = build("youtube", "v3", credentials=credentials)
-youtube = build("youtube", "v3", developerKey=api_key)
-
-search_string = "theory of relativity"
-request = youtube.search().list(
-    part="snippet",  # Note: statistics is not available for search, only for videos
-    maxResults=5,
-    q=search_string,
-    videoDuration="short",  # any, long (> 20 minutes), medium (< 20 minutes), short (< 4 minutes)
-    videoEmbeddable="true", #any
-    type="video",  # Specify that we want videos
-    # location='37.42307,-122.08427',
-    # locationRadius='1000m',
-    regionCode='NL',
-    relevanceLanguage='en',
-    safeSearch='strict', # none, moderate, strict
-    videoCaption='any', # none, closedCaption, any
-    # videoCategoryId='27', # 1 Film & Animation, 2 Autos & Vehicles
-    videoDefinition='high', # any, high, standard
-    # videoDimension='2d', # 2d, 3d, any
-    publishedAfter='2024-01-01T00:00:00Z',
-    publishedBefore='2025-07-31T23:59:59Z',
-    order='relevance'
-    # ,'rating','viewCount'
-    #   order: string, Sort order of the results.
-    # Allowed values
-    #   searchSortUnspecified - 
-    #   date - Resources are sorted in reverse chronological order based on the date they were created.
-    #   rating - Resources are sorted from highest to lowest rating.
-    #   viewCount - Resources are sorted from highest to lowest number of views.
-    #   relevance - Resources are sorted based on their relevance to the search query. This is the default value for this parameter.
-    #   title - Resources are sorted alphabetically by title.
-    #   videoCount - Channels are sorted in descending order of their number of uploaded videos.
-
-)
-
-# Execute the request
-response = request.execute()
-
-# Print the results
-print(f"Search results for: {search_string}")
-print("=" * 50)
-
-for item in response['items']:
-    print(item)
-    title = item['snippet']['title']
-    channel = item['snippet']['channelTitle']
-    video_id = item['id']['videoId']
-    published = item['snippet']['publishedAt']
-    channelTitle = item['snippet']['channelTitle']
-    description = item['snippet']['description']
-    
-    print(f"Title: {title}")
-    print(f"Channel: {channel}")
-    print(f"ChannelTitle: {channelTitle}")
-    print(f"Description: {description}")
-    print(f"Video ID: {video_id}")
-    print(f"Published: {published}")
-    print(f"URL: https://www.youtube.com/watch?v={video_id}")
-    print("-" * 30)
\ No newline at end of file
+from rate_limit import TokenBucket
+from saved_searches import check_saved_search, save_search, watch_enabled
+from youtube_api import MAX_TOTAL_RESULTS, search_videos
+from youtube_batch import api_batcher
+from youtube_client import get_client
+from youtube_enrich import enrich_videos
+from youtube_keys import keys_from_env, use_keys
+from youtube_quota import QuotaExhausted, ledger
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run YouTube searches in bulk and write the results as JSONL."
+    )
+    parser.add_argument("queries", nargs="*", help="search queries (default: read from --input or stdin)")
+    parser.add_argument("-i", "--input", help="file with one query per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("--checkpoint", help="file recording completed queries, used to resume a run")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="concurrent searches (default: 8)")
+    parser.add_argument("--rate", type=float, default=5.0, help="maximum searches started per second (default: 5)")
+    parser.add_argument("--enrich", action="store_true",
+                        help="add statistics, contentDetails and channel details via videos.list and channels.list")
+    parser.add_argument("--batch-window", type=float, default=api_batcher.window,
+                        help="seconds to collect concurrent API calls into one HTTP batch request; 0 sends each "
+                             f"on its own (default: API_BATCH_WINDOW or {api_batcher.window:g})")
+    parser.add_argument("--watch", action="store_true",
+                        help="only output videos published since the last --watch run of each query (newest first)")
+
+    search = parser.add_argument_group("search options")
+    search.add_argument("-n", "--max-results", type=int, default=5,
+                        help=f"results per query, up to {MAX_TOTAL_RESULTS}; with --watch, most new videos per query (default: 5)")
+    search.add_argument("--duration", default="short", choices=["any", "short", "medium", "long"],
+                        help="short: <4min, medium: 4-20min, long: >20min (default: short)")
+    search.add_argument("--region", default="NL", help="region code (default: NL)")
+    search.add_argument("--safe-search", default="strict", choices=["none", "moderate", "strict"])
+    search.add_argument("--order", default="relevance", choices=["date", "rating", "relevance", "title", "viewCount"])
+    search.add_argument("--definition", default="high", choices=["any", "high", "standard"])
+    search.add_argument("--published-after", default="2024-01-01T00:00:00Z")
+    search.add_argument("--published-before", help="RFC 3339 time (default: no upper bound)")
+    return parser.parse_args(argv)
+
+
+def read_queries(args):
+    """Yield queries from the command line, an input file or stdin"""
+    if args.queries:
+        lines = args.queries
+    elif args.input and args.input != "-":
+        with open(args.input, encoding="utf-8") as f:
+            yield from _clean_queries(f)
+        return
+    elif args.input == "-" or not sys.stdin.isatty():
+        lines = sys.stdin
+    else:
+        return
+    yield from _clean_queries(lines)
+
+
+def _clean_queries(lines):
+    for line in lines:
+        query = line.strip()
+        if query and not query.startswith("#"):
+            yield query
+
+
+def load_checkpoint(path):
+    """Return the set of queries already completed according to the checkpoint file"""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+class JsonlWriter:
+    """Serialize records from many worker threads into one JSONL stream"""
+
+    def __init__(self, output, checkpoint):
+        self._output = output
+        self._checkpoint = checkpoint
+        self._lock = threading.Lock()
+
+    def write(self, record, completed_query=None):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._output.write(line + "\n")
+            self._output.flush()
+            # The result is written before the checkpoint, so a crash in
+            # between repeats the query rather than losing it.
+            if completed_query is not None and self._checkpoint is not None:
+                self._checkpoint.write(completed_query + "\n")
+                self._checkpoint.flush()
+
+
+def run_query(youtube, query, args, limiter, stop):
+    """Search for one query and return its JSONL record"""
+    if stop.is_set():
+        return None
+    limiter.acquire()
+    options = dict(
+        video_duration=args.duration,
+        region_code=args.region,
+        safe_search=args.safe_search,
+        order=args.order,
+        video_definition=args.definition,
+        published_after=args.published_after,
+        published_before=args.published_before
+    )
+    record = {"query": query}
+    if args.watch:
+        saved = save_search(query, **options)
+        items = check_saved_search(youtube, saved, max_results=args.max_results)
+        record["since"] = saved["watermark"]
+    else:
+        items = search_videos(youtube, query, max_results=args.max_results, **options)
+    if args.enrich:
+        items = enrich_videos(youtube, items)
+    record.update({
+        "fetched_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "count": len(items),
+        "items": items,
+    })
+    return record
+
+
+def run(youtube, queries, args, writer):
+    """Run queries on a bounded pool; return (completed, failed, stopped_by_quota)"""
+    limiter = TokenBucket(args.rate, capacity=max(args.workers, 1))
+    stop = threading.Event()
+    completed = failed = 0
+    max_pending = args.workers * 2
+
+    def collect(done):
+        nonlocal completed, failed
+        for future, query in done:
+            try:
+                record = future.result()
+            except QuotaExhausted as e:
+                # No point starting more searches; rerun after the quota resets
+                stop.set()
+                print(f"Stopping: {e}", file=sys.stderr)
+                continue
+            except Exception as e:
+                failed += 1
+                writer.write({"query": query, "error": str(e)})
+                continue
+            if record is not None:
+                completed += 1
+                writer.write(record, completed_query=query)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        pending = {}
+        for query in queries:
+            if stop.is_set():
+                break
+            if len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect([(future, pending.pop(future)) for future in done])
+            future = pool.submit(run_query, youtube, query, args, limiter, stop)
+            pending[future] = query
+        done, _ = wait(pending)
+        collect([(future, pending[future]) for future in done])
+
+    return completed, failed, stop.is_set()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # API_KEYS (comma-separated) spreads the work over several projects' quota
+    api_key = use_keys(keys_from_env())
+
+    # Check if API key is set
+    if not api_key:
+        print("ERROR: API_KEY environment variable is not set!", file=sys.stderr)
+        print("Please set your YouTube Data API v3 key:", file=sys.stderr)
+        print("Option 1: $env:API_KEY = 'YOUR_ACTUAL_API_KEY'", file=sys.stderr)
+        print("Option 2: Use the run_with_api_key.py script", file=sys.stderr)
+        print("Get your API key from: https://console.cloud.google.com/apis/credentials", file=sys.stderr)
+        return 1
+
+    if args.watch and not watch_enabled():
+        print("ERROR: --watch keeps its saved searches in the result store; set RESULT_STORE_PATH", file=sys.stderr)
+        return 1
+
+    done_queries = load_checkpoint(args.checkpoint)
+    queries = (query for query in read_queries(args) if query not in done_queries)
+
+    api_batcher.window = args.batch_window
+    youtube = get_client(api_key)
+    # Append when resuming so results from the interrupted run are kept
+    mode = "a" if args.checkpoint and done_queries else "w"
+    output = open(args.output, mode, encoding="utf-8") if args.output else sys.stdout
+    checkpoint = open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None
+    try:
+        completed, failed, out_of_quota = run(youtube, queries, args, JsonlWriter(output, checkpoint))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    print(
+        f"Completed {completed} queries, {failed} failed, {len(done_queries)} skipped from checkpoint. "
+        f"Quota used today: {ledger.stats()['used']} units",
+        file=sys.stderr
+    )
+    if out_of_quota:
+        return 2
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,480 @@
+"""
+Persistent SQLite store of every fetched video, with an FTS5 search index
+
+Search results and enrichment data are queued by the API paths and written by
+a background thread in batches, so the store never adds latency to a search.
+The database runs in WAL mode, so several app processes (Streamlit, Gradio,
+the bulk CLI) can share one file: readers never block the writer.
+
+The searches people type are logged too (record_search()), so the cache
+warmer can keep the most popular ones fresh (top_queries()). Saved searches
+(see saved_searches.py) keep their high-water mark and the IDs of every video
+they have found here.
+
+search_local() answers queries from this corpus in milliseconds without
+spending any API quota. It returns items shaped like search.list results
+(plus statistics/contentDetails when known) so the frontends render them
+unchanged.
+"""
+
+import atexit
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    channel_title TEXT NOT NULL DEFAULT '',
+    channel_id TEXT,
+    description TEXT NOT NULL DEFAULT '',
+    published_at TEXT,
+    thumbnails TEXT,
+    statistics TEXT,
+    content_details TEXT,
+    fetched_at TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, channel_title, description,
+    content='videos', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts(rowid, title, channel_title, description)
+    VALUES (new.rowid, new.title, new.channel_title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title, channel_title, description)
+    VALUES ('delete', old.rowid, old.title, old.channel_title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE OF title, channel_title, description ON videos BEGIN
+    INSERT INTO videos_fts(videos_fts, rowid, title, channel_title, description)
+    VALUES ('delete', old.rowid, old.title, old.channel_title, old.description);
+    INSERT INTO videos_fts(rowid, title, channel_title, description)
+    VALUES (new.rowid, new.title, new.channel_title, new.description);
+END;
+CREATE TABLE IF NOT EXISTS search_log (
+    query TEXT NOT NULL,
+    searched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS search_log_time ON search_log(searched_at);
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    watermark TEXT,
+    created_at TEXT NOT NULL,
+    checked_at TEXT,
+    gap_after TEXT,
+    gap_before TEXT,
+    UNIQUE (query, options)
+);
+CREATE TABLE IF NOT EXISTS saved_search_videos (
+    search_id INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    found_at TEXT NOT NULL,
+    PRIMARY KEY (search_id, video_id)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_VIDEO = """
+INSERT INTO videos (video_id, title, channel_title, channel_id, description, published_at, thumbnails, fetched_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(video_id) DO UPDATE SET
+    title = excluded.title,
+    channel_title = excluded.channel_title,
+    channel_id = excluded.channel_id,
+    description = excluded.description,
+    published_at = excluded.published_at,
+    thumbnails = excluded.thumbnails,
+    fetched_at = excluded.fetched_at
+"""
+
+_INSERT_SEARCH = """
+INSERT INTO search_log (query, searched_at) VALUES (?, ?)
+"""
+
+_INSERT_SAVED_SEARCH = """
+INSERT OR IGNORE INTO saved_searches (query, options, created_at) VALUES (?, ?, ?)
+"""
+
+_INSERT_SAVED_VIDEO = """
+INSERT OR IGNORE INTO saved_search_videos (search_id, video_id, found_at) VALUES (?, ?, ?)
+"""
+
+_UPDATE_WATERMARK = """
+UPDATE saved_searches SET watermark = ?, gap_after = ?, gap_before = ?, checked_at = ? WHERE id = ?
+"""
+
+_DELETE_SAVED_SEARCH = """
+DELETE FROM saved_searches WHERE id = ?
+"""
+
+_DELETE_SAVED_VIDEOS = """
+DELETE FROM saved_search_videos WHERE search_id = ?
+"""
+
+_SELECT_SAVED_SEARCHES = """
+SELECT s.id, s.query, s.options, s.watermark, s.created_at, s.checked_at, s.gap_after, s.gap_before,
+       (SELECT COUNT(*) FROM saved_search_videos sv WHERE sv.search_id = s.id)
+FROM saved_searches s
+"""
+
+_UPDATE_DETAILS = """
+UPDATE videos SET statistics = ?, content_details = ? WHERE video_id = ?
+"""
+
+_SELECT_COLUMNS = """
+SELECT v.video_id, v.title, v.channel_title, v.channel_id, v.description,
+       v.published_at, v.thumbnails, v.statistics, v.content_details
+"""
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Title matches count more than channel names, which count more than descriptions
+_BM25_WEIGHTS = (10.0, 4.0, 1.0)
+
+
+def _now(delta=timedelta()):
+    return (datetime.now(timezone.utc) + delta).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last as a prefix"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _batch_size(entry):
+    statement, rows = entry
+    return len(rows) if statement is not None else 1
+
+
+def _row_to_saved_search(row):
+    search_id, query, options, watermark, created_at, checked_at, gap_after, gap_before, count = row
+    return {
+        'id': search_id,
+        'query': query,
+        'options': json.loads(options),
+        'watermark': watermark,
+        # (published_after, published_before) of videos not fetched yet, or None
+        'gap': (gap_after, gap_before) if gap_before else None,
+        'created_at': created_at,
+        'checked_at': checked_at,
+        'count': count,
+    }
+
+
+def _row_to_item(row):
+    video_id, title, channel_title, channel_id, description, published_at, thumbnails, statistics, content_details = row
+    item = {
+        'id': {'kind': 'youtube#video', 'videoId': video_id},
+        'snippet': {
+            'title': title,
+            'channelTitle': channel_title,
+            'channelId': channel_id,
+            'description': description,
+            'publishedAt': published_at or "",
+            'thumbnails': json.loads(thumbnails) if thumbnails else {},
+        },
+    }
+    if statistics is not None:
+        item['statistics'] = json.loads(statistics)
+    if content_details is not None:
+        item['contentDetails'] = json.loads(content_details)
+    return item
+
+
+class ResultStore:
+    """SQLite-backed video corpus with batched background writes"""
+
+    def __init__(self, path, batch_size=200):
+        self.path = path
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.written = 0
+        self.errors = 0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # Stores created before saved searches kept a gap
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(saved_searches)")}
+            for column in ("gap_after", "gap_before"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE saved_searches ADD COLUMN {column} TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="youtube-store", daemon=True)
+                    self._writer.start()
+
+    def add_videos(self, items):
+        """Queue search.list/videos.list items for storage"""
+        rows = []
+        fetched_at = _now()
+        for item in items:
+            item_id = item['id']
+            video_id = item_id['videoId'] if isinstance(item_id, dict) else item_id
+            snippet = item.get('snippet', {})
+            rows.append((
+                video_id,
+                snippet.get('title', ''),
+                snippet.get('channelTitle', ''),
+                snippet.get('channelId'),
+                snippet.get('description', ''),
+                snippet.get('publishedAt'),
+                json.dumps(snippet.get('thumbnails', {})),
+                fetched_at,
+            ))
+        if rows:
+            self._ensure_writer()
+            self._queue.put((_UPSERT_VIDEO, rows))
+
+    def add_details(self, details):
+        """Queue {video_id: {'statistics': ..., 'contentDetails': ...}} for storage"""
+        rows = [
+            (json.dumps(entry.get('statistics', {})), json.dumps(entry.get('contentDetails', {})), video_id)
+            for video_id, entry in details.items()
+            if entry
+        ]
+        if rows:
+            self._ensure_writer()
+            self._queue.put((_UPDATE_DETAILS, rows))
+
+    def add_search(self, query):
+        """Queue a user search for the query log"""
+        query = " ".join(query.lower().split())
+        if query:
+            self._ensure_writer()
+            self._queue.put((_INSERT_SEARCH, [(query, _now())]))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is waiting so it lands in the same transaction
+            pending = _batch_size(batch[0])
+            while pending < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                pending += _batch_size(batch[-1])
+            try:
+                with conn:
+                    for statement, rows in batch:
+                        if statement is not None:
+                            conn.executemany(statement, rows)
+                            self.written += len(rows)
+            except sqlite3.Error:
+                # Losing a batch only costs us offline search coverage
+                self.errors += 1
+            finally:
+                for statement, rows in batch:
+                    if statement is None:
+                        rows.set()
+                    self._queue.task_done()
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far has been written"""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(timeout)
+
+    def search_local(self, text, limit=50):
+        """Return stored videos matching text, best matches first"""
+        match = fts_query(text)
+        if match is None:
+            return []
+        rows = self._reader().execute(
+            _SELECT_COLUMNS + """
+            FROM videos_fts JOIN videos v ON v.rowid = videos_fts.rowid
+            WHERE videos_fts MATCH ?
+            ORDER BY bm25(videos_fts, ?, ?, ?)
+            LIMIT ?
+            """,
+            (match, *_BM25_WEIGHTS, int(limit))
+        ).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+    def get_videos(self, video_ids):
+        """Return stored items for video_ids, in the given order"""
+        ids = list(video_ids)
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        rows = self._reader().execute(
+            _SELECT_COLUMNS + f"FROM videos v WHERE v.video_id IN ({placeholders})", ids
+        ).fetchall()
+        by_id = {row[0]: _row_to_item(row) for row in rows}
+        return [by_id[video_id] for video_id in ids if video_id in by_id]
+
+    def top_queries(self, limit=10, days=7):
+        """Return the most frequent logged searches of the last days, most frequent first"""
+        rows = self._reader().execute(
+            """
+            SELECT query FROM search_log WHERE searched_at >= ?
+            GROUP BY query ORDER BY COUNT(*) DESC, MAX(searched_at) DESC LIMIT ?
+            """,
+            (_now(timedelta(days=-days)), int(limit))
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def save_search(self, query, options=None):
+        """Save a search (query plus search options) if it is not saved yet; return it"""
+        query = " ".join(query.split())
+        options = json.dumps(options or {}, sort_keys=True)
+        self._ensure_writer()
+        self._queue.put((_INSERT_SAVED_SEARCH, [(query, options, _now())]))
+        # The caller needs the row (and its id) right away
+        self.flush()
+        row = self._reader().execute(
+            _SELECT_SAVED_SEARCHES + "WHERE s.query = ? AND s.options = ?", (query, options)
+        ).fetchone()
+        return _row_to_saved_search(row) if row else None
+
+    def saved_searches(self):
+        """Return every saved search, most recently checked first"""
+        rows = self._reader().execute(
+            _SELECT_SAVED_SEARCHES + "ORDER BY COALESCE(s.checked_at, s.created_at) DESC"
+        ).fetchall()
+        return [_row_to_saved_search(row) for row in rows]
+
+    def get_saved_search(self, search_id):
+        row = self._reader().execute(_SELECT_SAVED_SEARCHES + "WHERE s.id = ?", (search_id,)).fetchone()
+        return _row_to_saved_search(row) if row else None
+
+    def saved_video_ids(self, search_id):
+        """Return the IDs of every video a saved search has found"""
+        rows = self._reader().execute(
+            "SELECT video_id FROM saved_search_videos WHERE search_id = ?", (search_id,)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def merge_saved_results(self, search_id, video_ids, watermark, gap=None):
+        """Add newly found videos to a saved search and move its watermark and gap"""
+        found_at = _now()
+        self._ensure_writer()
+        rows = [(search_id, video_id, found_at) for video_id in video_ids]
+        if rows:
+            self._queue.put((_INSERT_SAVED_VIDEO, rows))
+        gap_after, gap_before = gap or (None, None)
+        self._queue.put((_UPDATE_WATERMARK, [(watermark, gap_after, gap_before, found_at, search_id)]))
+        # The next check must see these IDs and the new watermark
+        self.flush()
+
+    def saved_results(self, search_id, limit=50):
+        """Return the stored videos of a saved search, newest first"""
+        rows = self._reader().execute(
+            _SELECT_COLUMNS + """
+            FROM saved_search_videos sv JOIN videos v ON v.video_id = sv.video_id
+            WHERE sv.search_id = ?
+            ORDER BY v.published_at DESC
+            LIMIT ?
+            """,
+            (search_id, int(limit))
+        ).fetchall()
+        return [_row_to_item(row) for row in rows]
+
+    def delete_saved_search(self, search_id):
+        self._ensure_writer()
+        self._queue.put((_DELETE_SAVED_VIDEOS, [(search_id,)]))
+        self._queue.put((_DELETE_SAVED_SEARCH, [(search_id,)]))
+        self.flush()
+
+    def count(self):
+        return self._reader().execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+
+_default_lock = threading.Lock()
+_default_store = None
+_default_opened = False
+
+
+def _open_default_store():
+    path = os.getenv("RESULT_STORE_PATH", "youtube_results.db")
+    if not path:
+        return None
+    try:
+        store = ResultStore(path)
+    except sqlite3.Error:
+        # e.g. a read-only file system or a SQLite build without FTS5
+        return None
+    atexit.register(store.flush)
+    return store
+
+
+def get_result_store():
+    """Return the store at RESULT_STORE_PATH, opened on first use; None when disabled"""
+    global _default_store, _default_opened
+    if not _default_opened:
+        with _default_lock:
+            if not _default_opened:
+                _default_store = _open_default_store()
+                _default_opened = True
+    return _default_store
+
+
+def store_videos(items):
+    """Persist search results if the store is enabled"""
+    store = get_result_store()
+    if store is not None:
+        store.add_videos(items)
+
+
+def store_details(details):
+    """Persist enrichment data if the store is enabled"""
+    store = get_result_store()
+    if store is not None:
+        store.add_details(details)
+
+
+def record_search(query):
+    """Log a search typed by a user if the store is enabled"""
+    store = get_result_store()
+    if store is not None:
+        store.add_search(query)
+
+
+def top_queries(limit=10, days=7):
+    """Return the most popular recent searches; [] when the store is disabled"""
+    store = get_result_store()
+    if store is None or limit <= 0:
+        return []
+    return store.top_queries(limit, days)
+
+
+def search_local(text, limit=50):
+    """Search the local corpus; returns [] when the store is disabled"""
+    store = get_result_store()
+    if store is None:
+        return []
+    return store.search_local(text, limit)
@@ -8,11 +8,14 @@ It imports and runs the deployment-optimized YouTube frontend application.
 import sys
 import os
 
-# Add the src directory to the Python path so we can import our modules
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+# Make the src directory importable. Streamlit re-executes this script on
+# every interaction, so only add it once instead of growing sys.path per rerun.
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
 
 # Import and run the deployment-optimized application
 from youtube_frontend_deploy import main
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,49 @@
+"""
+Shared test setup: put src/ on the import path and keep the module-level
+singletons (quota ledger, result store, thumbnail cache, warmer) away from
+the working directory and the real API.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_STATE_DIR = tempfile.mkdtemp(prefix="youtube-tests-")
+
+os.environ.update(
+    QUOTA_STATE_FILE="",
+    RESULT_STORE_PATH=os.path.join(_STATE_DIR, "results.db"),
+    THUMBNAIL_CACHE_DIR="",
+    WARM_INTERVAL="0",
+    API_KEYS="",
+    API_KEY="mock",
+    API_KEY_RATE="",
+)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """A local mock YouTube API that the shared client talks to, with empty caches"""
+    from mock_youtube_api import MockYouTubeAPI, start_mock_server
+    from youtube_cache import channel_cache, pool_cache, search_cache, video_cache
+    from youtube_client import reset_clients
+
+    api = MockYouTubeAPI(results_per_query=120)
+    server = start_mock_server(api, port=0)
+    monkeypatch.setenv("YOUTUBE_API_URL", f"http://127.0.0.1:{server.server_port}/")
+    for cache in (search_cache, video_cache, channel_cache, pool_cache):
+        cache.clear()
+    reset_clients()
+    yield api
+    server.shutdown()
+    reset_clients()
+
+
+@pytest.fixture
+def youtube(api):
+    from youtube_client import get_client
+    return get_client("mock")
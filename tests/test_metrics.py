@@ -0,0 +1,70 @@
+import pytest
+
+import metrics
+from metrics import Counter, Histogram, render, write_metrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Start with no metrics or collectors registered"""
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+
+
+def test_counter_lines(registry):
+    calls = Counter("test_calls_total", "Calls", ("method",))
+    calls.inc("search.list")
+    calls.inc("search.list", amount=2)
+    calls.inc('odd "name"\n')
+    assert render().splitlines() == [
+        "# HELP test_calls_total Calls",
+        "# TYPE test_calls_total counter",
+        'test_calls_total{method="odd \\"name\\"\\n"} 1',
+        'test_calls_total{method="search.list"} 3',
+    ]
+    assert calls.value("search.list") == 3
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram("test_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(seconds, "api")
+    assert render().splitlines()[2:] == [
+        'test_seconds_bucket{stage="api",le="0.1"} 2',
+        'test_seconds_bucket{stage="api",le="1.0"} 3',
+        'test_seconds_bucket{stage="api",le="+Inf"} 4',
+        'test_seconds_sum{stage="api"} 3.65',
+        'test_seconds_count{stage="api"} 4',
+    ]
+    assert latency.count("api") == 4
+
+
+def test_timer_observes_its_block(registry):
+    latency = Histogram("test_seconds", "Latency")
+    with latency.time():
+        pass
+    assert latency.count() == 1
+
+
+def test_a_failing_collector_does_not_hide_the_others(registry):
+    @metrics.register_collector
+    def broken():
+        raise RuntimeError("source is down")
+
+    metrics.register_collector(lambda: metrics.gauge_lines("test_size", "Size", [(("a",), 2)], labelnames=("cache",)))
+    assert render().splitlines() == ["# HELP test_size Size", "# TYPE test_size gauge", 'test_size{cache="a"} 2']
+
+
+def test_app_metrics_after_an_api_call(api, youtube, tmp_path):
+    from youtube_api import search_videos
+    search_videos(youtube, "metrics", max_results=5)
+    text = render()
+    assert 'youtube_api_calls_total{method="search.list"}' in text
+    assert 'youtube_stage_seconds_bucket{stage="api_round_trip",le="+Inf"}' in text
+    assert 'youtube_cache_misses_total{cache="search"}' in text
+    assert "youtube_quota_used_units " in text
+    assert "youtube_api_breaker_open 0" in text
+
+    path = tmp_path / "youtube.prom"
+    write_metrics(str(path))
+    assert "youtube_quota_limit_units" in path.read_text(encoding="utf-8")
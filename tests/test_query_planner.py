@@ -0,0 +1,70 @@
+import pytest
+
+from query_planner import CandidatePool, _split
+from video_result import VideoResult
+
+
+def filters(**options):
+    return _split("cats", options)[1]
+
+
+def video(video_id, duration="PT2M", definition="hd", published="2024-06-01T00:00:00Z"):
+    return VideoResult(video_id, duration=duration, definition=definition, published=published)
+
+
+@pytest.fixture
+def pool():
+    results = [
+        video("short-hd", "PT2M", "hd", "2024-02-01T00:00:00Z"),
+        video("medium-sd", "PT10M", "sd", "2024-03-01T00:00:00Z"),
+        video("long-hd", "PT1H", "hd", "2024-04-01T00:00:00Z"),
+        video("short-sd", "PT30S", "sd", "2024-05-01T00:00:00Z"),
+        video("medium-hd", "PT5M", "hd", "2024-06-01T00:00:00Z"),
+    ]
+    return CandidatePool(filters(video_duration="any"), results)
+
+
+def test_covers_narrower_filters(pool):
+    assert pool.covers(filters(video_duration="any"))
+    assert pool.covers(filters(video_duration="short"))
+    assert pool.covers(filters(video_duration="any", video_definition="high"))
+    assert pool.covers(filters(video_duration="any", published_after="2024-03-01T00:00:00Z"))
+    assert pool.covers(filters(video_duration="any", published_before="2024-05-01T00:00:00Z"))
+
+
+def test_does_not_cover_wider_or_different_filters():
+    short = CandidatePool(filters(video_duration="short", published_after="2024-03-01T00:00:00Z"), [])
+    assert not short.covers(filters(video_duration="any", published_after="2024-03-01T00:00:00Z"))
+    assert not short.covers(filters(video_duration="long", published_after="2024-03-01T00:00:00Z"))
+    assert not short.covers(filters(video_duration="short", published_after="2024-01-01T00:00:00Z"))
+    assert not short.covers(filters(video_duration="short", published_after=None))
+    assert short.covers(filters(video_duration="short", published_after="2024-04-01T00:00:00Z"))
+
+    bounded = CandidatePool(filters(video_duration="any", published_before="2024-05-01T00:00:00Z"), [])
+    assert not bounded.covers(filters(video_duration="any"))
+    assert not bounded.covers(filters(video_duration="any", published_before="2024-06-01T00:00:00Z"))
+
+
+def test_select_filters_in_pool_order(pool):
+    assert [v.video_id for v in pool.select(filters(video_duration="short"), 2)] == ["short-hd", "short-sd"]
+    assert [v.video_id for v in pool.select(filters(video_duration="medium"), 2)] == ["medium-sd", "medium-hd"]
+    selected = pool.select(filters(video_duration="any", video_definition="high"), 2)
+    assert [v.video_id for v in selected] == ["short-hd", "long-hd"]
+    selected = pool.select(filters(video_duration="any", published_after="2024-04-01T00:00:00Z"), 3)
+    assert [v.video_id for v in selected] == ["long-hd", "short-sd", "medium-hd"]
+
+
+def test_select_needs_enough_matches_unless_exhaustive(pool):
+    assert pool.select(filters(video_duration="long"), 2) is None
+    pool.exhaustive = True
+    assert [v.video_id for v in pool.select(filters(video_duration="long"), 2)] == ["long-hd"]
+
+
+def test_select_refuses_results_it_cannot_filter():
+    unenriched = CandidatePool(filters(video_duration="any"), [video("a"), VideoResult("b")], exhaustive=True)
+    assert unenriched.select(filters(video_duration="short"), 1) is None
+    assert unenriched.select(filters(video_duration="any"), 2) is not None
+
+
+def test_select_leaves_dates_it_cannot_parse_to_the_api(pool):
+    assert pool.select(filters(video_duration="any", published_before="last week"), 1) is None
@@ -0,0 +1,47 @@
+from query_suggest import PrefixIndex, normalize
+
+
+def texts(index, prefix):
+    return [index.entries[position][0] for position in index.lookup(prefix)]
+
+
+def make_index():
+    return PrefixIndex([
+        ("machine learning tutorial", "machine learning tutorial", "query"),
+        ("Learn Python in 10 minutes", "python tutorial", "title"),
+        ("Relaxing   Music", "relaxing music", "query"),
+        ("relaxing music", "relaxing music", "query"),
+        ("Machine Learning Explained", "machine learning", "title"),
+    ])
+
+
+def test_normalize_matches_cache_keys():
+    assert normalize("  Relaxing \t MUSIC ") == "relaxing music"
+
+
+def test_lookup_by_prefix_of_the_text():
+    assert texts(make_index(), "machine l") == ["machine learning tutorial", "Machine Learning Explained"]
+
+
+def test_lookup_from_the_start_of_any_word():
+    assert texts(make_index(), "learn") == [
+        "machine learning tutorial", "Learn Python in 10 minutes", "Machine Learning Explained",
+    ]
+    assert texts(make_index(), "10 min") == ["Learn Python in 10 minutes"]
+
+
+def test_lookup_does_not_match_inside_words():
+    assert texts(make_index(), "earn") == []
+    assert texts(make_index(), "xyz") == []
+
+
+def test_duplicate_texts_are_indexed_once():
+    index = make_index()
+    assert len(index) == 4
+    assert texts(index, "relax") == ["Relaxing   Music"]
+
+
+def test_entries_keep_the_query_they_run():
+    index = make_index()
+    [position] = index.lookup("learn python")
+    assert index.entries[position] == ("Learn Python in 10 minutes", "python tutorial", "title")
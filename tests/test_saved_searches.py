@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import saved_searches
+from mock_youtube_api import MockYouTubeAPI, start_mock_server
+from youtube_client import get_client, reset_clients
+
+UPLOAD_INTERVAL = 0.1
+CAP = 10
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = MockYouTubeAPI(upload_interval=UPLOAD_INTERVAL, results_per_query=100000)
+    server = start_mock_server(api, port=0)
+    monkeypatch.setenv("YOUTUBE_API_URL", f"http://127.0.0.1:{server.server_port}/")
+    reset_clients()
+    yield api
+    server.shutdown()
+    reset_clients()
+
+
+def uploads_between(api, query, after, before):
+    """Every video the mock API has for query published in [after, before]"""
+    params = {"q": query, "order": "date", "type": "video", "maxResults": 50,
+              "publishedAfter": after, "publishedBefore": before}
+    found, token = [], None
+    while True:
+        response = api.search(dict(params, pageToken=token) if token else params)
+        found += [item["id"]["videoId"] for item in response["items"]]
+        token = response.get("nextPageToken")
+        if not token:
+            return found
+
+
+def test_capped_check_leaves_a_gap_that_later_checks_fill(api):
+    youtube = get_client("mock")
+    saved = saved_searches.save_search("watch test", video_duration="any")
+    found = set()
+
+    def check():
+        new = saved_searches.check_saved_search(youtube, saved_searches.get_saved_search(saved["id"]), max_results=CAP)
+        found.update(item["id"]["videoId"] for item in new)
+        return len(new), saved_searches.get_saved_search(saved["id"])
+
+    _, first = check()
+    start = first["watermark"]
+    assert start is not None and first["gap"] is None
+
+    # Three caps' worth of uploads arrive before the next check
+    time.sleep(3 * CAP * UPLOAD_INTERVAL)
+    count, after_capped = check()
+    assert count == CAP
+    assert after_capped["gap"] is not None
+    assert after_capped["gap"][0] == start
+
+    for _ in range(10):
+        _, state = check()
+        if state["gap"] is None:
+            break
+    assert state["gap"] is None
+
+    missing = set(uploads_between(api, "watch test", start, state["watermark"])) - found
+    assert not missing
@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def run_concurrently(flight, fn, callers=5):
+    """Start callers threads on the same key while fn blocks; return their futures"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def leader_fn():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    pool = ThreadPoolExecutor(callers)
+    futures = [pool.submit(flight.do, "key", leader_fn)]
+    started.wait(5)
+    futures += [pool.submit(flight.do, "key", leader_fn) for _ in range(callers - 1)]
+    # The others wait on the leader's call
+    while flight.stats()["coalesced"] < callers - 1:
+        time.sleep(0.001)
+    release.set()
+    pool.shutdown(wait=True)
+    return futures
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    futures = run_concurrently(flight, lambda: calls.append(1) or "result")
+    assert [future.result() for future in futures] == ["result"] * 5
+    assert calls == [1]
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+
+def test_error_is_delivered_to_every_waiter():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    for future in run_concurrently(flight, fail):
+        with pytest.raises(RuntimeError, match="boom"):
+            future.result()
+    assert flight.in_flight() == 0
+
+
+def test_interrupted_leader_cancels_waiters():
+    flight = SingleFlight()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    futures = run_concurrently(flight, interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        futures[0].result()
+    for future in futures[1:]:
+        with pytest.raises(CancelledError):
+            future.result()
+
+
+def test_later_calls_run_again():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+    assert flight.stats()["executions"] == 2
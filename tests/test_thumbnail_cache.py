@@ -0,0 +1,85 @@
+import io
+import os
+import threading
+
+import pytest
+
+import thumbnail_cache
+from thumbnail_cache import ThumbnailCache, check_thumbnail_url
+
+
+class FakeOpener:
+    """Answer every URL with its own bytes, counting the downloads"""
+
+    def __init__(self):
+        self.opened = []
+        self._lock = threading.Lock()
+
+    def open(self, url, timeout=None):
+        with self._lock:
+            self.opened.append(url)
+        return io.BytesIO(f"image of {url}".encode("utf-8") * 100)
+
+
+@pytest.fixture
+def opener(monkeypatch):
+    opener = FakeOpener()
+    monkeypatch.setattr(thumbnail_cache, "_opener", opener)
+    # Store the downloaded bytes as they are
+    monkeypatch.setattr(ThumbnailCache, "_reencode", lambda self, raw: raw)
+    return opener
+
+
+def url(n):
+    return f"https://i.ytimg.com/vi/video{n}/mqdefault.jpg"
+
+
+def test_only_youtube_image_hosts_are_allowed():
+    check_thumbnail_url(url(1))
+    for bad in ("https://example.com/a.jpg", "file:///etc/passwd", "ftp://i.ytimg.com/a.jpg"):
+        with pytest.raises(ValueError):
+            check_thumbnail_url(bad)
+
+
+def test_directory_is_created_by_the_first_download(opener, tmp_path):
+    directory = tmp_path / "thumbs"
+    cache = ThumbnailCache(str(directory))
+    assert cache.lookup(url(1)) is None
+    assert not directory.exists()
+
+    path = cache.get(url(1))
+    assert os.path.exists(path)
+    assert cache.get(url(1)) == path
+    assert opener.opened == [url(1)]
+    assert cache.stats()["downloads"] == 1
+
+
+def test_concurrent_prefetches_download_once(opener, tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    urls = [url(n % 3) for n in range(12)]
+    paths = cache.prefetch(urls, timeout=5)
+    assert set(paths) == {url(0), url(1), url(2)}
+    assert all(os.path.exists(path) for path in paths.values())
+    assert sorted(opener.opened) == sorted({url(0), url(1), url(2)})
+
+
+def test_eviction_removes_objects_and_their_refs(opener, tmp_path):
+    # Each fake image is about 4.5 kB; the cache holds two
+    cache = ThumbnailCache(str(tmp_path), max_bytes=10_000)
+    for n in range(5):
+        cache.get(url(n))
+        # Distinct mtimes so the eviction order is the download order
+        os.utime(cache.lookup(url(n)), (n, n))
+
+    assert cache.stats()["bytes"] <= 10_000
+    assert cache.lookup(url(0)) is None
+    assert cache.lookup(url(4)) is not None
+    objects = sum(len(files) for _, _, files in os.walk(tmp_path / "objects"))
+    assert len(os.listdir(tmp_path / "refs")) == objects
+
+
+def test_bad_url_is_refused_without_a_download(opener, tmp_path):
+    cache = ThumbnailCache(str(tmp_path))
+    with pytest.raises(ValueError):
+        cache.get("https://example.com/a.jpg")
+    assert opener.opened == []
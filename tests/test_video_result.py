@@ -0,0 +1,93 @@
+import pytest
+
+from video_result import DESCRIPTION_CHARS, VideoResult, prune_players, to_results
+
+
+def item(video_id="abc123", channel_title="Some Channel", **extra):
+    return dict({
+        "id": {"kind": "youtube#video", "videoId": video_id},
+        "etag": "ignored",
+        "snippet": {
+            "title": "A video",
+            "channelTitle": channel_title,
+            "channelId": "UCchannel",
+            "publishedAt": "2024-05-01T12:00:00Z",
+            "description": "What it is about",
+            "thumbnails": {
+                "default": {"url": "https://i.ytimg.com/vi/abc123/default.jpg"},
+                "medium": {"url": "https://i.ytimg.com/vi/abc123/mqdefault.jpg"},
+            },
+        },
+    }, **extra)
+
+
+def test_from_item_keeps_the_rendered_fields():
+    result = VideoResult.from_item(item(
+        statistics={"viewCount": "1500", "likeCount": "20"},
+        contentDetails={"duration": "PT4M13S", "definition": "hd"},
+        channel={"subscriberCount": "2000000", "thumbnailUrl": "https://yt3.ggpht.com/avatar"},
+    ))
+    assert result.video_id == "abc123"
+    assert result.title == "A video"
+    assert result.channel == "Some Channel"
+    assert result.published == "2024-05-01T12:00:00Z"
+    assert result.thumbnail_url == "https://i.ytimg.com/vi/abc123/mqdefault.jpg"
+    assert (result.view_count, result.like_count, result.subscriber_count) == (1500, 20, 2000000)
+    assert (result.duration, result.definition) == ("PT4M13S", "hd")
+    assert result.url == "https://www.youtube.com/watch?v=abc123"
+    assert result.stats_line()
+    assert result.channel_line().startswith("Some Channel · ")
+
+
+def test_unenriched_item():
+    result = VideoResult.from_item(dict(item(), id="abc123"))
+    assert result.video_id == "abc123"
+    assert result.view_count is None and result.subscriber_count is None
+    assert result.stats_line() == ""
+    assert result.channel_line() == "Some Channel"
+    with pytest.raises(AttributeError):
+        result.etag = "results have no room for other fields"
+
+
+def test_channel_names_are_interned():
+    # Built at run time, so only interning can make them the same object
+    first = VideoResult.from_item(item("one", channel_title="".join(["Shared ", "Channel"])))
+    second = VideoResult.from_item(item("two", channel_title="".join(["Shared ", "Channel"])))
+    assert first.channel is second.channel
+
+
+def test_equality_and_hash():
+    first, same = VideoResult.from_item(item()), VideoResult.from_item(item())
+    assert first == same and hash(first) == hash(same)
+    assert len({first, same}) == 1
+    changed = VideoResult.from_item(item(statistics={"viewCount": "1"}))
+    assert first != changed
+    assert first != "abc123"
+
+
+def test_description_preview():
+    assert VideoResult("a", description="short").description_preview() == "short"
+    long = VideoResult("a", description="x" * (DESCRIPTION_CHARS + 50))
+    assert long.description_preview() == "x" * DESCRIPTION_CHARS + "..."
+    assert len(long.description) == DESCRIPTION_CHARS + 50
+
+
+def test_to_results_passes_results_through():
+    existing = VideoResult("kept")
+    results = to_results([existing, item("new")])
+    assert results[0] is existing
+    assert results[1].video_id == "new"
+
+
+def test_prune_players():
+    state = {
+        "show_video_shown": True,
+        "show_video_closed": False,
+        "show_video_gone": True,
+        "query": "cats",
+        7: "not a key the app sets",
+    }
+    prune_players(state, [VideoResult("shown"), VideoResult("closed")])
+    assert state == {"show_video_shown": True, "query": "cats", 7: "not a key the app sets"}
+    prune_players(state)
+    assert "show_video_shown" not in state
@@ -0,0 +1,64 @@
+from youtube_api import continuation_token, iter_search_pages, search_exhausted, search_videos
+
+# Filters every mock video matches: each query has 120 results
+ANY = dict(video_duration="any", published_after="2000-01-01T00:00:00Z")
+
+
+def search_calls(api):
+    return api.stats()["requests"].get("search", 0)
+
+
+def video_ids(items):
+    return [item["id"]["videoId"] for item in items]
+
+
+def test_pages_are_fetched_as_they_are_consumed(api, youtube):
+    pages = iter_search_pages(youtube, "paging", max_results=120, prefetch=False, **ANY)
+    assert len(next(pages)) == 50
+    assert search_calls(api) == 1
+    assert [len(page) for page in pages] == [50, 20]
+    assert search_calls(api) == 3
+
+
+def test_prefetch_fetches_only_the_next_page(api, youtube):
+    pages = iter_search_pages(youtube, "prefetch", max_results=120, **ANY)
+    next(pages)
+    pages.close()
+    assert search_calls(api) <= 2
+
+
+def test_closing_stops_paging(api, youtube):
+    pages = iter_search_pages(youtube, "closing", max_results=120, prefetch=False, **ANY)
+    next(pages)
+    pages.close()
+    assert search_calls(api) == 1
+
+
+def test_cached_search_makes_no_call(api, youtube):
+    first = search_videos(youtube, "cached", max_results=60, **ANY)
+    assert search_videos(youtube, "  CACHED ", max_results=60, **ANY) == first
+    assert search_calls(api) == 2
+
+
+def test_continuation_token_continues_after_the_results_shown(api, youtube):
+    first = search_videos(youtube, "continue", max_results=5, **ANY)
+    token = continuation_token("continue", max_results=5, **ANY)
+    assert token is not None
+    more = search_videos(youtube, "continue", max_results=5, page_token=token, **ANY)
+    assert len(more) == 5
+    assert not set(video_ids(first)) & set(video_ids(more))
+
+
+def test_no_continuation_token_without_cached_pages_or_mid_page(api, youtube):
+    assert continuation_token("not searched", max_results=5, **ANY) is None
+    search_videos(youtube, "mid page", max_results=60, **ANY)
+    # The second page was cut after 10 of its 50 results
+    assert continuation_token("mid page", max_results=60, **ANY) is None
+
+
+def test_search_exhausted(api, youtube):
+    search_videos(youtube, "all of it", max_results=200, **ANY)
+    assert search_exhausted("all of it", max_results=200, **ANY)
+    search_videos(youtube, "part of it", max_results=50, **ANY)
+    assert not search_exhausted("part of it", max_results=50, **ANY)
+    assert not search_exhausted("never searched", max_results=50, **ANY)
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from googleapiclient.errors import HttpError
+
+import youtube_batch
+from youtube_batch import RequestBatcher, run_together
+
+
+def video_requests(youtube, count):
+    return [
+        lambda n=n: youtube.videos().list(part="statistics", id=f"SHvideo{n:04d}", maxResults=1)
+        for n in range(count)
+    ]
+
+
+def execute_concurrently(batcher, builders):
+    """Build and execute one request per thread, all at once; return results or exceptions"""
+    start = threading.Barrier(len(builders))
+
+    def call(build):
+        # Requests are bound to the HTTP transport of the thread that builds them
+        request = build()
+        start.wait()
+        try:
+            return batcher.execute(request)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(builders)) as pool:
+        return list(pool.map(call, builders))
+
+
+def test_disabled_batcher_sends_every_call_on_its_own(api, youtube):
+    batcher = RequestBatcher(window=0)
+    results = execute_concurrently(batcher, video_requests(youtube, 4))
+    assert all(result["items"] for result in results)
+    assert api.stats()["http_requests"] == 4
+    assert api.stats()["batched_calls"] == 0
+
+
+def test_concurrent_calls_share_a_batch_and_get_their_own_responses(api, youtube):
+    batcher = RequestBatcher(window=0.5)
+    results = execute_concurrently(batcher, video_requests(youtube, 10))
+    assert [result["items"][0]["id"] for result in results] == [f"SHvideo{n:04d}" for n in range(10)]
+    assert api.stats()["http_requests"] < 10
+    assert batcher.stats()["saved_round_trips"] == 10 - batcher.stats()["requests"]
+
+
+def test_batches_are_split_at_max_size(api, youtube):
+    batcher = RequestBatcher(window=0.5, max_size=4)
+    results = execute_concurrently(batcher, video_requests(youtube, 12))
+    assert all(result["items"] for result in results)
+    assert batcher.stats()["requests"] >= 3
+
+
+def test_a_failed_call_does_not_fail_the_rest_of_its_batch(api, youtube):
+    batcher = RequestBatcher(window=0.5)
+    requests = video_requests(youtube, 3)
+    requests.append(lambda: youtube.search().list(part="snippet", q="too many", maxResults=51))
+    results = execute_concurrently(batcher, requests)
+    assert all(result["items"] for result in results[:3])
+    assert isinstance(results[3], HttpError) and results[3].resp.status == 400
+
+
+def test_a_lone_call_is_sent_as_a_plain_request(api, youtube):
+    batcher = RequestBatcher(window=0.05)
+    assert batcher.execute(video_requests(youtube, 1)[0]())["items"]
+    assert api.stats()["batched_calls"] == 0
+    assert batcher.stats()["batches"] == 0
+
+
+def test_run_together(monkeypatch):
+    assert run_together(lambda: 1, lambda: 2) == [1, 2]
+    monkeypatch.setattr(youtube_batch, "api_batcher", RequestBatcher(window=0.5))
+    threads = run_together(threading.get_ident, threading.get_ident)
+    assert threads[0] != threads[1]
+    with pytest.raises(ZeroDivisionError):
+        run_together(lambda: 1, lambda: 1 / 0)
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta, timezone
+
+from youtube_cache import TTLCache, make_cache_key, normalize_timestamp
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+    clock.now += 10
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_entries_are_kept_for_the_grace_period():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=60, clock=clock)
+    cache.set("a", 1)
+    clock.now += 30
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == 1
+    clock.now += 40
+    assert cache.get_stale("a") is None
+
+
+def test_evicted_entries_can_be_read_stale():
+    cache = TTLCache(maxsize=1, ttl=10, stale_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    assert cache.get_stale("a") == 1
+
+
+def test_hit_ratio():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_cache_key_ignores_case_whitespace_and_order():
+    first = make_cache_key({"q": "  Theory of\tRelativity ", "regionCode": "nl", "order": "Relevance"})
+    second = make_cache_key({"order": "relevance", "regionCode": "NL", "q": "theory of relativity"})
+    assert first == second
+
+
+def test_cache_key_keeps_opaque_values_and_drops_none():
+    key = make_cache_key({"pageToken": "CAUQAA", "q": "Cats", "publishedBefore": None})
+    assert key == (("pageToken", "CAUQAA"), ("q", "cats"))
+    assert make_cache_key({"pageToken": "caUQAA"}) != make_cache_key({"pageToken": "CAUQAA"})
+
+
+def test_cache_key_normalizes_dates():
+    utc = make_cache_key({"publishedAfter": "2024-01-01T00:00:00Z"})
+    assert make_cache_key({"publishedAfter": "2024-01-01"}) == utc
+    assert make_cache_key({"publishedAfter": date(2024, 1, 1)}) == utc
+    assert make_cache_key({"publishedAfter": "2024-01-01T01:00:00+01:00"}) == utc
+    assert make_cache_key({"publishedAfter": datetime(2023, 12, 31, 19, tzinfo=timezone(timedelta(hours=-5)))}) == utc
+    # A bare date as the upper bound means the end of that day
+    assert make_cache_key({"publishedBefore": "2024-01-31"}) == make_cache_key({"publishedBefore": "2024-01-31T23:59:59Z"})
+
+
+def test_unparseable_timestamp_is_kept():
+    assert normalize_timestamp("yesterday") == "yesterday"
@@ -0,0 +1,54 @@
+import pytest
+
+import youtube_enrich
+from youtube_api import search_videos
+from youtube_enrich import enrich_videos, fetch_video_details, format_count, format_duration, video_id_of
+from youtube_quota import QuotaLedger
+
+ANY = dict(video_duration="any", published_after="2000-01-01T00:00:00Z")
+
+
+def video_calls(api):
+    return api.stats()["requests"].get("videos", 0)
+
+
+@pytest.fixture
+def results(api, youtube):
+    return search_videos(youtube, "enrich", max_results=120, **ANY)
+
+
+def test_details_are_fetched_50_ids_per_call_and_cached(api, youtube, results):
+    video_ids = [video_id_of(item) for item in results]
+    details = fetch_video_details(youtube, video_ids + video_ids[:10])
+    assert set(details) == set(video_ids)
+    assert all("viewCount" in entry["statistics"] for entry in details.values())
+    assert video_calls(api) == 3
+
+    assert fetch_video_details(youtube, video_ids[:60]) == {video_id: details[video_id] for video_id in video_ids[:60]}
+    assert video_calls(api) == 3
+
+
+def test_enrichment_is_skipped_while_quota_is_low(api, youtube, results, monkeypatch):
+    low = QuotaLedger(daily_limit=1000, low_watermark=500)
+    for _ in range(6):
+        low.charge("search.list")
+    monkeypatch.setattr(youtube_enrich, "ledger", low)
+    items = enrich_videos(youtube, results[:5])
+    assert [video_id_of(item) for item in items] == [video_id_of(item) for item in results[:5]]
+    assert all("statistics" not in item for item in items)
+    assert video_calls(api) == 0
+
+
+def test_enrich_merges_statistics_and_channel_details(api, youtube, results):
+    items = enrich_videos(youtube, results[:5])
+    assert all(item["statistics"] and item["contentDetails"] and item["channel"] for item in items)
+    assert all(item["snippet"] == result["snippet"] for item, result in zip(items, results))
+
+
+def test_formatting():
+    assert format_duration("PT1H2M3S") == "1:02:03"
+    assert format_duration("PT4M5S") == "4:05"
+    assert format_duration("garbage") == ""
+    assert format_count("1234") == "1.2K"
+    assert format_count("2000000") == "2M"
+    assert format_count("999") == "999"
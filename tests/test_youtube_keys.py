@@ -0,0 +1,102 @@
+import pytest
+
+import youtube_retry
+from youtube_keys import KeyPool, parse_keys, with_key
+from youtube_quota import QuotaExhausted, QuotaLedger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_keys_and_with_key():
+    assert parse_keys(" a, b  c,a ") == ["a", "b", "c"]
+    assert parse_keys(None) == []
+    assert with_key("https://host/search?q=x&key=old", "new") == "https://host/search?q=x&key=new"
+
+
+def test_least_loaded_key_is_used():
+    pool = KeyPool(daily_limit=1000)
+    pool.add("k1,k2")
+    assert pool.acquire("search.list").key == "k1"
+    assert pool.acquire("videos.list").key == "k2"
+    assert pool.acquire("videos.list").key == "k2"
+    assert pool.acquire("search.list").key == "k2"
+    assert [key["used"] for key in pool.stats()] == [100, 102]
+
+
+def test_key_without_room_for_the_call_is_skipped():
+    pool = KeyPool(daily_limit=150)
+    pool.add("k1,k2")
+    pool.acquire("search.list")
+    pool.acquire("search.list")
+    assert pool.acquire("videos.list").key == "k1"
+    with pytest.raises(QuotaExhausted):
+        pool.acquire("search.list")
+
+
+def test_quarantined_key_is_skipped_until_released():
+    clock = FakeClock()
+    pool = KeyPool(clock=clock)
+    pool.add("k1,k2")
+    first = pool.acquire("search.list")
+    pool.quarantine(first, until=clock.now + 60)
+    assert [pool.acquire("search.list").key for _ in range(3)] == ["k2"] * 3
+    assert pool.stats()[0]["quarantined"]
+
+    clock.now += 60
+    assert pool.acquire("search.list").key == "k1"
+
+
+def test_every_key_quarantined():
+    pool = KeyPool(clock=FakeClock())
+    pool.add("k1")
+    pool.quarantine(pool.acquire("videos.list"))
+    with pytest.raises(QuotaExhausted):
+        pool.acquire("videos.list")
+
+
+def test_refund():
+    pool = KeyPool()
+    pool.add("k1")
+    api_key = pool.acquire("search.list")
+    pool.refund(api_key, "search.list")
+    pool.refund(api_key, "search.list")
+    assert pool.stats()[0]["used"] == 0
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = KeyPool()
+    pool.add("key-one,key-two")
+    monkeypatch.setattr(youtube_retry, "key_pool", pool)
+    return pool
+
+
+def search(youtube, query):
+    return youtube_retry.execute(youtube.search().list(part="snippet", q=query, maxResults=5), "search.list")
+
+
+def test_calls_move_to_another_key_when_the_api_says_quota_exceeded(api, youtube, pool):
+    # Each key's project can pay for two searches; key-one's quota was spent elsewhere
+    api.quota_per_key = 200
+    api.key_usage["key-one"] = 200
+    assert search(youtube, "rotate 1")["items"]
+    assert [key["quarantined"] for key in pool.stats()] == [True, False]
+    assert search(youtube, "rotate 2")["items"]
+    assert api.stats()["key_usage"]["key-two"] == 200
+    with pytest.raises(QuotaExhausted):
+        search(youtube, "rotate 3")
+    assert [key["quarantined"] for key in pool.stats()] == [True, True]
+
+
+def test_key_is_refunded_when_the_ledger_refuses_the_call(api, youtube, pool, monkeypatch):
+    monkeypatch.setattr(youtube_retry, "ledger", QuotaLedger(daily_limit=50))
+    with pytest.raises(QuotaExhausted):
+        search(youtube, "refused")
+    assert [key["used"] for key in pool.stats()] == [0, 0]
+    assert api.stats()["requests"].get("search", 0) == 0
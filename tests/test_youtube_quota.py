@@ -0,0 +1,147 @@
+import json
+
+import pytest
+
+import youtube_quota
+from youtube_quota import QuotaExhausted, QuotaLedger
+
+
+@pytest.fixture
+def day(monkeypatch):
+    """Control the quota day; set day['today'] to roll the ledger over"""
+    day = {"today": "2025-03-01"}
+    monkeypatch.setattr(youtube_quota, "quota_day", lambda now=None: day["today"])
+    return day
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(youtube_quota.time, "monotonic", lambda: clock["now"])
+    return clock
+
+
+def test_daily_budget(day):
+    ledger = QuotaLedger(daily_limit=250)
+    ledger.charge("search.list")
+    ledger.charge("search.list")
+    with pytest.raises(QuotaExhausted) as error:
+        ledger.charge("search.list")
+    assert error.value.budget == "daily"
+    assert ledger.remaining() == 50
+    assert ledger.can_spend("videos.list")
+    assert ledger.stats()["denied"] == 1
+
+
+def test_rollover_resets_the_day(day):
+    ledger = QuotaLedger(daily_limit=250, per_session=200)
+    ledger.charge("search.list", "alice")
+    ledger.charge("search.list", "alice")
+    assert not ledger.can_spend("search.list", "alice")
+
+    day["today"] = "2025-03-02"
+    assert ledger.remaining() == 250
+    assert ledger.stats("alice")["session_used"] == 0
+    ledger.charge("search.list", "alice")
+    assert ledger.stats("alice")["session_used"] == 100
+    assert ledger.stats()["by_method"] == {"search.list": 100}
+
+
+def test_per_minute_budget(day, clock):
+    ledger = QuotaLedger(per_minute=150)
+    ledger.charge("search.list")
+    with pytest.raises(QuotaExhausted) as error:
+        ledger.charge("search.list")
+    assert error.value.budget == "per-minute"
+    clock["now"] += 60
+    ledger.charge("search.list")
+
+
+def test_recent_charges_are_pruned_without_a_minute_budget(day, clock):
+    ledger = QuotaLedger(daily_limit=10**6)
+    for _ in range(100):
+        ledger.charge("videos.list")
+        clock["now"] += 1
+    assert len(ledger._recent) <= 61
+
+
+def test_per_session_budget(day):
+    ledger = QuotaLedger(per_session=100)
+    ledger.charge("search.list", "alice")
+    with pytest.raises(QuotaExhausted) as error:
+        ledger.charge("videos.list", "alice")
+    assert error.value.budget == "per-session"
+    ledger.charge("search.list", "bob")
+    # Calls without a session are not held to the per-session budget
+    ledger.charge("search.list")
+
+
+def test_sessions_are_capped(day):
+    ledger = QuotaLedger(per_session=10, max_sessions=2)
+    for session in ("a", "b", "c"):
+        ledger.charge("videos.list", session)
+    assert list(ledger._sessions) == ["b", "c"]
+
+
+def test_reserve_and_low_watermark(day):
+    ledger = QuotaLedger(daily_limit=1000)
+    assert ledger.low_watermark == 100
+    assert not ledger.can_spend("search.list", reserve=950)
+    for _ in range(9):
+        ledger.charge("search.list")
+    assert not ledger.is_low()
+    ledger.charge("videos.list")
+    assert ledger.is_low()
+
+
+def test_state_file_survives_restarts_and_merges_processes(day, tmp_path):
+    state_file = str(tmp_path / "quota.json")
+    first = QuotaLedger(state_file=state_file, save_interval=0)
+    second = QuotaLedger(state_file=state_file, save_interval=0)
+    first.charge("search.list")
+    second.charge("videos.list")
+    first.charge("videos.list")
+
+    with open(state_file, encoding="utf-8") as f:
+        state = json.load(f)
+    assert state["used"] == 102
+    assert state["by_method"] == {"search.list": 100, "videos.list": 2}
+    assert QuotaLedger(state_file=state_file).remaining() == 10000 - 102
+
+
+def saved_usage(state_file):
+    return QuotaLedger(state_file=state_file).stats()["used"]
+
+
+def test_state_file_is_written_at_most_once_per_interval(day, clock, tmp_path):
+    state_file = str(tmp_path / "quota.json")
+    ledger = QuotaLedger(daily_limit=1000, state_file=state_file, save_interval=1)
+    ledger.charge("videos.list")
+    ledger.charge("videos.list")
+    assert saved_usage(state_file) == 0
+
+    clock["now"] += 1
+    ledger.charge("videos.list")
+    assert saved_usage(state_file) == 3
+
+    ledger.charge("videos.list")
+    ledger.flush()
+    assert saved_usage(state_file) == 4
+
+
+def test_state_file_is_written_when_the_limit_is_reached(day, clock, tmp_path):
+    state_file = str(tmp_path / "quota.json")
+    ledger = QuotaLedger(daily_limit=200, state_file=state_file, save_interval=60)
+    ledger.charge("search.list")
+    assert saved_usage(state_file) == 0
+    ledger.charge("search.list")
+    assert saved_usage(state_file) == 200
+
+
+def test_state_from_another_day_is_ignored(day, tmp_path):
+    state_file = str(tmp_path / "quota.json")
+    ledger = QuotaLedger(state_file=state_file)
+    ledger.charge("search.list")
+    ledger.flush()
+    day["today"] = "2025-03-02"
+    assert QuotaLedger(state_file=state_file).remaining() == 10000
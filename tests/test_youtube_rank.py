@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from video_result import VideoResult
+from youtube_rank import RANK_OPTIONS, bm25_scores, rank_videos, recency_scores
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def video(video_id, title="", channel="", description="", published="2025-01-01T00:00:00Z", views=None, likes=None):
+    return VideoResult(video_id, title=title, channel=channel, description=description,
+                       published=published, view_count=views, like_count=likes)
+
+
+def ids(videos):
+    return [result.video_id for result in videos]
+
+
+@pytest.fixture
+def videos():
+    return [
+        video("cook", "Pasta for beginners", "Kitchen", "Cooking basics", "2025-05-01T00:00:00Z", views=5000, likes=50),
+        video("theory", "Theory of relativity", "Physics", "Relativity explained simply", "2020-01-01T00:00:00Z", views=1000, likes=500),
+        video("channel", "Lecture 3", "Relativity Lectures", "", "2025-05-30T00:00:00Z", views=10, likes=1),
+        video("unknown", "Relativity in one minute", "Shorts", "", published="", views=None),
+    ]
+
+
+def test_api_order_is_kept_without_a_sort(videos):
+    assert rank_videos(videos, "relativity", RANK_OPTIONS["API order"]) == videos
+
+
+def test_bm25_prefers_title_matches(videos):
+    scores = dict(zip(ids(videos), bm25_scores(videos, "theory of relativity")))
+    assert scores["theory"] > scores["unknown"] > scores["channel"] > 0
+    assert scores["cook"] == 0
+    assert ids(rank_videos(videos, "theory of relativity", "bm25"))[0] == "theory"
+    assert ids(rank_videos(videos, "relativity", "tfidf"))[-1] == "cook"
+
+
+def test_sorting_by_date_views_likes_and_title(videos):
+    # Unknown values sort last
+    assert ids(rank_videos(videos, sort_by="date")) == ["channel", "cook", "theory", "unknown"]
+    assert ids(rank_videos(videos, sort_by="views")) == ["cook", "theory", "channel", "unknown"]
+    assert ids(rank_videos(videos, sort_by="likes")) == ["theory", "cook", "channel", "unknown"]
+    assert ids(rank_videos(videos, sort_by="title")) == ["channel", "cook", "unknown", "theory"]
+
+
+def test_ties_keep_the_api_order():
+    same = [video(str(n), "same title") for n in range(5)]
+    assert ids(rank_videos(same, "title", "bm25")) == ["0", "1", "2", "3", "4"]
+
+
+def test_blend_weighs_relevance_recency_and_views(videos):
+    ranked = ids(rank_videos(videos, "relativity", "blend", now=NOW))
+    # A matching, recent, viewed video beats an old or an irrelevant one
+    assert ranked.index("channel") < ranked.index("cook")
+    assert ranked[-1] == "cook"
+
+
+def test_recency_halves_every_half_life_and_unknown_dates_are_neutral():
+    videos = [
+        video("now", published="2025-06-01T00:00:00Z"),
+        video("old", published="2024-12-03T00:00:00Z"),
+        video("older", published="2024-06-06T00:00:00Z"),
+        video("bad", published="not a date"),
+    ]
+    scores = recency_scores(videos, now=NOW, half_life_days=180)
+    assert scores[:3] == pytest.approx([1.0, 0.5, 0.25], rel=1e-6)
+    assert scores[3] == pytest.approx(0.5)
+
+
+def test_unknown_sort():
+    with pytest.raises(ValueError):
+        rank_videos([video("a"), video("b")], sort_by="random")
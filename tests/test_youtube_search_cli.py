@@ -0,0 +1,52 @@
+import json
+
+import youtube_retry
+import youtube_search
+from youtube_quota import QuotaLedger
+
+
+def run_cli(tmp_path, *queries, extra=()):
+    argv = [*queries, "-o", str(tmp_path / "out.jsonl"), "--checkpoint", str(tmp_path / "run.ckpt"),
+            "--rate", "1000", "--duration", "any", "--published-after", "2000-01-01T00:00:00Z", *extra]
+    return youtube_search.main(argv)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+def test_writes_one_record_per_query_and_checkpoints_them(api, tmp_path):
+    assert run_cli(tmp_path, "alpha", "beta", extra=("-n", "3")) == 0
+    records = [json.loads(line) for line in read_lines(tmp_path / "out.jsonl")]
+    assert sorted(record["query"] for record in records) == ["alpha", "beta"]
+    assert all(record["count"] == 3 and len(record["items"]) == 3 for record in records)
+    assert sorted(read_lines(tmp_path / "run.ckpt")) == ["alpha", "beta"]
+
+
+def test_resume_skips_completed_queries_and_keeps_their_results(api, tmp_path):
+    assert run_cli(tmp_path, "alpha") == 0
+    searches = api.stats()["requests"]["search"]
+
+    assert run_cli(tmp_path, "alpha", "beta", "gamma") == 0
+    assert api.stats()["requests"]["search"] == searches + 2
+    queries = [json.loads(line)["query"] for line in read_lines(tmp_path / "out.jsonl")]
+    assert sorted(queries) == ["alpha", "beta", "gamma"]
+
+
+def test_stops_when_the_quota_runs_out_and_resumes_later(api, tmp_path, monkeypatch):
+    monkeypatch.setattr(youtube_retry, "ledger", QuotaLedger(daily_limit=100))
+    assert run_cli(tmp_path, "alpha", "beta", "gamma", extra=("--workers", "1")) == 2
+    assert read_lines(tmp_path / "run.ckpt") == ["alpha"]
+
+    monkeypatch.setattr(youtube_retry, "ledger", QuotaLedger(daily_limit=1000))
+    assert run_cli(tmp_path, "alpha", "beta", "gamma", extra=("--workers", "1")) == 0
+    assert sorted(read_lines(tmp_path / "run.ckpt")) == ["alpha", "beta", "gamma"]
+    assert len(read_lines(tmp_path / "out.jsonl")) == 3
+
+
+def test_comments_and_blank_lines_in_the_input_are_skipped(api, tmp_path):
+    queries = tmp_path / "queries.txt"
+    queries.write_text("# header\nalpha\n\n  beta  \n", encoding="utf-8")
+    assert run_cli(tmp_path, extra=("-i", str(queries))) == 0
+    assert sorted(read_lines(tmp_path / "run.ckpt")) == ["alpha", "beta"]
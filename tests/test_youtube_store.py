@@ -0,0 +1,93 @@
+import pytest
+
+import youtube_store
+from youtube_store import ResultStore, fts_query
+
+
+def item(video_id, title, channel="Channel", description="", published="2024-05-01T00:00:00Z"):
+    return {
+        "id": {"kind": "youtube#video", "videoId": video_id},
+        "snippet": {"title": title, "channelTitle": channel, "channelId": "UC1",
+                    "description": description, "publishedAt": published, "thumbnails": {}},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.add_videos([
+        item("a", "Theory of relativity explained", description="Einstein and spacetime"),
+        item("b", "Cooking pasta", channel="Relativity Kitchen"),
+        item("c", "Quantum physics", description="Not about relativity at all"),
+        item("d", "Café music for studying"),
+    ])
+    store.flush()
+    return store
+
+
+def ids(items):
+    return [entry["id"]["videoId"] for entry in items]
+
+
+def test_fts_query_matches_every_word_and_the_last_as_a_prefix():
+    assert fts_query("Theory of Rel") == '"theory" "of" "rel"*'
+    assert fts_query("  !? ") is None
+
+
+def test_titles_rank_above_channels_above_descriptions(store):
+    assert ids(store.search_local("relativity")) == ["a", "b", "c"]
+
+
+def test_prefix_and_diacritics(store):
+    assert ids(store.search_local("relat")) == ["a", "b", "c"]
+    assert ids(store.search_local("cafe")) == ["d"]
+    assert store.search_local("   ") == []
+
+
+def test_updated_videos_are_reindexed(store):
+    store.add_videos([item("b", "Baking bread", channel="Home Kitchen")])
+    store.flush()
+    assert ids(store.search_local("relativity")) == ["a", "c"]
+    assert ids(store.search_local("bread")) == ["b"]
+    assert store.count() == 4
+
+
+def test_details_are_merged_into_stored_items(store):
+    store.add_details({"a": {"statistics": {"viewCount": "10"}, "contentDetails": {"duration": "PT1M"}}, "b": {}})
+    store.flush()
+    first, second = store.get_videos(["a", "b"])
+    assert first["statistics"] == {"viewCount": "10"}
+    assert first["contentDetails"] == {"duration": "PT1M"}
+    assert "statistics" not in second
+
+
+def test_top_queries_counts_normalized_searches(store):
+    for query in ("Cats", "  cats ", "dogs", "CATS", "dogs", "birds"):
+        store.add_search(query)
+    store.flush()
+    assert store.top_queries(2) == ["cats", "dogs"]
+
+
+def test_a_second_store_on_the_same_file_sees_the_writes(store):
+    other = ResultStore(store.path)
+    assert ids(other.search_local("quantum")) == ["c"]
+
+
+def test_default_store_is_opened_on_first_use(tmp_path, monkeypatch):
+    path = tmp_path / "lazy.db"
+    monkeypatch.setenv("RESULT_STORE_PATH", str(path))
+    monkeypatch.setattr(youtube_store, "_default_store", None)
+    monkeypatch.setattr(youtube_store, "_default_opened", False)
+    assert not path.exists()
+    youtube_store.record_search("lazy")
+    assert path.exists()
+    assert youtube_store.get_result_store().path == str(path)
+
+
+def test_disabled_store(monkeypatch):
+    monkeypatch.setenv("RESULT_STORE_PATH", "")
+    monkeypatch.setattr(youtube_store, "_default_store", None)
+    monkeypatch.setattr(youtube_store, "_default_opened", False)
+    assert youtube_store.get_result_store() is None
+    assert youtube_store.search_local("anything") == []
+    assert youtube_store.top_queries() == []